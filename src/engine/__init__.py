@@ -1,5 +1,5 @@
 from .pipeline.extraction_pipeline import CodeExtractionPipeline
 from .models.test_data import YoutubeObject
-from .async_api import extract_code_async
+from .async_api import extract_code_async, extract_code_batch_async
 
-__all__ = ["CodeExtractionPipeline", "YoutubeObject", "extract_code_async"]
+__all__ = ["CodeExtractionPipeline", "YoutubeObject", "extract_code_async", "extract_code_batch_async"]
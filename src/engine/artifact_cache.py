@@ -0,0 +1,254 @@
+"""
+On-disk cache of pipeline artifacts, so repeat requests for the same video skip
+the stages whose inputs haven't changed.
+
+Entries are content addressed: each one lives under `<root>/<namespace>/<key>`,
+where the key is a hash of everything the artifact depends on (the YouTube video
+ID, stage parameters, a fingerprint of the stage config classes, prompt files).
+What gets cached:
+
+- "videos": the downloaded file and its captions, by video ID and download policy
+- "frames": the filtered and cropped frames, by video ID, fps and config fingerprint
+- "ocr": the text of one frame, by a hash of the encoded frame
+- "llm": the output of an LLM call, by a hash of its input, level and prompts
+- "runs": the final result of a whole pipeline run, by every input of the run
+
+The cache is bounded by `ArtifactCacheConfig.MAX_BYTES`. Reading an entry marks it
+as used, and the least recently used entries are evicted first when it overflows.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import re
+import shutil
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+
+class ArtifactCacheConfig:
+    """Configuration class for the artifact cache."""
+
+    ENABLED = True
+    ROOT = "artifact_cache"  # relative to the working directory, like constants.VIDEOS_PATH
+    MAX_BYTES = 10 * 1024**3
+
+
+YOUTUBE_ID_PATTERN = re.compile(
+    r"(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})"
+)
+
+
+def youtube_video_id(link: str) -> str:
+    """The 11 character video ID of a YouTube link, or a hash of the link if there is none."""
+    match = YOUTUBE_ID_PATTERN.search(link)
+    if match is not None:
+        return match.group(1)
+    return hash_bytes(link.encode())[:16]
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Union[str, pathlib.Path]) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable key for any JSON-serializable parts, other values are keyed by their str()."""
+    return hash_bytes(json.dumps(parts, sort_keys=True, default=str).encode())
+
+
+def config_fingerprint(*config_classes: type) -> str:
+    """
+    Hash of the UPPER_CASE settings of config classes, including inherited ones,
+    so any config change invalidates the artifacts built with the old values.
+    """
+    settings: Dict[str, Dict[str, Any]] = {}
+    for config in config_classes:
+        settings[config.__name__] = {
+            name: getattr(config, name) for name in dir(config) if name.isupper()
+        }
+    return cache_key(settings)
+
+
+class ArtifactCache:
+    """
+    LRU cache of files, directories and JSON values on disk.
+
+    Entries are written to a temporary path and renamed into place, so a reader
+    never sees a partial entry, and the cache can be shared by several pipeline
+    runs at once.
+    """
+
+    def __init__(self, root: Union[str, pathlib.Path], max_bytes: int):
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # walking the whole cache on every write is slow with many small OCR entries,
+        # so eviction only runs after a share of max_bytes was written since the last one
+        self._written_since_eviction: Optional[int] = None
+
+    def path(self, namespace: str, key: str) -> pathlib.Path:
+        return pathlib.Path(self.root, namespace, key)
+
+    def _lookup(self, namespace: str, key: str) -> Optional[pathlib.Path]:
+        path = self.path(namespace, key)
+        if not path.exists():
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            # the modification time doubles as the last-used time for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def _staging_path(self, namespace: str) -> pathlib.Path:
+        staging = pathlib.Path(self.root, namespace, f".tmp-{uuid.uuid4().hex}")
+        staging.parent.mkdir(parents=True, exist_ok=True)
+        return staging
+
+    def _commit(self, staging: pathlib.Path, namespace: str, key: str) -> pathlib.Path:
+        path = self.path(namespace, key)
+        with self._lock:
+            if path.exists():
+                # another run stored the same artifact first, keep theirs
+                remove_path(staging)
+            else:
+                os.replace(staging, path)
+                if self._written_since_eviction is not None:
+                    self._written_since_eviction += path_size(path)
+        if (
+            self._written_since_eviction is None
+            or self._written_since_eviction > self.max_bytes // 20
+        ):
+            self.evict()
+        return path
+
+    def get_json(self, namespace: str, key: str) -> Optional[Any]:
+        path = self._lookup(namespace, key)
+        if path is None:
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def put_json(self, namespace: str, key: str, value: Any) -> None:
+        staging = self._staging_path(namespace)
+        with open(staging, "w") as f:
+            json.dump(value, f)
+        self._commit(staging, namespace, key)
+
+    def get_file(self, namespace: str, key: str) -> Optional[pathlib.Path]:
+        return self._lookup(namespace, key)
+
+    def put_file(
+        self, namespace: str, key: str, source: Union[str, pathlib.Path]
+    ) -> pathlib.Path:
+        """Store a copy of `source`, hard linked when the file system allows it."""
+        staging = self._staging_path(namespace)
+        link_or_copy(source, staging)
+        return self._commit(staging, namespace, key)
+
+    def get_directory(self, namespace: str, key: str) -> Optional[pathlib.Path]:
+        return self._lookup(namespace, key)
+
+    def put_directory(
+        self,
+        namespace: str,
+        key: str,
+        files: Iterable[Tuple[str, Union[str, pathlib.Path, bytes]]],
+    ) -> pathlib.Path:
+        """Store a directory built from (name, source path or contents) pairs."""
+        staging = self._staging_path(namespace)
+        staging.mkdir()
+        for name, source in files:
+            if isinstance(source, bytes):
+                pathlib.Path(staging, name).write_bytes(source)
+            else:
+                link_or_copy(source, pathlib.Path(staging, name))
+        return self._commit(staging, namespace, key)
+
+    def entries(self) -> List[Tuple[float, int, pathlib.Path]]:
+        """(last used, size in bytes, path) of every entry."""
+        entries = []
+        if not self.root.exists():
+            return entries
+        for namespace in self.root.iterdir():
+            if not namespace.is_dir():
+                continue
+            for path in namespace.iterdir():
+                if path.name.startswith(".tmp-"):
+                    continue
+                try:
+                    entries.append((path.stat().st_mtime, path_size(path), path))
+                except OSError:
+                    continue
+        return entries
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits in `max_bytes`."""
+        with self._lock:
+            self._written_since_eviction = 0
+            entries = sorted(self.entries(), key=lambda entry: entry[0])
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                remove_path(path)
+                total -= size
+                evicted += 1
+        if evicted:
+            print(f"Artifact cache evicted {evicted} entries")
+        return evicted
+
+
+def link_or_copy(
+    source: Union[str, pathlib.Path], destination: Union[str, pathlib.Path]
+) -> None:
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def path_size(path: pathlib.Path) -> int:
+    if path.is_dir():
+        return sum(child.stat().st_size for child in path.rglob("*") if child.is_file())
+    return path.stat().st_size
+
+
+def remove_path(path: pathlib.Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache: Optional[ArtifactCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """The process-wide cache, None when caching is turned off."""
+    global _cache
+    if not ArtifactCacheConfig.ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.root != pathlib.Path(ArtifactCacheConfig.ROOT):
+            _cache = ArtifactCache(ArtifactCacheConfig.ROOT, ArtifactCacheConfig.MAX_BYTES)
+        return _cache
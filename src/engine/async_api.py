@@ -1,8 +1,62 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from functools import partial
+from typing import AsyncIterator, Dict, Tuple
 
+from .artifact_cache import (cache_key, config_fingerprint, get_artifact_cache,
+                             hash_file, youtube_video_id)
+from .constants import (DEFAULT_CREATE_FILE_PROMPTS, DEFAULT_PROMPT_FILE,
+                        EXTRACTION_PIPELINE_FILE)
+from .events.code_frame_filtering.config import CodeDetectionConfig
+from .events.download_video.policy import DownloadPolicy
+from .events.duplicate_removal.config import DuplicateRemovalConfig
+from .events.frame_split.config import FrameSplitConfig
+from .events.ocr_code_extraction.config import OCRConfig
+from .events.text_compaction.config import TextCompactionConfig
 from .models.test_data import YoutubeObject
 from .pipeline.extraction_pipeline import CodeExtractionPipeline
+from .progress import ProgressBroadcast, current_reporter, report_progress
+from .scheduler import SchedulerConfig, get_scheduler
+
+
+# run key -> the pipeline run currently producing that result, shared by every request for it
+_in_flight: Dict[str, "asyncio.Future[str]"] = {}
+# run key -> progress of that run, forwarded to the reporter of every request sharing it
+_run_progress: Dict[str, ProgressBroadcast] = {}
+
+
+def run_cache_key(
+    youtube_object: list[YoutubeObject],
+    frame_extraction_fps: int,
+    duplicate_removal_threshold: float,
+    level: int,
+    ocr_backend: str = "google_vision",
+) -> str:
+    """
+    Key of a whole run's result: every request parameter, stage config, prompt
+    and the pipeline definition it depends on.
+    """
+    video = youtube_object[0]
+    return cache_key(
+        "run",
+        youtube_video_id(video.link),
+        video.model_dump(exclude={"link"}),
+        frame_extraction_fps,
+        duplicate_removal_threshold,
+        level,
+        ocr_backend,
+        config_fingerprint(
+            DownloadPolicy,
+            FrameSplitConfig,
+            CodeDetectionConfig,
+            DuplicateRemovalConfig,
+            OCRConfig,
+            TextCompactionConfig,
+        ),
+        hash_file(EXTRACTION_PIPELINE_FILE),
+        hash_file(DEFAULT_PROMPT_FILE),
+        hash_file(DEFAULT_CREATE_FILE_PROMPTS),
+    )
 
 
 async def extract_code_async(
@@ -10,25 +64,141 @@ async def extract_code_async(
     frame_extraction_fps: int,
     duplicate_removal_threshold: float,
     level: int,
+    priority: int = 0,
+    ocr_backend: str = "google_vision",
 )->str:
     """
     Async wrapper for code extraction pipeline.
     Runs pipeline in thread pool to avoid blocking event loop to allow for processing of multiple requests at the same time.
+    Runs are admitted by the process-wide scheduler, lower `priority` first, and raise
+    SchedulerBusyError when its queue is full.
+    A request identical to an earlier one is answered from the artifact cache without running the pipeline,
+    and identical requests that arrive while it runs wait for that same run instead of starting their own.
+    Stage progress goes to the caller's `progress.current_reporter`, if one is set.
+    `ocr_backend` names the backend in `OCR_BACKENDS` that reads the cropped frames.
     """
-    loop = asyncio.get_event_loop()
+    result_key = run_cache_key(
+        youtube_object, frame_extraction_fps, duplicate_removal_threshold, level, ocr_backend
+    )
+
+    cache = get_artifact_cache()
+    if cache is not None:
+        cached = cache.get_json("runs", result_key)
+        if cached is not None:
+            print("Returning cached result for", youtube_object[0].link)
+            report_progress("ArtifactCache", "finished", result="cached run result")
+            return cached["result"]
+
+    run = _in_flight.get(result_key)
+    if run is None:
+        progress = ProgressBroadcast()
+        # the run reports to the broadcast, not to the reporter of the request that started it
+        run_context = contextvars.copy_context()
+        run_context.run(current_reporter.set, progress)
+        run = asyncio.get_running_loop().create_task(
+            run_extraction(
+                youtube_object,
+                frame_extraction_fps,
+                duplicate_removal_threshold,
+                level,
+                result_key,
+                priority,
+                ocr_backend,
+            ),
+            context=run_context,
+        )
+        _in_flight[result_key] = run
+        _run_progress[result_key] = progress
+        run.add_done_callback(partial(_forget_run, result_key))
+    else:
+        print("Joining the extraction already running for", youtube_object[0].link)
+
+    reporter = current_reporter.get()
+    if reporter is not None:
+        _run_progress[result_key].subscribe(reporter)
+
+    # shielded so a caller that goes away doesn't cancel the run for everyone else
+    return await asyncio.shield(run)
+
 
+async def extract_code_batch_async(
+    youtube_objects: list[YoutubeObject],
+    frame_extraction_fps: int,
+    duplicate_removal_threshold: float,
+    level: int,
+    priority: int = 0,
+    ocr_backend: str = "google_vision",
+) -> AsyncIterator[Tuple[int, bool, str]]:
+    """
+    Extract code from many videos concurrently, yielding (index, success, result or error message)
+    for each video as soon as it finishes, so results arrive in completion order rather than input order.
+    A video that fails doesn't affect the others. All runs share the scheduler's pools and the
+    process-wide clients in `clients`, and at most MAX_CONCURRENT_RUNS videos of a batch are
+    submitted at once, so a large batch waits its turn instead of overflowing the scheduler queue.
+    """
+    slots = asyncio.Semaphore(SchedulerConfig.MAX_CONCURRENT_RUNS)
+
+    async def extract(index: int, youtube_object: YoutubeObject) -> Tuple[int, bool, str]:
+        async with slots:
+            try:
+                result = await extract_code_async(
+                    [youtube_object],
+                    frame_extraction_fps,
+                    duplicate_removal_threshold,
+                    level,
+                    priority,
+                    ocr_backend,
+                )
+            except Exception as e:
+                print("Extraction failed for", youtube_object.link, ":", e)
+                return index, False, str(e)
+        return index, True, result
+
+    extractions = [
+        asyncio.ensure_future(extract(index, youtube_object))
+        for index, youtube_object in enumerate(youtube_objects)
+    ]
+    try:
+        for extraction in asyncio.as_completed(extractions):
+            yield await extraction
+    finally:
+        # the consumer stopped early, don't start the videos nobody is waiting for any more
+        for extraction in extractions:
+            extraction.cancel()
+
+
+def _forget_run(result_key: str, run: "asyncio.Future[str]") -> None:
+    if _in_flight.get(result_key) is run:
+        del _in_flight[result_key]
+        del _run_progress[result_key]
+
+
+async def run_extraction(
+    youtube_object: list[YoutubeObject],
+    frame_extraction_fps: int,
+    duplicate_removal_threshold: float,
+    level: int,
+    result_key: str,
+    priority: int = 0,
+    ocr_backend: str = "google_vision",
+) -> str:
     def run_pipeline():
+        report_progress("Pipeline", "started")
         pipeline = CodeExtractionPipeline(
             youtube_object=youtube_object,
             frame_extraction_fps=frame_extraction_fps,
             duplicate_removal_threshold=duplicate_removal_threshold,
             level=level,
+            ocr_backend=ocr_backend,
         )
         return pipeline.start()
 
-    with ThreadPoolExecutor() as executor:
-        result = await loop.run_in_executor(executor, run_pipeline)
-        # await loop.run_in_executor(executor, run_pipeline)
+    report_progress("Pipeline", "queued")
+    result = await get_scheduler().run(run_pipeline, priority)
 
-    print("this is the execution result", result.get_tail_context().execution_result[0].content)
-    return result.get_tail_context().execution_result[0].content
+    content = result.get_tail_context().execution_result[0].content
+    print("this is the execution result", content)
+    cache = get_artifact_cache()
+    if cache is not None and content is not None:
+        cache.put_json("runs", result_key, {"result": content})
+    return content
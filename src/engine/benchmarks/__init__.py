@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for the engine's hot paths.
+
+Each module is runnable on its own, e.g. from the `src` folder:
+
+    python -m engine.benchmarks.detector_benchmark
+"""
@@ -0,0 +1,120 @@
+"""
+Per-frame latency of the vectorized detectors against their original loop versions.
+
+`detect_line_numbers` used to find peaks with a Python loop over every image row and
+`detect_monospace_text` called `cv2.contourArea`/`cv2.boundingRect` once per contour.
+This benchmark keeps those loop implementations as the baseline and times both on
+synthetic 720p and 1080p code frames, checking that the results agree.
+
+Run from the `src` folder:
+
+    python -m engine.benchmarks.detector_benchmark [--repeat 20]
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, Tuple
+
+import cv2
+import numpy as np
+
+from ..events.code_frame_filtering.config import CodeDetectionConfig
+from ..events.code_frame_filtering.detectors import (detect_line_numbers,
+                                                     detect_monospace_text)
+from ..events.code_frame_filtering.frame_analysis import FrameAnalysis
+
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+
+def legacy_detect_monospace_text(gray: np.ndarray, config=CodeDetectionConfig) -> int:
+    _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    text_contours = [
+        c
+        for c in contours
+        if config.MIN_CONTOUR_AREA < cv2.contourArea(c) < config.MAX_CONTOUR_AREA
+    ]
+
+    if len(text_contours) < config.MIN_TEXT_CONTOURS:
+        return 0
+
+    widths = [cv2.boundingRect(c)[2] for c in text_contours]
+    return 1 if np.var(widths) < config.MAX_WIDTH_VARIANCE else 0
+
+
+def legacy_detect_line_numbers(gray: np.ndarray, config=CodeDetectionConfig) -> int:
+    h, w = gray.shape
+    left_region = gray[:, : int(w * config.LINE_NUMBER_REGION_WIDTH)]
+
+    horizontal_projection = np.sum(left_region < 128, axis=1)
+
+    peaks = []
+    for i in range(1, len(horizontal_projection) - 1):
+        if (
+            horizontal_projection[i] > horizontal_projection[i - 1]
+            and horizontal_projection[i] > horizontal_projection[i + 1]
+            and horizontal_projection[i] > config.MIN_DARK_PIXELS_PER_LINE
+        ):
+            peaks.append(i)
+
+    if len(peaks) < config.MIN_LINES_FOR_DETECTION:
+        return 0
+
+    spacings = [peaks[i + 1] - peaks[i] for i in range(len(peaks) - 1)]
+    return 1 if np.var(spacings) < config.MAX_SPACING_VARIANCE else 0
+
+
+def synthetic_code_frame(width: int, height: int, light_theme: bool = False) -> FrameAnalysis:
+    """Render a screen of numbered monospace code lines at the given resolution."""
+    background, foreground = (255, 0) if light_theme else (30, 220)
+    img = np.full((height, width, 3), background, dtype=np.uint8)
+
+    scale = height / 720
+    line_height = int(22 * scale)
+    rng = np.random.default_rng(0)
+    for line_no, y in enumerate(range(line_height, height - line_height, line_height), 1):
+        indent = " " * int(rng.integers(0, 4) * 4)
+        code = indent + "value = compute(item, index) + offset  # note"
+        cv2.putText(img, f"{line_no:>3}", (int(8 * scale), y), cv2.FONT_HERSHEY_PLAIN,
+                    scale, (foreground,) * 3, 1)
+        cv2.putText(img, code, (int(80 * scale), y), cv2.FONT_HERSHEY_PLAIN,
+                    scale, (foreground,) * 3, 1)
+
+    return FrameAnalysis.from_image(img, f"synthetic_{width}x{height}.png")
+
+
+def time_per_frame(detector: Callable, frame, repeat: int) -> float:
+    detector(frame)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        detector(frame)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    pairs = [
+        ("detect_monospace_text", legacy_detect_monospace_text, detect_monospace_text),
+        ("detect_line_numbers", legacy_detect_line_numbers, detect_line_numbers),
+    ]
+
+    print(f"{'detector':<24}{'frame':<8}{'before ms':>11}{'after ms':>10}{'speedup':>9}  same")
+    for label, (width, height) in RESOLUTIONS.items():
+        # line numbers are found as dark pixels, so that detector gets a light theme frame
+        for name, legacy, vectorized in pairs:
+            frame = synthetic_code_frame(width, height, light_theme=name == "detect_line_numbers")
+            before = time_per_frame(legacy, frame.gray, args.repeat)
+            after = time_per_frame(vectorized, frame, args.repeat)
+            same = legacy(frame.gray) == vectorized(frame)
+            print(f"{name:<24}{label:<8}{before:>11.2f}{after:>10.2f}{before / after:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare duplicate-removal feature backends on a folder of frames.
+
+Runs the full tiered duplicate comparison once per backend over the same frames
+and reports how long it took and how far the kept frames drift from the SIFT
+result, so the cheapest backend that keeps the same frames can be picked.
+
+Run from the `src` folder against any split video, e.g. the bundled fixture:
+
+    python -m engine.benchmarks.duplicate_backend_benchmark \
+        --frames "videos/Is \"finally\" Useless In Python?"
+"""
+
+import argparse
+
+from ..events.duplicate_removal import FEATURE_BACKENDS
+from ..frame_store import DiskFrameStore
+from .duplicate_removal import timed_duplicate_removal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", required=True, help="folder of frame%%d.jpg files")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument(
+        "--backends", nargs="+", default=list(FEATURE_BACKENDS), choices=list(FEATURE_BACKENDS)
+    )
+    args = parser.parse_args()
+
+    frame_store = DiskFrameStore(args.frames)
+    baseline, _, _ = timed_duplicate_removal(frame_store, args.threshold, "sift")
+    baseline_set = set(baseline)
+
+    print(f"{'backend':<10}{'seconds':>9}{'kept':>6}{'missing':>9}{'extra':>7}{'jaccard':>9}  same  tier hits")
+    for name in args.backends:
+        kept, elapsed, tier_hits = timed_duplicate_removal(frame_store, args.threshold, name)
+        kept_set = set(kept)
+        missing = len(baseline_set - kept_set)
+        extra = len(kept_set - baseline_set)
+        jaccard = len(baseline_set & kept_set) / max(1, len(baseline_set | kept_set))
+        print(
+            f"{name:<10}{elapsed:>9.2f}{len(kept):>6}{missing:>9}{extra:>7}{jaccard:>9.3f}"
+            f"  {str(kept == baseline):<5} {tier_hits}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+The duplicate comparison as the benchmarks time it, shared by the benchmarks
+that compare its backends and its analysis resolutions.
+"""
+
+import contextlib
+import io
+import time
+from functools import partial
+from typing import Dict, List, Tuple
+
+from ..events.duplicate_removal import (DuplicateRemovalConfig,
+                                        RemoveDuplicates,
+                                        TieredFrameComparator)
+from ..events.duplicate_removal.features import (FrameFeatureCache,
+                                                 FrameFeatures)
+from ..frame_store import FrameStore
+
+
+def timed_duplicate_removal(
+    frame_store: FrameStore,
+    threshold: float,
+    feature_backend: str = "sift",
+    config: type[DuplicateRemovalConfig] = DuplicateRemovalConfig,
+) -> Tuple[List[str], float, Dict[str, int]]:
+    """
+    (kept frame names, seconds, comparisons settled per tier) of removing the
+    duplicates among every frame of `frame_store`, in-process.
+    """
+    frame_names = frame_store.frame_names()
+    comparator = TieredFrameComparator(threshold, config, feature_backend)
+    cache = FrameFeatureCache(
+        partial(FrameFeatures.load, frame_store, config=config),
+        config.FEATURE_CACHE_SIZE,
+    )
+
+    start = time.perf_counter()
+    # the comparison prints per-pair progress, keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        RemoveDuplicates.remove_duplicate_frames(frame_names, cache, comparator)
+    elapsed = time.perf_counter() - start
+
+    return list(frame_names), elapsed, comparator.tier_hits
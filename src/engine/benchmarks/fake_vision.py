@@ -0,0 +1,84 @@
+"""
+A local stand-in for `vision.ImageAnnotatorClient`.
+
+It answers `text_detection` and `batch_annotate_images` after a fixed latency
+per call plus a smaller one per image, with text derived from the image bytes so
+results can be checked against the frame they came from. It can fail a share of
+images with a RESOURCE_EXHAUSTED error the way the real API does when the
+project's quota runs out. Install it with:
+
+    GoogleVisionOCRBackend.client_factory = staticmethod(FakeImageAnnotatorClient)
+"""
+
+import hashlib
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+
+# google.rpc.Code.RESOURCE_EXHAUSTED
+RESOURCE_EXHAUSTED = 8
+
+
+def fake_text(content: bytes) -> str:
+    return f"text-{hashlib.sha256(content).hexdigest()[:12]}"
+
+
+class FakeImageAnnotatorClient:
+    def __init__(
+        self,
+        latency: float = 0.1,
+        quota_error_rate: float = 0.0,
+        seed: Optional[int] = 0,
+        image_latency: float = 0.01,
+    ):
+        self.latency = latency
+        self.image_latency = image_latency
+        self.quota_error_rate = quota_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.images = 0
+        self.quota_errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def text_detection(self, image, **kwargs) -> SimpleNamespace:
+        return self._annotate([image.content])[0]
+
+    def batch_annotate_images(self, requests, **kwargs) -> SimpleNamespace:
+        return SimpleNamespace(
+            responses=self._annotate([request.image.content for request in requests])
+        )
+
+    def _annotate(self, contents: List[bytes]) -> List[SimpleNamespace]:
+        with self._lock:
+            self.requests += 1
+            self.images += len(contents)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            throttled = [self._random.random() < self.quota_error_rate for _ in contents]
+            self.quota_errors += sum(throttled)
+        try:
+            time.sleep(self.latency + self.image_latency * len(contents))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        return [
+            self._response(content, image_throttled)
+            for content, image_throttled in zip(contents, throttled)
+        ]
+
+    @staticmethod
+    def _response(content: bytes, throttled: bool) -> SimpleNamespace:
+        if throttled:
+            return SimpleNamespace(
+                text_annotations=[],
+                error=SimpleNamespace(code=RESOURCE_EXHAUSTED, message="Quota exceeded"),
+            )
+        return SimpleNamespace(
+            text_annotations=[SimpleNamespace(description=fake_text(content))],
+            error=SimpleNamespace(code=0, message=""),
+        )
@@ -0,0 +1,127 @@
+"""
+Accuracy and cost of montage OCR against per-frame OCR.
+
+OCRs the same cropped frames twice with the real Vision client: once frame by
+frame (`GoogleVisionOCRBackend` with batching off) and once tiled into
+montages (`GoogleVisionMontageOCRBackend`). Per-frame text is the
+reference. For every frame it reports how similar the montage text is
+(difflib ratio over characters, and the share of reference lines found
+verbatim), and overall the number of images sent, RPCs and wall-clock time.
+The artifact cache is turned off so every frame is sent. Needs the
+GOOGLE_CLOUD_* credentials in the environment. Run from the `src` folder on
+frames that went through CropFrames:
+
+    python -m engine.benchmarks.montage_accuracy_benchmark --frames <cropped frames> --limit 40
+"""
+
+import argparse
+import contextlib
+import difflib
+import io
+import statistics
+import threading
+import time
+from typing import Dict, Tuple
+
+from ..artifact_cache import ArtifactCacheConfig
+from ..clients import get_vision_client
+from ..events.ocr_code_extraction import (GoogleVisionMontageOCRBackend,
+                                          GoogleVisionOCRBackend)
+from ..events.ocr_code_extraction.config import OCRConfig
+from ..frame_store import DiskFrameStore, FrameStore
+
+
+class CountingClient:
+    """Wraps an ImageAnnotatorClient to count RPCs and images."""
+
+    def __init__(self, client):
+        self.client = client
+        self.requests = 0
+        self.images = 0
+        self._lock = threading.Lock()
+
+    def _count(self, images: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.images += images
+
+    def text_detection(self, *args, **kwargs):
+        self._count(1)
+        return self.client.text_detection(*args, **kwargs)
+
+    def batch_annotate_images(self, requests, **kwargs):
+        self._count(len(requests))
+        return self.client.batch_annotate_images(requests=requests, **kwargs)
+
+
+def run(
+    backend_class: type, config: type, frame_store: FrameStore, frame_names
+) -> Tuple[Dict[str, str], CountingClient, float]:
+    client = CountingClient(get_vision_client())
+
+    class Backend(backend_class):
+        client_factory = staticmethod(lambda: client)
+
+    Backend.config = config
+    backend = Backend()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        texts = backend.extract_frames(frame_store, frame_names)
+    return texts, client, time.perf_counter() - start
+
+
+def line_recall(reference: str, text: str) -> float:
+    reference_lines = [line.strip() for line in reference.splitlines() if line.strip()]
+    if not reference_lines:
+        return 1.0
+    lines = {line.strip() for line in text.splitlines()}
+    return sum(line in lines for line in reference_lines) / len(reference_lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", required=True, help="folder of cropped frame%%d.jpg files")
+    parser.add_argument("--limit", type=int, default=40, help="frames to OCR")
+    parser.add_argument("--tiles", type=int, default=OCRConfig.MONTAGE_MAX_TILES)
+    parser.add_argument("--verbose", action="store_true", help="print every frame's scores")
+    args = parser.parse_args()
+
+    ArtifactCacheConfig.ENABLED = False
+    frame_store = DiskFrameStore(args.frames)
+    frame_names = list(frame_store.frame_names())[: args.limit]
+
+    class PerFrameConfig(OCRConfig):
+        MAX_IMAGES_PER_BATCH = 1
+
+    class MontageConfig(OCRConfig):
+        MONTAGE_MAX_TILES = args.tiles
+
+    reference, reference_client, reference_seconds = run(
+        GoogleVisionOCRBackend, PerFrameConfig, frame_store, frame_names
+    )
+    montage, montage_client, montage_seconds = run(
+        GoogleVisionMontageOCRBackend, MontageConfig, frame_store, frame_names
+    )
+
+    ratios, recalls = [], []
+    for frame_name, reference_text in reference.items():
+        text = montage[frame_name]
+        ratio = difflib.SequenceMatcher(None, reference_text, text).ratio()
+        recall = line_recall(reference_text, text)
+        ratios.append(ratio)
+        recalls.append(recall)
+        if args.verbose:
+            print(f"{frame_name:<14} similarity {ratio:.3f}  line recall {recall:.3f}")
+
+    print(f"{len(frame_names)} frames, {args.tiles} frames per montage")
+    print(f"{'mode':<10}{'images':>8}{'requests':>10}{'seconds':>9}")
+    print(f"{'per-frame':<10}{reference_client.images:>8}{reference_client.requests:>10}{reference_seconds:>9.2f}")
+    print(f"{'montage':<10}{montage_client.images:>8}{montage_client.requests:>10}{montage_seconds:>9.2f}")
+    print(
+        f"montage vs per-frame text: similarity mean {statistics.fmean(ratios):.3f} "
+        f"min {min(ratios):.3f}, line recall mean {statistics.fmean(recalls):.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Accuracy/latency trade-off of analysing downscaled frames.
+
+Runs `is_code_frame` and the duplicate comparison over the same frames at several
+`ANALYSIS_HEIGHT` values and reports the time taken and how far the verdicts
+drift from analysing the full frames.
+
+The bundled fixture is only 360p, so `--source-height` upscales the frames first
+to stand in for a 1080p or 4K download. Run from the `src` folder:
+
+    python -m engine.benchmarks.normalization_benchmark \
+        --frames "videos/Is \"finally\" Useless In Python?" --source-height 1080
+"""
+
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ..events.code_frame_filtering.config import CodeDetectionConfig
+from ..events.code_frame_filtering.detectors import (DetectionPlanner,
+                                                     is_code_frame)
+from ..events.code_frame_filtering.frame_analysis import FrameAnalysis
+from ..events.duplicate_removal import DuplicateRemovalConfig
+from ..frame_normalization import downscale, normalize_frame
+from ..frame_store import DiskFrameStore, FrameStore
+from .duplicate_removal import timed_duplicate_removal
+
+
+class UpscaledFrameStore(FrameStore):
+    """Read-only view of a store with every frame resized to `height` rows."""
+
+    def __init__(self, frame_store: FrameStore, height: int):
+        self.frame_store = frame_store
+        self.height = height
+        self._frames: Dict[str, np.ndarray] = {}
+
+    def frame_names(self):
+        return self.frame_store.frame_names()
+
+    def read(self, name: str, grayscale: bool = False) -> Optional[np.ndarray]:
+        if name not in self._frames:
+            frame = self.frame_store.read(name)
+            if frame is None:
+                return None
+            # decoded up front so the timings below only measure the analysis
+            scale = self.height / frame.shape[0]
+            width = round(frame.shape[1] * scale)
+            self._frames[name] = cv2.resize(
+                frame, (width, self.height), interpolation=cv2.INTER_CUBIC
+            )
+        frame = self._frames[name]
+        return normalize_frame(frame) if grayscale else frame
+
+    def write(self, name: str, frame: np.ndarray) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def remove(self, name: str) -> None:
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    def encode(self, name: str) -> bytes:
+        frame = self.read(name)
+        if frame is None:
+            raise FileNotFoundError(f"Cannot load frame: {name}")
+        _, encoded = cv2.imencode(".jpg", frame)
+        return encoded.tobytes()
+
+    def destroy(self) -> None:
+        # the frames belong to the wrapped store, only drop the resized copies
+        self._frames.clear()
+
+
+def code_verdicts(
+    frame_store: FrameStore, names: List[str], analysis_height: Optional[int]
+) -> Tuple[List[bool], float]:
+    config = type(
+        "BenchmarkCodeDetectionConfig",
+        (CodeDetectionConfig,),
+        {"ANALYSIS_HEIGHT": analysis_height},
+    )
+    planner = DetectionPlanner(config)
+    frames = [frame_store.read(name) for name in names]
+
+    start = time.perf_counter()
+    verdicts = [
+        is_code_frame(
+            FrameAnalysis.from_image(downscale(frame, analysis_height), name),
+            config,
+            planner=planner,
+        )
+        for name, frame in zip(names, frames)
+    ]
+    return verdicts, time.perf_counter() - start
+
+
+def kept_frames(
+    frame_store: FrameStore, analysis_height: Optional[int], threshold: float
+) -> Tuple[List[str], float]:
+    config = type(
+        "BenchmarkDuplicateRemovalConfig",
+        (DuplicateRemovalConfig,),
+        {"ANALYSIS_HEIGHT": analysis_height},
+    )
+    kept, elapsed, _ = timed_duplicate_removal(frame_store, threshold, config=config)
+    return kept, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", required=True, help="folder of frame%%d.jpg files")
+    parser.add_argument("--source-height", type=int, default=None)
+    parser.add_argument("--heights", type=int, nargs="+", default=[360, 480, 720, 0])
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+
+    frame_store: FrameStore = DiskFrameStore(args.frames)
+    if args.source_height:
+        frame_store = UpscaledFrameStore(frame_store, args.source_height)
+    names = [name for name in frame_store.frame_names() if frame_store.read(name) is not None]
+
+    # 0 stands for the full frames, which every other height is compared against
+    full_verdicts, _ = code_verdicts(frame_store, names, None)
+    full_kept, _ = kept_frames(frame_store, None, args.threshold)
+    full_kept_set = set(full_kept)
+
+    print(
+        f"{'height':<8}{'code ms/frame':>14}{'code frames':>12}{'agree':>8}"
+        f"{'dedup s':>9}{'kept':>6}{'jaccard':>9}"
+    )
+    for height in args.heights:
+        analysis_height = height or None
+        verdicts, code_seconds = code_verdicts(frame_store, names, analysis_height)
+        kept, dedup_seconds = kept_frames(frame_store, analysis_height, args.threshold)
+
+        agree = sum(a == b for a, b in zip(verdicts, full_verdicts)) / max(1, len(names))
+        kept_set = set(kept)
+        jaccard = len(kept_set & full_kept_set) / max(1, len(kept_set | full_kept_set))
+        print(
+            f"{height or 'full':<8}{1000 * code_seconds / max(1, len(names)):>14.2f}"
+            f"{sum(verdicts):>12}{agree:>8.1%}{dedup_seconds:>9.2f}{len(kept):>6}{jaccard:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Throughput and character error rate of OCR backends against stored Vision output.
+
+OCRs the same frames with every backend and compares each frame's text with
+the Google Vision text stored for it, either in a JSON file mapping frame
+numbers to text (what `ExtractCodeFromFrames` prints and
+`create_file_with_video_name` writes) or, without one, the google_vision
+entries the artifact cache kept from earlier runs. Frames without a stored
+text are skipped. The character error rate is the edit distance to the stored
+text over its length, reported as is and with whitespace normalized, since
+indentation and spacing are where the backends differ most. The artifact cache
+is turned off while backends run so every frame is read. Run from the `src`
+folder:
+
+    python -m engine.benchmarks.ocr_backend_benchmark \
+        --frames <cropped frames> --expected expected_data/Level1/video.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..artifact_cache import (ArtifactCacheConfig, cache_key,
+                              get_artifact_cache, hash_bytes)
+from ..events.ocr_code_extraction import (OCR_BACKENDS,
+                                          GoogleVisionOCRBackend)
+from ..frame_store import DiskFrameStore, FrameStore
+
+
+def edit_distance(reference: str, text: str) -> int:
+    """Levenshtein distance, one numpy row per character of `reference`."""
+    if not reference or not text:
+        return len(reference) + len(text)
+    characters = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    offsets = np.arange(len(text) + 1)
+    previous = offsets
+    for i, character in enumerate(reference, 1):
+        current = np.empty_like(previous)
+        current[0] = i
+        current[1:] = np.minimum(previous[1:] + 1, previous[:-1] + (characters != ord(character)))
+        # insertions: current[j] = min over k <= j of current[k] + (j - k)
+        previous = np.minimum.accumulate(current - offsets) + offsets
+    return int(previous[-1])
+
+
+def normalize_whitespace(text: str) -> str:
+    lines = (re.sub(r"\s+", " ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def character_error_rate(references: List[str], texts: List[str]) -> float:
+    errors = sum(edit_distance(reference, text) for reference, text in zip(references, texts))
+    return errors / max(1, sum(len(reference) for reference in references))
+
+
+def stored_vision_texts(
+    frame_store: FrameStore, frame_names: List[str], expected: Optional[str]
+) -> Dict[str, str]:
+    """Stored Vision text of every frame that has one, keyed by frame name."""
+    if expected is not None:
+        with open(expected) as f:
+            by_number = json.load(f)
+        return {
+            frame_name: by_number[frame_name[len("frame") : -len(".png")]]
+            for frame_name in frame_names
+            if frame_name[len("frame") : -len(".png")] in by_number
+        }
+
+    cache = get_artifact_cache()
+    if cache is None:
+        return {}
+    texts = {}
+    for frame_name in frame_names:
+        text = cache.get_json(
+            "ocr",
+            cache_key(GoogleVisionOCRBackend.name, hash_bytes(frame_store.encode(frame_name))),
+        )
+        if text is not None:
+            texts[frame_name] = text
+    return texts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", required=True, help="folder of frame%%d.jpg files")
+    parser.add_argument("--expected", help="JSON of frame number -> Vision text, defaults to the artifact cache")
+    parser.add_argument("--limit", type=int, default=None, help="frames to OCR")
+    parser.add_argument(
+        "--backends", nargs="+", default=["tesseract"], choices=list(OCR_BACKENDS)
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--verbose", action="store_true", help="print every frame's error rate")
+    args = parser.parse_args()
+
+    frame_store = DiskFrameStore(args.frames)
+    frame_names = list(frame_store.frame_names())[: args.limit]
+    references = stored_vision_texts(frame_store, frame_names, args.expected)
+    if not references:
+        parser.error("no stored Vision text for these frames, pass --expected")
+    frame_names = [frame_name for frame_name in frame_names if frame_name in references]
+    ArtifactCacheConfig.ENABLED = False
+
+    print(f"{len(frame_names)} frames with stored Vision text")
+    print(f"{'backend':<22}{'workers':>8}{'seconds':>9}{'frames/s':>10}{'CER':>8}{'CER ws':>8}")
+    for name in args.backends:
+        for workers in args.workers:
+            backend_class = OCR_BACKENDS[name]
+
+            class Config(backend_class.config):
+                MAX_CONCURRENT_REQUESTS = workers
+                TESSERACT_WORKERS = workers
+
+            class Backend(backend_class):
+                config = Config
+
+            backend = Backend()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                texts = backend.extract_frames(frame_store, frame_names)
+            elapsed = time.perf_counter() - start
+
+            expected = [references[frame_name] for frame_name in frame_names]
+            found = [texts[frame_name] for frame_name in frame_names]
+            cer = character_error_rate(expected, found)
+            normalized_cer = character_error_rate(
+                [normalize_whitespace(text) for text in expected],
+                [normalize_whitespace(text) for text in found],
+            )
+            print(
+                f"{name:<22}{workers:>8}{elapsed:>9.2f}{len(frame_names) / elapsed:>10.1f}"
+                f"{cer:>8.3f}{normalized_cer:>8.3f}"
+            )
+            if args.verbose:
+                for frame_name, reference, text in zip(frame_names, expected, found):
+                    print(f"  {frame_name:<14} CER {character_error_rate([reference], [text]):.3f}")
+
+
+if __name__ == "__main__":
+    main()
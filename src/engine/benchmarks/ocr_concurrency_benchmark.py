@@ -0,0 +1,76 @@
+"""
+Wall-clock time of the Vision OCR stage at different levels of concurrency and batch sizes.
+
+Runs `GoogleVisionOCRBackend.extract_frames` over a folder of frames
+against `FakeImageAnnotatorClient`, which answers after a fixed latency and can
+throttle a share of requests, and checks every result came back for the right
+frame in frame order. The artifact cache is turned off so every frame is sent.
+Run from the `src` folder:
+
+    python -m engine.benchmarks.ocr_concurrency_benchmark \
+        --frames "videos/Is \"finally\" Useless In Python?" --latency 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import time
+
+from ..artifact_cache import ArtifactCacheConfig
+from ..events.ocr_code_extraction import GoogleVisionOCRBackend
+from ..events.ocr_code_extraction.config import OCRConfig
+from ..frame_store import DiskFrameStore
+from .fake_vision import FakeImageAnnotatorClient, fake_text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--frames", required=True, help="folder of frame%%d.jpg files")
+    parser.add_argument("--limit", type=int, default=40, help="frames to OCR")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--quota-error-rate", type=float, default=0.05)
+    parser.add_argument("--qps", type=float, default=None, help="None is unlimited")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+
+    ArtifactCacheConfig.ENABLED = False
+    frame_store = DiskFrameStore(args.frames)
+    frame_names = list(frame_store.frame_names())[: args.limit]
+    expected = {
+        name: fake_text(frame_store.encode(name))
+        for name in frame_names
+    }
+
+    print(f"{len(frame_names)} frames, {args.latency}s per request")
+    print(f"{'batch':>6}{'workers':>8}{'seconds':>9}{'requests':>10}{'throttled':>11}{'peak':>6}  in order")
+    for batch_size, workers in itertools.product(args.batch_sizes, args.workers):
+        client = FakeImageAnnotatorClient(args.latency, args.quota_error_rate)
+
+        class Config(OCRConfig):
+            MAX_CONCURRENT_REQUESTS = workers
+            MAX_QPS = args.qps
+            RETRY_BASE_DELAY = args.latency
+            MAX_IMAGES_PER_BATCH = batch_size
+
+        class Backend(GoogleVisionOCRBackend):
+            client_factory = staticmethod(lambda: client)
+            config = Config
+
+        backend = Backend()
+        start = time.perf_counter()
+        # retries print a line each, keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            texts = backend.extract_frames(frame_store, frame_names)
+        elapsed = time.perf_counter() - start
+
+        in_order = list(texts.items()) == list(expected.items())
+        print(
+            f"{batch_size:>6}{workers:>8}{elapsed:>9.2f}{client.requests:>10}{client.quota_errors:>11}"
+            f"{client.peak_in_flight:>6}  {in_order}"
+        )
+
+
+if __name__ == "__main__":
+    main()
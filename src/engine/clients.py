@@ -0,0 +1,82 @@
+"""
+Process-wide clients shared by every pipeline run.
+
+Building a Vision client, an LLM client or loading the code frame model costs a
+credential exchange, a connection pool or seconds of model loading, so stages
+used to pay for it on every run. These getters create each one on first use and
+hand the same instance to every run after that, including the concurrent runs of
+a batch. The Vision and OpenAI clients are thread safe; the model is guarded by
+`code_frame_model_lock` because Keras prediction is not.
+"""
+
+import os
+import threading
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from google.cloud import vision
+from google.oauth2 import service_account
+from openai import OpenAI
+
+from . import constants
+
+load_dotenv()
+
+LLM_BASE_URL = "https://api.deepseek.com"
+
+_lock = threading.Lock()
+_vision_client: Optional[vision.ImageAnnotatorClient] = None
+_llm_client: Optional[OpenAI] = None
+_code_frame_model: Optional[Any] = None
+
+code_frame_model_lock = threading.Lock()
+
+
+def get_vision_client() -> vision.ImageAnnotatorClient:
+    global _vision_client
+    with _lock:
+        if _vision_client is None:
+            credentials_info = {
+                "type": "service_account",
+                "project_id": os.getenv("GOOGLE_CLOUD_PROJECT_ID"),
+                "private_key_id": os.getenv("GOOGLE_CLOUD_PRIVATE_KEY_ID"),
+                "private_key": os.getenv("GOOGLE_CLOUD_PRIVATE_KEY").replace("\\n", "\n"),  # type: ignore
+                "client_email": os.getenv("GOOGLE_CLOUD_CLIENT_EMAIL"),
+                "client_id": os.getenv("GOOGLE_CLOUD_CLIENT_ID"),
+                "auth_uri": os.getenv("GOOGLE_CLOUD_AUTH_URI"),
+                "token_uri": os.getenv("GOOGLE_CLOUD_TOKEN_URI"),
+            }
+
+            credentials = service_account.Credentials.from_service_account_info(
+                credentials_info
+            )
+            _vision_client = vision.ImageAnnotatorClient(credentials=credentials)
+        return _vision_client
+
+
+def get_llm_client() -> OpenAI:
+    global _llm_client
+    with _lock:
+        if _llm_client is None:
+            _llm_client = OpenAI(
+                api_key=f"{os.getenv('DEEPSEEK_API_KEY')}",
+                base_url=LLM_BASE_URL,
+            )
+        return _llm_client
+
+
+def get_code_frame_model() -> Any:
+    """The Keras model used by RemoveNonCodeFramesWithModel, loaded once."""
+    global _code_frame_model
+    with _lock:
+        if _code_frame_model is None:
+            # imported here so processes that never use the model don't pay for loading Keras
+            import keras
+
+            _code_frame_model = keras.models.load_model(
+                constants.ML_MODEL_PATH, compile=False
+            )
+            assert (
+                _code_frame_model is not None
+            ), f"Failed to load model from {constants.ML_MODEL_PATH}"
+        return _code_frame_model
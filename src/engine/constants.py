@@ -15,3 +15,6 @@ DEFAULT_PROMPT_FILE = str(
 DEFAULT_CREATE_FILE_PROMPTS = str(
     pathlib.Path(Path(__file__).parent / "prompts" / "create_file_prompts.json")
 )
+EXTRACTION_PIPELINE_FILE = str(
+    pathlib.Path(Path(__file__).parent / "CodeExtractionPipeline.pty")
+)
@@ -11,9 +11,13 @@ from .crop_frames import CropFrames
 from .detect_bounding_box import DetectBoundingBox
 from .download_video import DownloadVideo
 from .frame_split import SplitVideoIntoFrames
-from .ocr_code_extraction import GoogleVisionExtractCodeFromFrames
+from .ocr_code_extraction import (ExtractCodeFromFrames,
+                                  GoogleVisionExtractCodeFromFrames,
+                                  GoogleVisionExtractCodeFromMontages,
+                                  IncrementalExtractCodeFromFrames)
 from .reconstruction import CreateProject, LLMParse
-from .remove_duplicates import RemoveDuplicates
+from .text_compaction import CompactOCRText
+from .duplicate_removal import RemoveDuplicates
 
 __all__ = [
     "CropFrames",
@@ -23,7 +27,11 @@ __all__ = [
     "LLMParse",
     "CreateProject",
     "RemoveDuplicates",
+    "ExtractCodeFromFrames",
     "GoogleVisionExtractCodeFromFrames",
+    "GoogleVisionExtractCodeFromMontages",
+    "IncrementalExtractCodeFromFrames",
+    "CompactOCRText",
     # Code frame filtering events
     "RemoveNonCodeFramesRuleBased",
     "RemoveNonCodeFramesWithModel",
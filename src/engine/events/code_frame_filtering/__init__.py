@@ -7,13 +7,16 @@ and structural pattern recognition.
 """
 
 from .config import CodeDetectionConfig
-from .detectors import is_code_frame
+from .detectors import DetectionPlanner, is_code_frame
+from .frame_analysis import FrameAnalysis
 from .rule_based_filter import RemoveNonCodeFramesRuleBased
 from .model_based_filter import RemoveNonCodeFramesWithModel
 
 __all__ = [
     "CodeDetectionConfig",
     "is_code_frame",
+    "DetectionPlanner",
+    "FrameAnalysis",
     "RemoveNonCodeFramesRuleBased",
     "RemoveNonCodeFramesWithModel",
 ]
\ No newline at end of file
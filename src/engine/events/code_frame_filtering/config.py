@@ -37,5 +37,25 @@ class CodeDetectionConfig:
     }
 
     FINAL_THRESHOLD = 0.5
+
+    # Evaluation planning
+    # Per-frame cost of each detector in milliseconds on a 640x360 frame. Used to
+    # order detectors until the planner has timed them on real frames.
+    DETECTOR_COST_HINTS = {
+        "monospace": 1.5,
+        "syntax_colors": 1.0,
+        "structure": 5.0,
+        "line_numbers": 0.2,
+        "dark_theme": 0.3,
+    }
+    COST_SMOOTHING = 0.2  # weight of the newest timing in the running cost average
+
+    # Frames are analysed on a copy no taller than this, None analyses full frames
+    ANALYSIS_HEIGHT = None
+
+    # Parallel execution
+    MAX_WORKERS = None  # None uses the scheduler's whole process pool, 1 scores frames in-process
+    CHUNK_SIZE = None  # frames per pool task, None sizes chunks from the frame count
+    PREFETCH_PER_WORKER = 2  # streamed frames in flight per worker
     MIN_COLOR_RATIO = 0.05
     MAX_WIDTH_VARIANCE = 20
\ No newline at end of file
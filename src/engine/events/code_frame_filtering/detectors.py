@@ -3,19 +3,47 @@ Core detection functions for identifying code frames in images.
 
 This module contains all the computer vision algorithms used to detect
 various characteristics of code frames including monospace text, syntax
-highlighting, indentation patterns, line numbers, and dark themes.
+highlighting, indentation patterns, line numbers, and dark themes, plus the
+planner that decides which of them need to run for a given frame.
 """
 
+import time
 from pathlib import Path
-from typing import Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import cv2
 import numpy as np
 
 from .config import CodeDetectionConfig
+from .frame_analysis import FrameAnalysis
 
+FrameSource = Union[str, Path, FrameAnalysis]
 
-def detect_monospace_text(image_path: Union[str, Path], config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
+
+def _contour_areas_and_widths(contours) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute `cv2.contourArea` and the `cv2.boundingRect` width of every contour at once.
+
+    All contour points are concatenated into one array and each contour is reduced
+    as a segment of it: the shoelace formula gives the polygon area and the x
+    extent gives the bounding box width, matching the OpenCV functions exactly.
+    """
+    lengths = np.fromiter(map(len, contours), dtype=np.intp, count=len(contours))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    points = np.concatenate(contours).reshape(-1, 2).astype(np.float64)
+    x, y = points[:, 0], points[:, 1]
+
+    # index of the next vertex, wrapping the last vertex of each contour to its first
+    following = np.arange(1, len(points) + 1)
+    following[starts + lengths - 1] = starts
+
+    cross = x * y[following] - x[following] * y
+    areas = np.abs(np.add.reduceat(cross, starts)) / 2
+    widths = np.maximum.reduceat(x, starts) - np.minimum.reduceat(x, starts) + 1
+    return areas, widths
+
+
+def detect_monospace_text(frame: FrameSource, config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
     """
     Detect if image contains monospace text by analyzing character width consistency.
 
@@ -24,37 +52,34 @@ def detect_monospace_text(image_path: Union[str, Path], config: type[CodeDetecti
     monospace fonts used in code editors and terminals.
 
     Args:
-        image_path: Path to the image file.
+        frame: Path to the image file or a shared FrameAnalysis.
         config: Configuration object with detection parameters.
 
     Returns:
         1 if monospace text detected (width variance < threshold), 0 otherwise.
     """
-    img = cv2.imread(str(image_path))
-    if img is None:
+    gray = FrameAnalysis.ensure(frame).gray
+    if gray is None:
         return 0
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
     _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
     contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-    text_contours = [
-        c
-        for c in contours
-        if config.MIN_CONTOUR_AREA < cv2.contourArea(c) < config.MAX_CONTOUR_AREA
-    ]
+    if len(contours) < config.MIN_TEXT_CONTOURS:
+        return 0
+
+    areas, widths = _contour_areas_and_widths(contours)
+    is_text = (areas > config.MIN_CONTOUR_AREA) & (areas < config.MAX_CONTOUR_AREA)
 
-    if len(text_contours) < config.MIN_TEXT_CONTOURS:
+    if np.count_nonzero(is_text) < config.MIN_TEXT_CONTOURS:
         return 0
 
-    widths = [cv2.boundingRect(c)[2] for c in text_contours]
-    width_variance = np.var(widths)
+    width_variance = np.var(widths[is_text])
 
     return 1 if width_variance < config.MAX_WIDTH_VARIANCE else 0
 
 
-def detect_programming_colors(image_path: Union[str, Path], config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
+def detect_programming_colors(frame: FrameSource, config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
     """
     Detect syntax highlighting colors commonly used in code editors.
 
@@ -64,19 +89,17 @@ def detect_programming_colors(image_path: Union[str, Path], config: type[CodeDet
     is present.
 
     Args:
-        image_path: Path to the image file.
+        frame: Path to the image file or a shared FrameAnalysis.
         config: Configuration with color ranges and thresholds.
 
     Returns:
         1 if syntax highlighting colors detected (ratio > threshold), 0 otherwise.
     """
-    img = cv2.imread(str(image_path))
-    if img is None:
+    hsv = FrameAnalysis.ensure(frame).hsv
+    if hsv is None:
         return 0
 
-    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-
-    total_pixels = img.shape[0] * img.shape[1]
+    total_pixels = hsv.shape[0] * hsv.shape[1]
     color_pixels = 0
 
     color_ranges = [config.BLUE_RANGE, config.GREEN_RANGE, config.PURPLE_RANGE]
@@ -89,7 +112,7 @@ def detect_programming_colors(image_path: Union[str, Path], config: type[CodeDet
     return 1 if color_ratio > config.MIN_COLOR_RATIO else 0
 
 
-def detect_indentation_patterns(image_path: Union[str, Path], config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
+def detect_indentation_patterns(frame: FrameSource, config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
     """
     Detect code indentation patterns by finding vertical lines in the image.
 
@@ -98,13 +121,13 @@ def detect_indentation_patterns(image_path: Union[str, Path], config: type[CodeD
     and block structure. Counts lines that are nearly vertical (within tolerance).
 
     Args:
-        image_path: Path to the image file.
+        frame: Path to the image file or a shared FrameAnalysis.
         config: Configuration with line detection parameters.
 
     Returns:
         1 if sufficient vertical lines detected (indicating code structure), 0 otherwise.
     """
-    img = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+    img = FrameAnalysis.ensure(frame).gray
     if img is None:
         return 0
 
@@ -123,7 +146,7 @@ def detect_indentation_patterns(image_path: Union[str, Path], config: type[CodeD
     return 1 if vertical_lines > config.MIN_VERTICAL_LINES else 0
 
 
-def detect_line_numbers(image_path: Union[str, Path], config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
+def detect_line_numbers(frame: FrameSource, config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
     """
     Detect line numbers in the left margin of code editors.
 
@@ -133,40 +156,39 @@ def detect_line_numbers(image_path: Union[str, Path], config: type[CodeDetection
     characteristic of sequential line numbering.
 
     Args:
-        image_path: Path to the image file.
+        frame: Path to the image file or a shared FrameAnalysis.
         config: Configuration with line number detection parameters.
 
     Returns:
         1 if consistent line number pattern detected, 0 otherwise.
     """
-    img = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+    img = FrameAnalysis.ensure(frame).gray
     if img is None:
         return 0
 
     h, w = img.shape
     left_region = img[:, : int(w * config.LINE_NUMBER_REGION_WIDTH)]
 
-    horizontal_projection = np.sum(left_region < 128, axis=1)
+    horizontal_projection = np.count_nonzero(left_region < 128, axis=1)
 
-    peaks = []
-    for i in range(1, len(horizontal_projection) - 1):
-        if (
-            horizontal_projection[i] > horizontal_projection[i - 1]
-            and horizontal_projection[i] > horizontal_projection[i + 1]
-            and horizontal_projection[i] > config.MIN_DARK_PIXELS_PER_LINE
-        ):
-            peaks.append(i)
+    # a row is a peak when it beats both neighbours, compared via shifted views
+    rows = horizontal_projection[1:-1]
+    is_peak = (
+        (rows > horizontal_projection[:-2])
+        & (rows > horizontal_projection[2:])
+        & (rows > config.MIN_DARK_PIXELS_PER_LINE)
+    )
+    peaks = np.flatnonzero(is_peak) + 1
 
-    if len(peaks) < config.MIN_LINES_FOR_DETECTION:
+    if peaks.size < config.MIN_LINES_FOR_DETECTION:
         return 0
 
-    spacings = [peaks[i + 1] - peaks[i] for i in range(len(peaks) - 1)]
-    spacing_variance = np.var(spacings)
+    spacing_variance = np.var(np.diff(peaks))
 
     return 1 if spacing_variance < config.MAX_SPACING_VARIANCE else 0
 
 
-def detect_dark_background(image_path: Union[str, Path], config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
+def detect_dark_background(frame: FrameSource, config: type[CodeDetectionConfig] = CodeDetectionConfig) -> int:
     """
     Detect dark theme background commonly used in code editors.
 
@@ -175,72 +197,153 @@ def detect_dark_background(image_path: Union[str, Path], config: type[CodeDetect
     which helps distinguish code editors from bright web pages or documents.
 
     Args:
-        image_path: Path to the image file.
+        frame: Path to the image file or a shared FrameAnalysis.
         config: Configuration with brightness threshold.
 
     Returns:
         1 if dark theme detected (mean brightness < threshold), 0 otherwise.
     """
-    img = cv2.imread(str(image_path))
-    if img is None:
+    gray = FrameAnalysis.ensure(frame).gray
+    if gray is None:
         return 0
 
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     mean_brightness = np.mean(gray)
 
     return 1 if mean_brightness < config.DARK_THEME_BRIGHTNESS_THRESHOLD else 0
 
 
-def is_code_frame(image_path: Union[str, Path], config: type[CodeDetectionConfig] = CodeDetectionConfig, verbose: bool = False) -> bool:
+DETECTORS = {
+    "monospace": detect_monospace_text,
+    "syntax_colors": detect_programming_colors,
+    "structure": detect_indentation_patterns,
+    "line_numbers": detect_line_numbers,
+    "dark_theme": detect_dark_background,
+}
+
+
+class DetectionPlanner:
+    """
+    Decides which detectors to run on a frame and in which order.
+
+    Detectors with a zero weight are never run. The rest are ordered by their
+    measured cost per unit of weight, so cheap detectors that can move the score
+    a lot go first, and evaluation stops as soon as the remaining weights can no
+    longer push the score across `FINAL_THRESHOLD`. Costs start from
+    `DETECTOR_COST_HINTS` and are replaced by a running average of real timings,
+    so one planner should be reused across the frames of a run.
+    """
+
+    def __init__(self, config: type[CodeDetectionConfig] = CodeDetectionConfig):
+        self.config = config
+        self.active = [name for name in DETECTORS if config.WEIGHTS[name] > 0]
+        self.costs: Dict[str, float] = {
+            name: config.DETECTOR_COST_HINTS[name] for name in self.active
+        }
+        self._timed: Set[str] = set()
+        self.frames = 0
+        self.calls = 0
+        self.skipped = 0
+
+    def plan(self) -> List[str]:
+        """Active detectors, most score per millisecond first."""
+        return sorted(
+            self.active, key=lambda name: self.costs[name] / self.config.WEIGHTS[name]
+        )
+
+    def evaluate(
+        self, frame: FrameSource
+    ) -> Tuple[bool, float, Dict[str, Optional[int]]]:
+        """
+        Score a frame, skipping detectors whose result cannot change the outcome.
+
+        Args:
+            frame: Path to image file or a FrameAnalysis shared across detectors.
+
+        Returns:
+            Tuple of (is_code, score, results) where results maps every detector
+            name to its 0/1 result, or None if it was not run.
+        """
+        frame = FrameAnalysis.ensure(frame)
+        # decode up front so the first detector is not charged for it
+        frame.bgr
+
+        weights = self.config.WEIGHTS
+        threshold = self.config.FINAL_THRESHOLD
+        results: Dict[str, Optional[int]] = {name: None for name in DETECTORS}
+        score = 0.0
+        remaining = sum(weights[name] for name in self.active)
+
+        for name in self.plan():
+            if score > threshold or score + remaining <= threshold:
+                break
+
+            start = time.perf_counter()
+            results[name] = DETECTORS[name](frame, self.config)
+            self._record_cost(name, (time.perf_counter() - start) * 1000)
+
+            score += results[name] * weights[name]
+            remaining -= weights[name]
+
+        ran = sum(result is not None for result in results.values())
+        self.frames += 1
+        self.calls += ran
+        self.skipped += len(DETECTORS) - ran
+
+        return score > threshold, score, results
+
+    def _record_cost(self, name: str, elapsed_ms: float) -> None:
+        if name not in self._timed:
+            self.costs[name] = elapsed_ms
+            self._timed.add(name)
+            return
+        smoothing = self.config.COST_SMOOTHING
+        self.costs[name] = (1 - smoothing) * self.costs[name] + smoothing * elapsed_ms
+
+
+def is_code_frame(
+    frame: FrameSource,
+    config: type[CodeDetectionConfig] = CodeDetectionConfig,
+    verbose: bool = False,
+    planner: Optional[DetectionPlanner] = None,
+) -> bool:
     """
     Main function to detect if an image contains code.
 
-    Runs all detection algorithms and combines their results using weighted scoring
-    to determine if the image contains code. Each detection method contributes to
-    a final score that is compared against a threshold.
+    Combines the detector results using weighted scoring to determine if the image
+    contains code. Each detection method contributes to a final score that is
+    compared against a threshold. The frame is decoded once and shared by every
+    detector, and a DetectionPlanner skips detectors that cannot change the result.
 
     Args:
-        image_path: Path to image file
+        frame: Path to image file or a FrameAnalysis shared across detectors
         config: Configuration object with detection parameters
         verbose: If True, print detailed results
+        planner: Planner to reuse across frames so its cost measurements carry
+            over. A fresh one is created when omitted.
 
     Returns:
         True if image is detected as code frame, False otherwise
     """
     try:
-        has_monospace = detect_monospace_text(image_path, config)
-        has_syntax_colors = detect_programming_colors(image_path, config)
-        has_code_structure = detect_indentation_patterns(image_path, config)
-        has_line_numbers = detect_line_numbers(image_path, config)
-        has_dark_theme = detect_dark_background(image_path, config)
-
-        score = (
-            has_monospace * config.WEIGHTS["monospace"]
-            + has_syntax_colors * config.WEIGHTS["syntax_colors"]
-            + has_code_structure * config.WEIGHTS["structure"]
-            + has_line_numbers * config.WEIGHTS["line_numbers"]
-            + has_dark_theme * config.WEIGHTS["dark_theme"]
-        )
+        frame = FrameAnalysis.ensure(frame)
+        if planner is None:
+            planner = DetectionPlanner(config)
 
-        is_code = score > config.FINAL_THRESHOLD
+        is_code, score, results = planner.evaluate(frame)
 
         if verbose:
-            print(f"\n=== Code Detection Results for {Path(image_path).name} ===")
-            print(
-                f"Monospace text:     {'✓' if has_monospace else '✗'} (weight: {config.WEIGHTS['monospace']})"
-            )
-            print(
-                f"Syntax colors:      {'✓' if has_syntax_colors else '✗'} (weight: {config.WEIGHTS['syntax_colors']})"
-            )
-            print(
-                f"Code structure:     {'✓' if has_code_structure else '✗'} (weight: {config.WEIGHTS['structure']})"
-            )
-            print(
-                f"Line numbers:       {'✓' if has_line_numbers else '✗'} (weight: {config.WEIGHTS['line_numbers']})"
-            )
-            print(
-                f"Dark theme:         {'✓' if has_dark_theme else '✗'} (weight: {config.WEIGHTS['dark_theme']})"
-            )
+            labels = {
+                "monospace": "Monospace text:",
+                "syntax_colors": "Syntax colors:",
+                "structure": "Code structure:",
+                "line_numbers": "Line numbers:",
+                "dark_theme": "Dark theme:",
+            }
+            print(f"\n=== Code Detection Results for {frame.name} ===")
+            for name, label in labels.items():
+                result = results[name]
+                mark = "-" if result is None else ("✓" if result else "✗")
+                print(f"{label:<20}{mark} (weight: {config.WEIGHTS[name]})")
             print(f"\nFinal score:        {score:.3f}")
             print(f"Threshold:          {config.FINAL_THRESHOLD}")
             print(
@@ -251,5 +354,5 @@ def is_code_frame(image_path: Union[str, Path], config: type[CodeDetectionConfig
 
     except Exception as e:
         if verbose:
-            print(f"Error processing {image_path}: {e}")
+            print(f"Error processing {frame}: {e}")
         return False
@@ -0,0 +1,76 @@
+"""
+Per-frame image cache shared by the code frame detectors.
+
+Every detector in `detectors.py` needs the same frame in a different color
+space. `FrameAnalysis` decodes the frame once and derives the BGR, grayscale
+and HSV views on first access, so running all detectors on one frame costs a
+single decode instead of one per detector.
+"""
+
+from pathlib import Path
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+
+
+class FrameAnalysis:
+    """
+    Lazily decoded view of a single frame.
+
+    The frame is only read from disk the first time one of the image properties
+    is accessed. Derived color spaces are computed on demand and kept for the
+    lifetime of the object, so one instance should be built per frame and
+    shared by every detector that inspects it.
+    """
+
+    def __init__(self, image_path: Union[str, Path]):
+        self.image_path = Path(image_path)
+        self._decoded = False
+        self._bgr: Optional[np.ndarray] = None
+        self._gray: Optional[np.ndarray] = None
+        self._hsv: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_image(
+        cls, image: np.ndarray, image_path: Union[str, Path] = "<memory>"
+    ) -> "FrameAnalysis":
+        """Wrap a frame that is already decoded, in BGR order."""
+        analysis = cls(image_path)
+        analysis._bgr = image
+        analysis._decoded = True
+        return analysis
+
+    @classmethod
+    def ensure(cls, frame: Union[str, Path, "FrameAnalysis"]) -> "FrameAnalysis":
+        """Return `frame` unchanged if it is already a FrameAnalysis, otherwise wrap the path."""
+        if isinstance(frame, cls):
+            return frame
+        return cls(frame)
+
+    def __str__(self) -> str:
+        return str(self.image_path)
+
+    @property
+    def name(self) -> str:
+        return self.image_path.name
+
+    @property
+    def bgr(self) -> Optional[np.ndarray]:
+        """The decoded frame in BGR order, or None if it could not be read."""
+        if not self._decoded:
+            self._bgr = cv2.imread(str(self.image_path))
+            self._decoded = True
+        return self._bgr
+
+    @property
+    def gray(self) -> Optional[np.ndarray]:
+        if self._gray is None and self.bgr is not None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def hsv(self) -> Optional[np.ndarray]:
+        if self._hsv is None and self.bgr is not None:
+            self._hsv = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+        return self._hsv
@@ -9,7 +9,6 @@ import pathlib
 from typing import Tuple, cast
 
 import cv2 as cv
-import keras
 import numpy as np
 from event_pipeline.base import EventBase
 from keras.models import Model
@@ -18,7 +17,9 @@ from llist import sllist as linkedlist
 
 from ... import constants
 from ... import utils
+from ...clients import code_frame_model_lock, get_code_frame_model
 from ...models import frame_split_type
+from ...scheduler import CPUStageExecutor
 
 
 class RemoveNonCodeFramesWithModel(EventBase):
@@ -29,6 +30,8 @@ class RemoveNonCodeFramesWithModel(EventBase):
     containing code or not. The model was originally from PS2CODE but has been
     noted to have lower accuracy than the rule-based approach.
     """
+
+    executor = CPUStageExecutor
     
     def process(self) -> Tuple[bool, frame_split_type.FrameSplitReturnType]:
         """
@@ -42,13 +45,12 @@ class RemoveNonCodeFramesWithModel(EventBase):
         )
         
         try:
-            model = cast(
-                Model, keras.models.load_model(constants.ML_MODEL_PATH, compile=False)
-            )
-            assert model is not None, f"Failed to load model from {constants.ML_MODEL_PATH}"
+            model = cast(Model, get_code_frame_model())
 
             images = self.load_images_as_np_array(video_frames_info_obj)
-            predictions = model.predict(images)
+            # the model is shared by every run in the process
+            with code_frame_model_lock:
+                predictions = model.predict(images)
             
             # Filter frames based on model predictions
             filtered_frames = self._filter_frames_by_predictions(
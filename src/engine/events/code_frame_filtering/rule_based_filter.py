@@ -1,36 +1,180 @@
-import pathlib
-from typing import Tuple
+import os
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from typing import Deque, Iterable, List, Optional, Tuple
+
+import numpy as np
 
 from event_pipeline.base import EventBase
 from llist import sllist as linkedlist
 
 from ... import utils
+from ...frame_normalization import normalize_frame
+from ...frame_store import FrameStore
 from ...models import frame_split_type
+from ...scheduler import CPUStageExecutor, worker_process_pool
 
 from .config import CodeDetectionConfig
-from .detectors import is_code_frame
+from .detectors import DETECTORS, DetectionPlanner, is_code_frame
+from .frame_analysis import FrameAnalysis
+
+# one planner per process so detector timings carry over between frames
+_planner: Optional[DetectionPlanner] = None
+
+
+def _score_image(
+    frame_name: str, frame: np.ndarray, config: type[CodeDetectionConfig]
+) -> Tuple[bool, int]:
+    global _planner
+    if _planner is None or _planner.config is not config:
+        _planner = DetectionPlanner(config)
+
+    skipped_before = _planner.skipped
+    # one decode per frame, shared by every detector in is_code_frame; the detectors
+    # need color for the syntax check, so the working copy is only downscaled
+    working = normalize_frame(frame, config.ANALYSIS_HEIGHT, grayscale=False)
+    is_code = is_code_frame(
+        FrameAnalysis.from_image(working, frame_name), config, planner=_planner
+    )
+    return is_code, _planner.skipped - skipped_before
+
+
+def _score_frame(
+    frame_name: str, frame_store: FrameStore, config: type[CodeDetectionConfig]
+) -> Tuple[bool, int]:
+    frame = frame_store.read(frame_name)
+    if frame is None:
+        raise FileNotFoundError(f"Cannot load frame: {frame_name}")
+    return _score_image(frame_name, frame, config)
 
 
 class RemoveNonCodeFramesRuleBased(EventBase):
+    executor = CPUStageExecutor
+
     def process(self) -> Tuple[bool, frame_split_type.FrameSplitReturnType]:
 
         video_frames_info_obj: frame_split_type.FrameSplitReturnType = (
             self.previous_result.first().content  # type:ignore
         )
 
-        frames: linkedlist = utils.load_frame_names(video_frames_info_obj)
+        if getattr(video_frames_info_obj, "filtered", False):
+            print("Frames restored from the artifact cache are already filtered")
+            return True, video_frames_info_obj
 
-        current_frame = frames.first
-        assert current_frame is not None, "Failed to load frame names"
+        frame_store = utils.get_frame_store(video_frames_info_obj)
+        if getattr(video_frames_info_obj, "frame_stream", None) is not None:
+            return True, self.filter_frame_stream(video_frames_info_obj, frame_store)
 
-        while current_frame is not None:
-            frame_path = pathlib.Path(
-                video_frames_info_obj.frames_path, current_frame.value
-            )
+        frames: linkedlist = frame_store.frame_names()
+        assert frames.first is not None, "Failed to load frame names"
+
+        frame_names = list(frames)
+        verdicts = self.score_frames(frame_names, frame_store, CodeDetectionConfig)
 
-            if not is_code_frame(frame_path, CodeDetectionConfig):
-                utils.remove_thing_based_on_type(str(frame_path))
+        # deletions happen after scoring so they are applied in frame order
+        for frame_name, (is_code, _) in zip(frame_names, verdicts):
+            if not is_code:
+                frame_store.remove(frame_name)
 
-            current_frame = current_frame.next
+        skipped = sum(skipped for _, skipped in verdicts)
+        print(
+            f"Detector planner skipped {skipped}/{len(frame_names) * len(DETECTORS)} detector calls"
+        )
 
         return True, video_frames_info_obj
+
+    @staticmethod
+    def filter_frame_stream(
+        video_frames_info_obj: frame_split_type.FrameSplitReturnType,
+        frame_store: FrameStore,
+    ) -> frame_split_type.FrameSplitReturnType:
+        """Score frames while they are still being decoded and store only the code frames."""
+        frame_stream = video_frames_info_obj.frame_stream
+        video_frames_info_obj.frame_stream = None
+
+        verdicts = RemoveNonCodeFramesRuleBased.score_frame_stream(
+            frame_stream, CodeDetectionConfig
+        )
+        total = kept = skipped = 0
+        try:
+            for frame_name, frame, (is_code, frame_skipped) in verdicts:
+                total += 1
+                skipped += frame_skipped
+                if is_code:
+                    kept += 1
+                    frame_store.write(frame_name, frame)
+        finally:
+            frame_stream.close()
+
+        assert total > 0, "No frames were decoded from the video"
+        print(f"Kept {kept}/{total} streamed frames as code frames")
+        print(
+            f"Detector planner skipped {skipped}/{total * len(DETECTORS)} detector calls"
+        )
+        return video_frames_info_obj
+
+    @staticmethod
+    def score_frame_stream(
+        frames: Iterable[Tuple[str, np.ndarray]], config: type[CodeDetectionConfig]
+    ) -> Iterable[Tuple[str, np.ndarray, Tuple[bool, int]]]:
+        """
+        Score frames as they arrive, yielding each frame with its verdict in order.
+
+        With more than one worker, up to `workers * PREFETCH_PER_WORKER` frames are
+        scored in the pool at once, so memory stays bounded however long the
+        video is.
+        """
+        workers = config.MAX_WORKERS or os.cpu_count() or 1
+        if workers <= 1:
+            for frame_name, frame in frames:
+                yield frame_name, frame, _score_image(frame_name, frame, config)
+            return
+
+        pending: Deque[Tuple[str, np.ndarray, Future]] = deque()
+        with worker_process_pool(workers) as executor:
+            for frame_name, frame in frames:
+                pending.append(
+                    (frame_name, frame, executor.submit(_score_image, frame_name, frame, config))
+                )
+                if len(pending) >= executor.max_workers * config.PREFETCH_PER_WORKER:
+                    frame_name, frame, future = pending.popleft()
+                    yield frame_name, frame, future.result()
+            while pending:
+                frame_name, frame, future = pending.popleft()
+                yield frame_name, frame, future.result()
+
+    @staticmethod
+    def score_frames(
+        frame_names: List[str],
+        frame_store: FrameStore,
+        config: type[CodeDetectionConfig],
+    ) -> List[Tuple[bool, int]]:
+        """
+        Score every frame with `is_code_frame`, fanning out over a process pool.
+
+        Frames are independent, so they are dispatched in chunks to keep the
+        per-task pickling overhead small. Results come back in the same order
+        as `frame_names`.
+
+        Args:
+            frame_names: Names of the frames to score.
+            frame_store: Store the frames are read from; worker processes
+                reopen it from its pickled form.
+            config: Configuration with detection and pool parameters.
+
+        Returns:
+            One (is_code, skipped_detector_calls) pair per frame.
+        """
+        score = partial(_score_frame, frame_store=frame_store, config=config)
+        workers = config.MAX_WORKERS or os.cpu_count() or 1
+        workers = min(workers, len(frame_names))
+
+        if workers <= 1:
+            return [score(frame_name) for frame_name in frame_names]
+
+        with worker_process_pool(workers) as executor:
+            chunk_size = config.CHUNK_SIZE or max(
+                1, len(frame_names) // (executor.max_workers * 4)
+            )
+            return list(executor.map(score, frame_names, chunksize=chunk_size))
@@ -1,19 +1,24 @@
-import pathlib
 from typing import Tuple
 
 import bounding_box_detector_pkg as bbox
-import cv2 as cv
 from event_pipeline.base import EventBase
 
 from .. import utils
 from ..models import frame_split_type
+from ..scheduler import CPUStageExecutor
 
 
 class CropFrames(EventBase):
+    executor = CPUStageExecutor
+
     def process(self) -> Tuple[bool, frame_split_type.FrameSplitReturnType]:
         bounding_box_details: bbox.BoundingBoxReturnType = (
             self.previous_result.first().content  # type:ignore
         )
+        # frames cropped by ffmpeg while decoding come straight through DetectBoundingBox
+        if isinstance(bounding_box_details, frame_split_type.FrameSplitReturnType):
+            utils.cache_filtered_frames(bounding_box_details, bounding_box_details.crop_box)
+            return True, bounding_box_details
 
         video_frames_details_obj: frame_split_type.FrameSplitReturnType = (
             bounding_box_details.returnType
@@ -24,31 +29,27 @@ class CropFrames(EventBase):
             bounding_box_details.x2,
             bounding_box_details.y2,
         )
-        frame_names = utils.load_frame_names(video_frames_details_obj)
+        frame_store = utils.get_frame_store(video_frames_details_obj)
+        frame_names = frame_store.frame_names()
 
         reference = frame_names.first
         while reference is not None and reference.next is not None:
             try:
-                file_path = str(
-                    pathlib.Path(
-                        video_frames_details_obj.frames_path,
-                        reference.value,
-                    )
-                )
-
-                reference_img = cv.imread(file_path)
+                reference_img = frame_store.read(reference.value)
                 if reference_img is None:
                     raise FileNotFoundError(
-                        f"Cannot load frame: {str(pathlib.Path(video_frames_details_obj.frames_path, reference.value))}"
+                        f"Cannot load frame: {reference.value}"
                     )
                 else:
                     crop_img = reference_img[y1:y2, x1:x2]
-                    utils.remove_thing_based_on_type(file_path)
+                    frame_store.remove(reference.value)
                     print("image get's cropped")
-                    cv.imwrite(file_path, crop_img)
+                    frame_store.write(reference.value, crop_img)
                 reference = reference.next
 
             except Exception as e:
                 print(f"Error processing frame {reference.value}: {e}")
                 reference = reference.next
+
+        utils.cache_filtered_frames(video_frames_details_obj, (x1, y1, x2, y2))
         return True, video_frames_details_obj
@@ -1,27 +1,52 @@
-from typing import Tuple
+import tempfile
+from typing import Tuple, Union
 
 import bounding_box_detector_pkg as bbox
 from event_pipeline.base import EventBase
 
+from .. import utils
+from ..frame_store import DiskFrameStore
 from ..models import frame_split_type
+from ..scheduler import CPUStageExecutor
 
 
 class DetectBoundingBox(EventBase):
+    executor = CPUStageExecutor
+
     # TODO: add the VID2XML one and then have a test for that too to show the level of accuracy you
     # get in the output(with respect AI model that they are using)
     def process(
         self,
-    ) -> Tuple[bool, bbox.BoundingBoxReturnType]:
+    ) -> Tuple[
+        bool, Union[bbox.BoundingBoxReturnType, frame_split_type.FrameSplitReturnType]
+    ]:
         """
         This function detects the bounding box of the video.
         It does this by using the `detectBoundingBox` function from the `bounding_box_detector_pkg` module.
         The module is adapted from PS2CODE's work. I packaged it in a different way so that I can use it in my pipeline.
+        When the frames were already cropped while decoding, they are passed through unchanged.
         """
 
         frameSplitReturn: frame_split_type.FrameSplitReturnType = (
             self.previous_result.first().content  # type:ignore
         )
-        # TODO:check to see what the accuracy of this is
-        result: bbox.BoundingBoxReturnType = bbox.detectBoundingBox(frameSplitReturn)
+        if getattr(frameSplitReturn, "crop_box", None) is not None:
+            print(f"Frames already cropped to {frameSplitReturn.crop_box} while decoding")
+            return True, frameSplitReturn
+        frame_store = utils.get_frame_store(frameSplitReturn)
+        if isinstance(frame_store, DiskFrameStore):
+            # TODO:check to see what the accuracy of this is
+            result: bbox.BoundingBoxReturnType = bbox.detectBoundingBox(frameSplitReturn)
+            return True, result
+
+        # the detector reads JPEG files from frames_path, so give it a copy on disk
+        with tempfile.TemporaryDirectory() as frames_dir:
+            frame_store.export(frames_dir)
+            result = bbox.detectBoundingBox(
+                frame_split_type.FrameSplitReturnType(
+                    frameSplitReturn.returnType, frames_dir
+                )
+            )
+        result.returnType = frameSplitReturn
 
         return True, result
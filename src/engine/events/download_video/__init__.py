@@ -0,0 +1,16 @@
+"""
+Downloading the video of a YouTube link for the rest of the pipeline.
+"""
+
+from .local_source import LocalStream, LocalYouTube
+from .policy import DownloadPolicy, requires_resolution, select_stream
+from .youtube_download import DownloadVideo
+
+__all__ = [
+    "DownloadPolicy",
+    "DownloadVideo",
+    "LocalStream",
+    "LocalYouTube",
+    "requires_resolution",
+    "select_stream",
+]
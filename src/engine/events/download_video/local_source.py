@@ -0,0 +1,73 @@
+"""
+Stand-in for `pytubefix.YouTube` that serves a video file from disk.
+
+Assign it to `DownloadVideo.youtube_factory` to run the pipeline on a local
+fixture without network access, e.g.
+
+    DownloadVideo.youtube_factory = LocalYouTube.factory({"https://youtu.be/x": "fixture.mp4"})
+"""
+
+import pathlib
+import shutil
+from typing import Callable, Dict, List, Optional, Union
+
+
+class LocalStream:
+    """The subset of `pytubefix.Stream` that DownloadVideo uses."""
+
+    def __init__(
+        self,
+        source: Union[str, pathlib.Path],
+        resolution: str = "720p",
+        bitrate: int = 0,
+        includes_audio_track: bool = False,
+        subtype: str = "mp4",
+    ):
+        self.source = pathlib.Path(source)
+        self.resolution = resolution
+        self.bitrate = bitrate
+        self.includes_audio_track = includes_audio_track
+        self.subtype = subtype
+
+    def download(
+        self,
+        output_path: str,
+        filename: Optional[str] = None,
+        filename_prefix: Optional[str] = None,
+    ) -> str:
+        destination = pathlib.Path(
+            output_path, f"{filename_prefix or ''}{filename or self.source.name}"
+        )
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self.source, destination)
+        return str(destination)
+
+
+class LocalStreamQuery(list):
+    def get_highest_resolution(self) -> Optional[LocalStream]:
+        with_resolution = [stream for stream in self if stream.resolution]
+        if not with_resolution:
+            return None
+        return max(with_resolution, key=lambda stream: int(stream.resolution.rstrip("p")))
+
+
+class LocalYouTube:
+    """The subset of `pytubefix.YouTube` that DownloadVideo uses."""
+
+    def __init__(
+        self,
+        source: Union[str, pathlib.Path],
+        title: Optional[str] = None,
+        streams: Optional[List[LocalStream]] = None,
+        captions: Optional[Dict] = None,
+    ):
+        self.title = title or pathlib.Path(source).stem
+        self.streams = LocalStreamQuery(streams or [LocalStream(source)])
+        self.captions = captions or {}
+
+    @classmethod
+    def factory(
+        cls, sources: Dict[str, Union[str, pathlib.Path]]
+    ) -> Callable[[str], "LocalYouTube"]:
+        """A youtube_factory that maps each link to a local video file."""
+        return lambda link: cls(sources[link])
@@ -0,0 +1,89 @@
+"""
+Which YouTube stream DownloadVideo fetches.
+
+OCR on code rarely needs more than 720p, while a 4K download costs several times
+the bandwidth, disk and decode time of the later stages. `DownloadPolicy` picks
+the smallest stream that still meets the target height. Stages whose accuracy
+depends on resolution declare the height they need with `requires_resolution`,
+and the policy never goes below it.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DownloadPolicy:
+    """Configuration for picking the stream to download."""
+
+    TARGET_HEIGHT = 720  # smallest stream at least this tall, None downloads the highest
+    MAX_BITRATE = None  # bits per second, streams above it are skipped when possible
+    PREFER_VIDEO_ONLY = True  # the pipeline never uses audio, captions come separately
+    PREFERRED_SUBTYPE = "mp4"
+
+    # stage name -> minimum frame height it needs, filled in by requires_resolution
+    STAGE_MIN_RESOLUTIONS: Dict[str, int] = {}
+
+    @classmethod
+    def min_height(cls) -> Optional[int]:
+        """The height the download has to reach, None when the highest is wanted."""
+        if cls.TARGET_HEIGHT is None:
+            return None
+        return max([cls.TARGET_HEIGHT, *cls.STAGE_MIN_RESOLUTIONS.values()])
+
+
+def requires_resolution(height: int) -> Callable[[T], T]:
+    """Class decorator for stages that need frames at least `height` pixels tall."""
+
+    def register(stage: T) -> T:
+        DownloadPolicy.STAGE_MIN_RESOLUTIONS[stage.__name__] = height  # type:ignore
+        return stage
+
+    return register
+
+
+def stream_height(stream) -> Optional[int]:
+    resolution = getattr(stream, "resolution", None)
+    if not resolution:
+        return None
+    return int(resolution.rstrip("p"))
+
+
+def select_stream(streams: Iterable, policy: type[DownloadPolicy] = DownloadPolicy):
+    """
+    Pick a stream from a pytubefix StreamQuery (or any iterable of streams with the
+    same attributes) according to `policy`.
+
+    Returns None when no stream has a video track, so the caller can fall back to
+    `get_highest_resolution()`.
+    """
+    candidates: List = [stream for stream in streams if stream_height(stream)]
+    if not candidates:
+        return None
+
+    if policy.MAX_BITRATE is not None:
+        within_bitrate = [
+            stream
+            for stream in candidates
+            if (stream.bitrate or 0) <= policy.MAX_BITRATE
+        ]
+        candidates = within_bitrate or candidates
+
+    heights = [stream_height(stream) for stream in candidates]
+    min_height = policy.min_height()
+    tall_enough = [height for height in heights if min_height and height >= min_height]
+    # without a target, or when nothing reaches it, take the best there is
+    chosen_height = min(tall_enough) if tall_enough else max(heights)
+
+    def preference(stream):
+        video_only = not getattr(stream, "includes_audio_track", True)
+        return (
+            policy.PREFER_VIDEO_ONLY and not video_only,
+            getattr(stream, "subtype", None) != policy.PREFERRED_SUBTYPE,
+            stream.bitrate or 0,
+        )
+
+    return min(
+        (stream for stream in candidates if stream_height(stream) == chosen_height),
+        key=preference,
+    )
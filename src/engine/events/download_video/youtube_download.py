@@ -0,0 +1,127 @@
+import json
+import pathlib
+from typing import Callable, Optional, Tuple
+
+from event_pipeline.base import EventBase
+from pytubefix import YouTube
+
+from ... import utils
+from ...artifact_cache import (cache_key, config_fingerprint,
+                               get_artifact_cache, link_or_copy,
+                               youtube_video_id)
+from ...models import download_type
+from ...models.test_data import YoutubeObject
+from ...scheduler import IOStageExecutor
+from .policy import DownloadPolicy, select_stream, stream_height
+
+
+class DownloadVideo(EventBase):
+    executor = IOStageExecutor
+
+    # swapped for LocalYouTube.factory(...) to download from a local fixture
+    youtube_factory: Callable[[str], YouTube] = YouTube
+    policy: type[DownloadPolicy] = DownloadPolicy
+
+    def process(
+        self, youtube_object: list[YoutubeObject], *args, **kwargs
+    ) -> Tuple[bool, download_type.DownloaderReturnType]:
+        """This function downloads a video from a link.
+        Args:
+            link (str): The link to the video.
+        Returns:
+            DownloaderReturnType: The return type of the function.
+        Raises:
+        """
+        self.stop_on_error = True
+
+        # INFO: the paraamter that is passed inside of the batch pipeline is a list of strings
+        # hence to access it we need to access the first element of the list
+        link_to_video = youtube_object[0].link
+        video_title = youtube_object[0].title
+        video_id = youtube_video_id(link_to_video)
+
+        cached = self.load_cached_video(video_id, video_title)
+        if cached is not None:
+            return True, cached
+
+        yt = type(self).youtube_factory(link_to_video)
+
+        # TODO: don't forget that the captions might be necesary to the LLM to increse the accuracy of it's results
+        # make sure to check if the link is a valid youtube link before attempting to download it
+        if yt.captions.get("en"):
+            captions = yt.captions["en"].generate_srt_captions()
+        elif yt.captions.get("a.en"):
+            captions = yt.captions["a.en"].generate_srt_captions()
+        else:
+            captions = None
+
+        ys = select_stream(yt.streams, self.policy) or yt.streams.get_highest_resolution()
+        target = self.policy.min_height()
+        print(
+            f"Downloading {stream_height(ys)}p stream of {yt.title} "
+            f"(target {f'{target}p' if target else 'highest'})"
+        )
+        # download() returns where it saved the file, with the title made filename-safe.
+        # The prefix keeps concurrent runs of the same video from sharing one file.
+        run_prefix = f"{utils.new_run_id()}-"
+        filepath = pathlib.Path(
+            ys.download(output_path="videos", filename_prefix=run_prefix)  # type: ignore
+        )
+
+        if yt is None:
+            # TODO: find something better to return here
+            return False, download_type.DownloaderReturnType(None, None, None)
+
+        self.cache_video(
+            video_id, filepath, filepath.name[len(run_prefix) :], captions
+        )
+        return True, download_type.DownloaderReturnType(
+            video_title, filepath, captions, video_id
+        )
+
+    def video_cache_key(self, video_id: str) -> str:
+        return cache_key("video", video_id, config_fingerprint(self.policy))
+
+    def load_cached_video(
+        self, video_id: str, video_title: str
+    ) -> Optional[download_type.DownloaderReturnType]:
+        """The video as if it was just downloaded, when an earlier run already fetched it."""
+        cache = get_artifact_cache()
+        if cache is None:
+            return None
+        entry = cache.get_directory("videos", self.video_cache_key(video_id))
+        if entry is None:
+            return None
+
+        with open(pathlib.Path(entry, "download.json"), "r") as f:
+            download_info = json.load(f)
+        # later stages delete the downloaded file, so they get a link and the cache keeps its own
+        filepath = pathlib.Path(
+            "videos", f"{utils.new_run_id()}-{download_info['filename']}"
+        )
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        link_or_copy(pathlib.Path(entry, download_info["filename"]), filepath)
+        print(f"Using cached download of {video_id}")
+        return download_type.DownloaderReturnType(
+            video_title, filepath, download_info["captions"], video_id
+        )
+
+    def cache_video(
+        self,
+        video_id: str,
+        filepath: pathlib.Path,
+        filename: str,
+        captions: Optional[str],
+    ) -> None:
+        cache = get_artifact_cache()
+        if cache is None:
+            return
+        download_info = {"filename": filename, "captions": captions}
+        cache.put_directory(
+            "videos",
+            self.video_cache_key(video_id),
+            [
+                (filename, filepath),
+                ("download.json", json.dumps(download_info).encode()),
+            ],
+        )
@@ -0,0 +1,22 @@
+"""
+Duplicate frame removal for video frame sequences.
+
+Adjacent frames are compared with a tiered comparator: a cheap perceptual hash
+gate settles obvious duplicates and obvious changes, and local feature matching
+handles the ambiguous pairs in between. The feature backend (SIFT, ORB, AKAZE)
+is chosen per pipeline run.
+"""
+
+from .backends import FEATURE_BACKENDS, FeatureBackend, get_feature_backend
+from .comparators import TieredFrameComparator
+from .config import DuplicateRemovalConfig
+from .remove_duplicates import RemoveDuplicates
+
+__all__ = [
+    "FEATURE_BACKENDS",
+    "FeatureBackend",
+    "get_feature_backend",
+    "DuplicateRemovalConfig",
+    "TieredFrameComparator",
+    "RemoveDuplicates",
+]
@@ -0,0 +1,141 @@
+"""
+Local feature backends for the duplicate comparison.
+
+A backend pairs a keypoint detector/descriptor with a matcher that suits its
+descriptors: SIFT produces float descriptors matched with a KD-tree FLANN index,
+while ORB and AKAZE produce binary descriptors matched by Hamming distance,
+either brute force or through a FLANN LSH index. Backends are looked up by name
+so a pipeline run, and every worker process, can pick one with a plain string.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+import cv2 as cv
+import numpy as np
+
+FLANN_INDEX_KDTREE = 1
+FLANN_INDEX_LSH = 6
+
+
+class FeatureBackend(ABC):
+    """Detects local features in a frame and scores how well two frames match."""
+
+    name = ""
+
+    def __init__(self):
+        self._detector = None
+        self._matcher = None
+
+    @abstractmethod
+    def create_detector(self):
+        ...
+
+    @abstractmethod
+    def create_matcher(self):
+        ...
+
+    @property
+    def detector(self):
+        if self._detector is None:
+            self._detector = self.create_detector()
+        return self._detector
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = self.create_matcher()
+        return self._matcher
+
+    def describe(self, gray: np.ndarray) -> Optional[np.ndarray]:
+        _, descriptors = self.detector.detectAndCompute(gray, None)
+        return descriptors
+
+    def good_match_ratio(
+        self, des1: np.ndarray, des2: np.ndarray, ratio_threshold: float
+    ) -> float:
+        """
+        Fraction of descriptors in `des1` whose best match passes Lowe's ratio test.
+
+        Queries that come back with fewer than two neighbours, which LSH can
+        return, count as failed matches.
+        """
+        matches = self.matcher.knnMatch(des1, des2, k=2)
+        print(f"Number of matches: {len(matches)}")
+        if not matches:
+            return 0.0
+
+        good_count = 0
+        for pair in matches:
+            if len(pair) == 2 and pair[0].distance < ratio_threshold * pair[1].distance:
+                good_count += 1
+
+        return good_count / len(matches)
+
+
+class SiftFlannBackend(FeatureBackend):
+    name = "sift"
+
+    def create_detector(self):
+        return cv.SIFT_create()
+
+    def create_matcher(self):
+        index_params = dict(algorithm=FLANN_INDEX_KDTREE, trees=5)
+        search_params = dict(checks=50)
+        return cv.FlannBasedMatcher(index_params, search_params)  # type: ignore
+
+
+class OrbBruteForceBackend(FeatureBackend):
+    name = "orb"
+
+    def create_detector(self):
+        return cv.ORB_create(nfeatures=1000)
+
+    def create_matcher(self):
+        return cv.BFMatcher(cv.NORM_HAMMING)
+
+
+class OrbLshBackend(OrbBruteForceBackend):
+    name = "orb_lsh"
+
+    def create_matcher(self):
+        index_params = dict(
+            algorithm=FLANN_INDEX_LSH, table_number=6, key_size=12, multi_probe_level=1
+        )
+        search_params = dict(checks=50)
+        return cv.FlannBasedMatcher(index_params, search_params)  # type: ignore
+
+
+class AkazeBruteForceBackend(FeatureBackend):
+    name = "akaze"
+
+    def create_detector(self):
+        return cv.AKAZE_create()
+
+    def create_matcher(self):
+        return cv.BFMatcher(cv.NORM_HAMMING)
+
+
+FEATURE_BACKENDS = {
+    backend.name: backend
+    for backend in (
+        SiftFlannBackend,
+        OrbBruteForceBackend,
+        OrbLshBackend,
+        AkazeBruteForceBackend,
+    )
+}
+
+# backends hold OpenCV objects that cannot be pickled, so each process builds its own
+_instances: Dict[str, FeatureBackend] = {}
+
+
+def get_feature_backend(name: str) -> FeatureBackend:
+    """Return this process's instance of the backend registered under `name`."""
+    if name not in FEATURE_BACKENDS:
+        raise ValueError(
+            f"Unknown feature backend '{name}', expected one of {sorted(FEATURE_BACKENDS)}"
+        )
+    if name not in _instances:
+        _instances[name] = FEATURE_BACKENDS[name]()
+    return _instances[name]
@@ -0,0 +1,78 @@
+"""
+Tiered duplicate comparison for adjacent video frames.
+
+Tutorial videos are mostly static, so most adjacent frames are either identical
+or clearly different. A downscaled difference hash and mean absolute difference
+settle those pairs for a fraction of the cost of local features, and only the
+ambiguous band in between is matched with the run's feature backend.
+"""
+
+from typing import Dict
+
+from .backends import get_feature_backend
+from .config import DuplicateRemovalConfig
+from .features import FrameFeatures, hash_distance, mean_absolute_difference
+
+
+class TieredFrameComparator:
+    """
+    Decides whether a candidate frame duplicates the reference frame.
+
+    Tiers are tried in order of cost and the first one that is confident wins:
+    `hash_duplicate` and `hash_changed` come from the perceptual gate, and
+    `features` matches local features with the chosen backend for everything the
+    gate cannot settle. `tier_hits` counts how many comparisons each tier decided.
+    """
+
+    TIERS = ("hash_duplicate", "hash_changed", "features")
+
+    def __init__(
+        self,
+        duplicate_removal_threshold: float,
+        config: type[DuplicateRemovalConfig] = DuplicateRemovalConfig,
+        feature_backend: str = "sift",
+    ):
+        self.threshold = duplicate_removal_threshold
+        self.config = config
+        self.backend = get_feature_backend(feature_backend)
+        self.tier_hits: Dict[str, int] = {tier: 0 for tier in self.TIERS}
+
+    def is_duplicate(self, reference: FrameFeatures, candidate: FrameFeatures) -> bool:
+        tier = self.gate(reference, candidate)
+        self.tier_hits[tier] += 1
+        if tier == "features":
+            return self.feature_match(reference, candidate)
+        return tier == "hash_duplicate"
+
+    def gate(self, reference: FrameFeatures, candidate: FrameFeatures) -> str:
+        """The tier that settles the pair, "features" when the perceptual gate can't."""
+        distance = hash_distance(reference.frame_hash, candidate.frame_hash)
+        difference = mean_absolute_difference(reference.thumbnail, candidate.thumbnail)
+
+        if (
+            distance <= self.config.DUPLICATE_MAX_HASH_DISTANCE
+            and difference <= self.config.DUPLICATE_MAX_MEAN_DIFFERENCE
+        ):
+            return "hash_duplicate"
+
+        if (
+            distance >= self.config.CHANGED_MIN_HASH_DISTANCE
+            or difference >= self.config.CHANGED_MIN_MEAN_DIFFERENCE
+        ):
+            return "hash_changed"
+
+        return "features"
+
+    def needs_features(self, reference: FrameFeatures, candidate: FrameFeatures) -> bool:
+        return self.gate(reference, candidate) == "features"
+
+    def feature_match(self, reference: FrameFeatures, candidate: FrameFeatures) -> bool:
+        des1 = reference.descriptors(self.backend)
+        des2 = candidate.descriptors(self.backend)
+
+        if des1 is None or des2 is None:
+            raise ValueError(
+                f"{self.backend.name} descriptors could not be computed for one or both frames"
+            )
+
+        return self.backend.good_match_ratio(des1, des2, self.threshold) > self.threshold
@@ -0,0 +1,28 @@
+class DuplicateRemovalConfig:
+    """Configuration class for duplicate frame removal parameters."""
+
+    # Perceptual gate, computed on a downscaled grayscale copy of each frame
+    HASH_SIZE = 8  # dHash grid, gives HASH_SIZE * HASH_SIZE bits
+    THUMBNAIL_SIZE = (160, 90)  # (width, height) used for the mean absolute difference
+
+    # Tier 1 - obvious duplicates, both checks must pass
+    DUPLICATE_MAX_HASH_DISTANCE = 0
+    DUPLICATE_MAX_MEAN_DIFFERENCE = 0.05  # in gray levels on the thumbnail
+
+    # Tier 2 - obvious changes, either check is enough
+    CHANGED_MIN_HASH_DISTANCE = 16
+    CHANGED_MIN_MEAN_DIFFERENCE = 30.0
+
+    # Frames are compared on a grayscale copy no taller than this, None keeps full frames.
+    # It also bounds the resolution the feature descriptors are computed on.
+    ANALYSIS_HEIGHT = None
+
+    # Tier 3 - everything in between is matched with the run's feature backend
+    # (SIFT + FLANN by default) against the pipeline's duplicate_removal_threshold
+
+    # Upper bound on frames whose features are kept in memory at once
+    FEATURE_CACHE_SIZE = 4
+
+    # Parallel feature extraction
+    MAX_WORKERS = None  # None uses the scheduler's whole process pool, 1 extracts features in-process
+    PREFETCH_PER_WORKER = 2  # frames loaded and hashed ahead of the comparison, per worker
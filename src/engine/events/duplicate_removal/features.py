@@ -0,0 +1,258 @@
+"""
+Per-frame features used to decide whether two adjacent frames are duplicates.
+
+`FrameFeatures` holds the cheap signatures (a small thumbnail and a difference
+hash) computed as soon as the frame is loaded, and computes the expensive local
+feature descriptors only if a comparison actually needs them. `FrameFeatureStream`
+computes both in a worker pool ahead of the comparison: signatures for every
+frame, descriptors for the frames the signatures alone can't settle.
+"""
+
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, Future
+from typing import (Callable, Deque, Iterable, Iterator, List, Optional, Set,
+                    Tuple)
+
+import cv2 as cv
+import numpy as np
+
+from ...frame_normalization import normalize_frame
+from ...frame_store import FrameStore
+from .backends import FeatureBackend, get_feature_backend
+from .config import DuplicateRemovalConfig
+
+
+def difference_hash(gray: np.ndarray, hash_size: int) -> np.ndarray:
+    """dHash: one bit per cell, set when the cell is brighter than its right neighbour."""
+    resized = cv.resize(gray, (hash_size + 1, hash_size), interpolation=cv.INTER_AREA)
+    return (resized[:, 1:] > resized[:, :-1]).flatten()
+
+
+def hash_distance(first: np.ndarray, second: np.ndarray) -> int:
+    return int(np.count_nonzero(first != second))
+
+
+def mean_absolute_difference(first: np.ndarray, second: np.ndarray) -> float:
+    return float(np.mean(cv.absdiff(first, second)))
+
+
+class FrameFeatures:
+    """
+    Signatures of one frame, with local feature descriptors computed on first use.
+
+    Features loaded in a worker carry no pixels. Their descriptors come from
+    `pending_descriptors` when they were requested ahead, or else from
+    `describer`, which reads the frame again elsewhere.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        gray: np.ndarray,
+        config: type[DuplicateRemovalConfig] = DuplicateRemovalConfig,
+    ):
+        self.name = name
+        self.gray: Optional[np.ndarray] = gray
+        self.thumbnail = cv.resize(gray, config.THUMBNAIL_SIZE, interpolation=cv.INTER_AREA)
+        self.frame_hash = difference_hash(gray, config.HASH_SIZE)
+        self._descriptors: Optional[np.ndarray] = None
+        self._described = False
+        self.pending_descriptors: Optional[Future] = None
+        self.describer: Optional[Callable[[str], Future]] = None
+
+    @classmethod
+    def load(
+        cls,
+        frame_store: FrameStore,
+        name: str,
+        config: type[DuplicateRemovalConfig] = DuplicateRemovalConfig,
+    ) -> "FrameFeatures":
+        frame = frame_store.read(name)
+        if frame is None:
+            raise FileNotFoundError(f"Cannot load frame: {name}")
+        return cls(name, normalize_frame(frame, config.ANALYSIS_HEIGHT), config)
+
+    @property
+    def descriptors_requested(self) -> bool:
+        return self._described or self.pending_descriptors is not None
+
+    def descriptors(self, backend: FeatureBackend) -> Optional[np.ndarray]:
+        if not self._described:
+            if self.pending_descriptors is None and self.gray is None and self.describer:
+                self.pending_descriptors = self.describer(self.name)
+            if self.pending_descriptors is not None:
+                self._descriptors = self.pending_descriptors.result()
+            else:
+                self._descriptors = backend.describe(self.gray)
+            self._described = True
+            # the full frame is only kept around for description, drop it once described
+            self.gray = None
+        return self._descriptors
+
+
+def load_signatures(
+    frame_store: FrameStore, name: str, config: type[DuplicateRemovalConfig]
+) -> FrameFeatures:
+    """A frame's signatures without its pixels, which are too large to send between processes."""
+    features = FrameFeatures.load(frame_store, name, config)
+    features.gray = None
+    return features
+
+
+def describe_frame(
+    frame_store: FrameStore,
+    name: str,
+    config: type[DuplicateRemovalConfig],
+    feature_backend: str,
+) -> Optional[np.ndarray]:
+    frame = frame_store.read(name)
+    if frame is None:
+        raise FileNotFoundError(f"Cannot load frame: {name}")
+    return get_feature_backend(feature_backend).describe(
+        normalize_frame(frame, config.ANALYSIS_HEIGHT)
+    )
+
+
+class FrameFeatureCache:
+    """
+    Bounded cache of FrameFeatures keyed by frame name.
+
+    The duplicate comparison only ever looks at the current reference frame and
+    the frame after it, so frames are released as soon as the reference has moved
+    past them. `max_frames` is a safety bound on top of that: if it is exceeded
+    the least recently used entry is evicted. `loads` counts cache misses, which
+    should equal the number of frames when every frame is decoded exactly once.
+    """
+
+    def __init__(self, loader: Callable[[str], FrameFeatures], max_frames: int):
+        self.loader = loader
+        self.max_frames = max_frames
+        self.loads = 0
+        self._entries: "OrderedDict[str, FrameFeatures]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, name: str) -> FrameFeatures:
+        features = self._entries.get(name)
+        if features is not None:
+            self._entries.move_to_end(name)
+            return features
+
+        features = self.loader(name)
+        self.loads += 1
+        self._entries[name] = features
+        while len(self._entries) > self.max_frames:
+            self._entries.popitem(last=False)
+        return features
+
+    def release(self, name: str) -> None:
+        self._entries.pop(name, None)
+
+
+class FrameFeatureStream:
+    """
+    Loads FrameFeatures in a worker pool ahead of the comparison cursor.
+
+    Workers decode each frame and compute its thumbnail and hash. As those come
+    back, every frame is checked against the frame before it with
+    `needs_descriptors`, and when the signatures can't settle the pair, both
+    frames are described in the pool too, so SIFT runs on every core while
+    pairs the hash tiers settle never pay for it. The comparison doesn't always
+    pair a frame with the one before it, so a frame it needs descriptors for
+    that weren't requested ahead is described in the pool on demand.
+
+    At most `prefetch` frames are in flight at once, and results are handed out
+    strictly in frame order, so it can be used as the loader of a
+    FrameFeatureCache in place of `FrameFeatures.load`. A frame that failed to
+    load keeps raising the same error when asked for again, like reloading it
+    from disk would.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        frame_store: FrameStore,
+        names: Iterable[str],
+        prefetch: int,
+        needs_descriptors: Callable[[FrameFeatures, FrameFeatures], bool],
+        feature_backend: str = "sift",
+        config: type[DuplicateRemovalConfig] = DuplicateRemovalConfig,
+    ):
+        self.executor = executor
+        self.frame_store = frame_store
+        self.needs_descriptors = needs_descriptors
+        self.feature_backend = feature_backend
+        self.config = config
+        self._names: Iterator[str] = iter(names)
+        # name, signatures, whether it was checked against the frame before it
+        self._pending: Deque[List] = deque()
+        self._failed: Optional[Tuple[str, Exception]] = None
+        self._previous: Optional[FrameFeatures] = None
+        self._describing: Set[Future] = set()
+
+        for _ in range(max(1, prefetch)):
+            self._submit_next()
+
+    def _submit_next(self) -> None:
+        name = next(self._names, None)
+        if name is not None:
+            future = self.executor.submit(load_signatures, self.frame_store, name, self.config)
+            self._pending.append([name, future, False])
+
+    def _describe(self, name: str) -> Future:
+        future = self.executor.submit(
+            describe_frame, self.frame_store, name, self.config, self.feature_backend
+        )
+        self._describing = {described for described in self._describing if not described.done()}
+        self._describing.add(future)
+        return future
+
+    def _check(self, features: FrameFeatures) -> None:
+        previous, self._previous = self._previous, features
+        if previous is None or not self.needs_descriptors(previous, features):
+            return
+        for frame in (previous, features):
+            if not frame.descriptors_requested:
+                frame.pending_descriptors = self._describe(frame.name)
+
+    def _check_ahead(self) -> None:
+        """Check the loaded frames after the cursor, in order, up to the first one still loading."""
+        for entry in self._pending:
+            _, future, checked = entry
+            if checked:
+                continue
+            if not future.done() or future.exception() is not None:
+                return
+            self._check(future.result())
+            entry[2] = True
+
+    def __call__(self, name: str) -> FrameFeatures:
+        if self._failed is not None and self._failed[0] == name:
+            raise self._failed[1]
+
+        if not self._pending:
+            raise LookupError(f"Frame {name} was requested after the stream ended")
+        expected, future, checked = self._pending.popleft()
+        if expected != name:
+            raise LookupError(f"Frame {name} requested out of order, next is {expected}")
+
+        # keep the window full before waiting on the oldest frame
+        self._submit_next()
+        try:
+            features: FrameFeatures = future.result()
+        except Exception as e:
+            self._failed = (name, e)
+            raise
+        if not checked:
+            self._check(features)
+        self._check_ahead()
+        features.describer = self._describe
+        return features
+
+    def close(self) -> None:
+        for _, future, _ in self._pending:
+            future.cancel()
+        self._pending.clear()
+        for future in self._describing:
+            future.cancel()
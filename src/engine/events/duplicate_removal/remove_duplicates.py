@@ -0,0 +1,143 @@
+import os
+from contextlib import ExitStack
+from functools import partial
+from typing import Callable, Tuple
+
+from event_pipeline.base import EventBase
+from llist import sllist as linkedlist
+
+from ... import utils
+from ...models import frame_split_type
+from ...scheduler import CPUStageExecutor, worker_process_pool
+
+from .comparators import TieredFrameComparator
+from .config import DuplicateRemovalConfig
+from .features import FrameFeatureCache, FrameFeatures, FrameFeatureStream
+
+
+#TODO: consider changeing the return type when I want to include it in the pipeline
+class RemoveDuplicates(EventBase):
+    executor = CPUStageExecutor
+
+    def process(
+        self, duplicate_removal_threshold: float = 0.8, feature_backend: str = "sift"
+    ) -> Tuple[bool, linkedlist]:
+        """This function removes duplicate frames from a video by comparing each frame
+        with the last kept frame.
+
+        Pairs are first compared with a downscaled perceptual hash and mean absolute
+        difference. Only the pairs that gate cannot settle are compared with local
+        features from `feature_backend`, see `TieredFrameComparator`.
+
+        Args:
+            video_frames (frame_split.FrameSplitReturnType): The video frames to remove
+            duplicates from.
+            threshold (float, optional): The threshold for the feature comparison.
+            Defaults to 0.8.
+            feature_backend (str, optional): Name of the feature backend, one of
+            `FEATURE_BACKENDS`. Defaults to "sift".
+
+        Returns:
+            linkedlist: The linked list of frame names with duplicates removed.
+
+        Raises:
+            FileNotFoundError: If a frame cannot be loaded.
+            ValueError: If the descriptors cannot be computed for one or both frames.
+        """
+        video_frames: frame_split_type.FrameSplitReturnType = (
+            self.previous_result.first().content  # type:ignore
+        )
+        frame_names = utils.load_frame_names(video_frames)
+        comparator = TieredFrameComparator(
+            duplicate_removal_threshold, DuplicateRemovalConfig, feature_backend
+        )
+        with ExitStack() as stack:
+            loader = self.create_feature_loader(
+                stack,
+                video_frames,
+                frame_names,
+                comparator,
+                feature_backend,
+                DuplicateRemovalConfig,
+            )
+            # every frame is loaded once, described only if a comparison needs it,
+            # then released when the reference passes it
+            cache = FrameFeatureCache(
+                loader, DuplicateRemovalConfig.FEATURE_CACHE_SIZE
+            )
+            self.remove_duplicate_frames(frame_names, cache, comparator)
+
+        print(f"Duplicate comparisons settled per tier: {comparator.tier_hits}")
+        print(f"Loaded features for {cache.loads} frames")
+        print("Done removing duplicates")
+        print(frame_names)
+        return frame_names
+
+    @staticmethod
+    def create_feature_loader(
+        stack: ExitStack,
+        video_frames: frame_split_type.FrameSplitReturnType,
+        frame_names: linkedlist,
+        comparator: TieredFrameComparator,
+        feature_backend: str,
+        config: type[DuplicateRemovalConfig],
+    ) -> Callable[[str], FrameFeatures]:
+        """
+        Pick how frame features are produced for the comparison.
+
+        With one worker, frames are loaded in-process and described on demand.
+        With more, frames are loaded and hashed in a process pool ahead of the
+        comparison, and the frames the comparator's hash tiers can't settle are
+        described there too. Keep/drop decisions are still made one frame at a
+        time, so the kept frames are the same either way.
+        """
+        frame_store = utils.get_frame_store(video_frames)
+        workers = min(config.MAX_WORKERS or os.cpu_count() or 1, len(frame_names))
+        if workers <= 1:
+            return partial(FrameFeatures.load, frame_store, config=config)
+
+        executor = stack.enter_context(worker_process_pool(workers))
+        stream = FrameFeatureStream(
+            executor,
+            frame_store,
+            list(frame_names),
+            executor.max_workers * config.PREFETCH_PER_WORKER,
+            comparator.needs_features,
+            feature_backend,
+            config,
+        )
+        stack.callback(stream.close)
+        return stream
+
+    @staticmethod
+    def remove_duplicate_frames(
+        frame_names: linkedlist,
+        cache: FrameFeatureCache,
+        comparator: TieredFrameComparator,
+    ) -> None:
+        reference = frame_names.first
+        while reference is not None and reference.next is not None:
+            try:
+                reference_features = cache.get(reference.value)
+                next_compare_features = cache.get(reference.next.value)
+
+                if comparator.is_duplicate(reference_features, next_compare_features):
+                    print("there was a match somewhere")
+                    node_to_remove = reference.next
+                    cache.release(node_to_remove.value)
+                    frame_names.remove(node_to_remove)
+                    # INFO: can't use this because llist internally won't make it work
+                    # it is just going to use it even if it is removed from the list
+                    # reference.next = reference.next.next
+                else:
+                    cache.release(reference.value)
+                    reference = reference.next
+
+            except Exception as e:
+                print(f"Error processing frame {reference.value}: {e}")
+                cache.release(reference.value)
+                reference = reference.next
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,11 @@
+"""
+Splitting a downloaded video into frames for the rest of the pipeline.
+"""
+
+from .config import FrameSplitConfig
+from .split_video import SplitVideoIntoFrames
+
+__all__ = [
+    "FrameSplitConfig",
+    "SplitVideoIntoFrames",
+]
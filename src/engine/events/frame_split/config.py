@@ -0,0 +1,30 @@
+class FrameSplitConfig:
+    """Configuration class for splitting a video into frames."""
+
+    # Where frames live between stages. "disk" writes one frame%d.jpg per frame,
+    # which is easiest to debug. "memory" keeps decoded frames in a memory-mapped
+    # ring (see engine.frame_store) so later stages skip the JPEG write and re-read.
+    FRAME_STORE = "disk"
+    FRAME_STORE_CAPACITY = None  # frames in the ring, None sizes it to the whole video
+
+    # Streaming: decode on a background thread and let the code frame filter score
+    # frames as they arrive, so only the frames it keeps are ever stored.
+    STREAM_FRAMES = False
+    STREAM_QUEUE_DEPTH = 32  # decoded frames allowed to wait for the filter
+
+    # Sampling: "fps" keeps every frame at frame_extraction_fps. "scene" still samples
+    # at that rate but only keeps a frame when it differs enough from the previous
+    # sampled frame (ffmpeg's scene score), so long static stretches of code produce a
+    # single frame. Changes that build up slowly, like typing or scrolling that stays
+    # under the threshold from one sample to the next, are only caught by
+    # SCENE_MAX_INTERVAL.
+    SAMPLING = "fps"
+    SCENE_CHANGE_THRESHOLD = 0.02  # ffmpeg scene score (0-1) that counts as a change
+    SCENE_MIN_INTERVAL = 1.0  # seconds between kept frames, even on constant change
+    SCENE_MAX_INTERVAL = 10.0  # seconds after which a frame is kept without a change
+
+    # Region of interest: find the code bounding box on a few sampled frames first
+    # and crop to it inside ffmpeg, so only the code region is decoded and stored.
+    # DetectBoundingBox and CropFrames pass the frames through when this is on.
+    CROP_IN_DECODE = False
+    ROI_SAMPLE_FRAMES = 12
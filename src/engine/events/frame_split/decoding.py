@@ -0,0 +1,192 @@
+"""
+Raw frame decoding through an ffmpeg pipe.
+
+Instead of having ffmpeg write JPEG files, frames are requested as raw pixels on
+stdout and read back one frame at a time as numpy arrays. `FrameStream` runs that
+decoding on a background thread behind a bounded queue, so later stages can start
+on the first frames while the rest of the video is still being decoded.
+"""
+
+import pathlib
+import queue
+import threading
+from typing import Callable, Dict, Generator, Iterator, Optional, Tuple, Union
+
+import ffmpeg
+import numpy as np
+
+from ...frame_store import frame_name
+from .config import FrameSplitConfig
+from .roi import CropBox, crop_filter_args
+
+# bytes per pixel of the raw formats the decoders can be asked for
+PIXEL_FORMAT_CHANNELS = {"bgr24": 3, "rgb24": 3, "gray": 1}
+
+_END_OF_STREAM = object()
+
+
+def probe_video(filepath: Union[str, pathlib.Path]) -> Tuple[int, int, float]:
+    """Width, height and duration in seconds of the first video stream."""
+    probe = ffmpeg.probe(str(filepath))
+    stream = next(s for s in probe["streams"] if s["codec_type"] == "video")
+    duration = float(probe["format"].get("duration") or stream.get("duration") or 0)
+    return int(stream["width"]), int(stream["height"]), duration
+
+
+def scene_select_expression(
+    threshold: float, min_interval: float, max_interval: float
+) -> str:
+    """
+    ffmpeg `select` expression keeping the first frame, any frame `max_interval`
+    seconds after the last kept one, and any frame whose scene score is above
+    `threshold` once `min_interval` seconds have passed.
+    """
+    since_last = "t-prev_selected_t"
+    return (
+        f"isnan(prev_selected_t)"
+        f"+gte({since_last},{max_interval})"
+        f"+gt(scene,{threshold})*gte({since_last},{min_interval})"
+    )
+
+
+def sampled_input(
+    filepath: Union[str, pathlib.Path], fps: float, crop_box: Optional[CropBox] = None
+) -> Tuple[ffmpeg.nodes.FilterableStream, Dict[str, str]]:
+    """
+    The video sampled at `fps`, cropped to `crop_box` if one is given and thinned to
+    scene changes when FrameSplitConfig.SAMPLING is "scene", along with the output
+    arguments the sampling needs.
+    """
+    stream = ffmpeg.input(str(filepath)).filter("fps", fps=fps)
+    if crop_box is not None:
+        # cropped before scene detection so changes outside the code region don't count
+        stream = stream.filter("crop", **crop_filter_args(crop_box))
+    if FrameSplitConfig.SAMPLING != "scene":
+        return stream, {}
+
+    stream = stream.filter(
+        "select",
+        scene_select_expression(
+            FrameSplitConfig.SCENE_CHANGE_THRESHOLD,
+            FrameSplitConfig.SCENE_MIN_INTERVAL,
+            FrameSplitConfig.SCENE_MAX_INTERVAL,
+        ),
+    )
+    # without vfr the muxer duplicates frames to fill the gaps select leaves
+    return stream, {"vsync": "vfr"}
+
+
+def iter_raw_frames(
+    filepath: Union[str, pathlib.Path],
+    fps: float,
+    width: int,
+    height: int,
+    pix_fmt: str = "bgr24",
+    crop_box: Optional[CropBox] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Yield frames sampled at `fps` as (height, width, 3) arrays, or (height, width) for
+    gray. With a `crop_box`, frames have the size of the box instead.
+    """
+    channels = PIXEL_FORMAT_CHANNELS[pix_fmt]
+    if crop_box is not None:
+        width, height = crop_box[2] - crop_box[0], crop_box[3] - crop_box[1]
+    stream, output_args = sampled_input(filepath, fps, crop_box)
+    process = stream.output(
+        "pipe:", format="rawvideo", pix_fmt=pix_fmt, **output_args
+    ).run_async(pipe_stdout=True)
+    frame_size = width * height * channels
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    try:
+        while True:
+            raw = process.stdout.read(frame_size)
+            if len(raw) < frame_size:
+                break
+            yield np.frombuffer(raw, np.uint8).reshape(shape)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+class FrameStream:
+    """
+    Frames of a video decoded on a background thread, consumed as they arrive.
+
+    Iterating yields `(frame_name, frame)` pairs in frame order, named like the
+    `frame%d.jpg` files of the disk split. At most `queue_depth` decoded frames
+    wait in memory; when the consumer falls behind, the decoder blocks instead of
+    running ahead. `on_finished` is called with the number of decoded frames once
+    decoding stops. A stream can only be iterated once. A decoding error is raised
+    from the consuming side once the frames before it have been handed out.
+    """
+
+    def __init__(
+        self,
+        frames: Generator[np.ndarray, None, None],
+        queue_depth: int,
+        on_finished: Optional[Callable[[int], None]] = None,
+    ):
+        self._frames = frames
+        self._on_finished = on_finished
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_depth))
+        self._stopped = threading.Event()
+        self._error: Optional[BaseException] = None
+        self.decoded = 0
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_video(
+        cls,
+        filepath: Union[str, pathlib.Path],
+        fps: float,
+        queue_depth: int,
+        pix_fmt: str = "bgr24",
+        on_finished: Optional[Callable[[int], None]] = None,
+    ) -> "FrameStream":
+        width, height, _ = probe_video(filepath)
+        return cls(
+            iter_raw_frames(filepath, fps, width, height, pix_fmt),
+            queue_depth,
+            on_finished,
+        )
+
+    def _put(self, item) -> bool:
+        # a timeout keeps the decoder from blocking forever on a consumer that stopped
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self) -> None:
+        try:
+            for index, frame in enumerate(self._frames, 1):
+                if not self._put((frame_name(index), frame)):
+                    break
+                self.decoded = index
+        except Exception as e:
+            self._error = e
+        finally:
+            self._frames.close()
+            if self._on_finished is not None:
+                self._on_finished(self.decoded)
+            self._put(_END_OF_STREAM)
+
+    def __iter__(self) -> Iterator[Tuple[str, np.ndarray]]:
+        while True:
+            item = self._queue.get()
+            if item is _END_OF_STREAM:
+                break
+            yield item
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """Stop decoding and drop any frames that were not consumed."""
+        self._stopped.set()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._thread.join()
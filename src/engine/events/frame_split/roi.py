@@ -0,0 +1,100 @@
+"""
+First pass of the region-of-interest split.
+
+The code bounding box is found on a handful of frames sampled across the video,
+so the full split can crop every frame to it inside ffmpeg. Only the code region
+is then ever written, and DetectBoundingBox and CropFrames have nothing left to do.
+"""
+
+import os
+import pathlib
+import tempfile
+from typing import Optional, Tuple, Union
+
+import bounding_box_detector_pkg as bbox
+import ffmpeg
+
+from ...models import download_type, frame_split_type
+from ..code_frame_filtering.config import CodeDetectionConfig
+from ..code_frame_filtering.detectors import is_code_frame
+
+CropBox = Tuple[int, int, int, int]  # x1, y1, x2, y2 like BoundingBoxReturnType
+
+
+def sample_frames(
+    filepath: Union[str, pathlib.Path],
+    duration: float,
+    count: int,
+    directory: Union[str, pathlib.Path],
+) -> None:
+    """Write about `count` frames spread evenly over the video as frame%d.jpg files."""
+    ffmpeg.input(str(filepath)).filter("fps", fps=count / max(duration, 1.0)).output(
+        filename=pathlib.Path(directory, "frame%d.jpg"),
+        start_number=1,
+        vframes=count,
+    ).overwrite_output().run(quiet=True)
+
+
+def keep_code_samples(directory: Union[str, pathlib.Path]) -> int:
+    """Drop the sampled frames that are not code, returning how many are left."""
+    paths = [pathlib.Path(directory, name) for name in os.listdir(directory)]
+    code_paths = [path for path in paths if is_code_frame(path, CodeDetectionConfig)]
+    for path in set(paths) - set(code_paths):
+        os.remove(path)
+    return len(code_paths)
+
+
+def clamp_crop_box(
+    x1: int, y1: int, x2: int, y2: int, width: int, height: int
+) -> Optional[CropBox]:
+    """
+    The box inside the frame, with an even offset and size. ffmpeg's crop filter
+    rounds odd sizes down for subsampled pixel formats like yuv420p, and frames
+    read from its pipe have to be exactly the size of the box.
+    """
+    x1, x2 = max(0, int(x1)), min(width, int(x2))
+    y1, y2 = max(0, int(y1)), min(height, int(y2))
+    x1, y1 = x1 - x1 % 2, y1 - y1 % 2
+    x2, y2 = x2 - (x2 - x1) % 2, y2 - (y2 - y1) % 2
+    if x2 <= x1 or y2 <= y1:
+        return None
+    return x1, y1, x2, y2
+
+
+def detect_code_region(
+    video: download_type.DownloaderReturnType,
+    duration: float,
+    width: int,
+    height: int,
+    sample_count: int,
+) -> Optional[CropBox]:
+    """
+    Run the bounding box detector on sampled frames.
+
+    Returns None when no usable box is found, in which case the split keeps the
+    full frames and the bounding box stages run as usual. That includes videos
+    where no sample is code, a box around slides or a face-cam would crop the
+    code out of every frame for good.
+    """
+    with tempfile.TemporaryDirectory() as samples_dir:
+        sample_frames(video.filepath, duration, sample_count, samples_dir)
+        code_samples = keep_code_samples(samples_dir)
+        if code_samples == 0:
+            print(f"None of the {sample_count} sampled frames is code, keeping full frames")
+            return None
+        try:
+            result = bbox.detectBoundingBox(
+                frame_split_type.FrameSplitReturnType(video, samples_dir)
+            )
+        except Exception as e:
+            print(f"Error detecting the code region on sampled frames: {e}")
+            return None
+
+    crop_box = clamp_crop_box(result.x1, result.y1, result.x2, result.y2, width, height)
+    print(f"Code region {crop_box} found on {code_samples}/{sample_count} sampled code frames")
+    return crop_box
+
+
+def crop_filter_args(crop_box: CropBox) -> dict:
+    x1, y1, x2, y2 = crop_box
+    return {"w": x2 - x1, "h": y2 - y1, "x": x1, "y": y1}
@@ -0,0 +1,272 @@
+import json
+import os
+import pathlib
+import shutil
+from functools import partial
+from pathlib import Path
+from typing import Optional, Tuple
+
+import cv2 as cv
+from event_pipeline.base import EventBase
+
+from ... import constants, utils
+from ...artifact_cache import cache_key, config_fingerprint, get_artifact_cache
+from ...frame_store import (DiskFrameStore, FrameStore,
+                            MemoryMappedFrameStore, frame_name)
+from ...models import download_type, frame_split_type
+from ...scheduler import CPUStageExecutor
+from ..code_frame_filtering.config import CodeDetectionConfig
+from ..download_video.policy import DownloadPolicy
+from .config import FrameSplitConfig
+from .decoding import FrameStream, iter_raw_frames, probe_video, sampled_input
+from .roi import CropBox, detect_code_region
+
+
+class SplitVideoIntoFrames(EventBase):
+    executor = CPUStageExecutor
+
+    def process(
+        self, frame_extraction_fps
+    ) -> Tuple[bool, frame_split_type.FrameSplitReturnType]:
+        """This function splits a video into frames.
+        Args:
+            video (youtube_downloader.DownloaderReturnType): The video to split into frames.
+            fps (int): The frames per second to split the video into.
+        Returns:
+            FrameSplitReturnType: The return type of the function.
+        Raises:
+        """
+
+        video_downloaded: download_type.DownloaderReturnType = (
+            self.previous_result.first().content  # type:ignore
+        )
+        frames_path = self.create_folder_with_video_name(video_downloaded)
+
+        frames_cache_key = self.frames_cache_key(video_downloaded, frame_extraction_fps)
+        cached = self.load_cached_frames(video_downloaded, frames_path, frames_cache_key)
+        if cached is not None:
+            utils.remove_thing_based_on_type(video_downloaded)
+            return True, cached
+
+        crop_box = None
+        if FrameSplitConfig.CROP_IN_DECODE:
+            width, height, duration = probe_video(video_downloaded.filepath)
+            crop_box = detect_code_region(
+                video_downloaded,
+                duration,
+                width,
+                height,
+                FrameSplitConfig.ROI_SAMPLE_FRAMES,
+            )
+
+        if FrameSplitConfig.STREAM_FRAMES:
+            streamed = self.split_into_frame_stream(
+                video_downloaded, frame_extraction_fps, frames_path, crop_box
+            )
+            streamed.cache_key = frames_cache_key
+            return True, streamed
+
+        frame_store = None
+        if FrameSplitConfig.FRAME_STORE == "memory":
+            frame_store = self.split_into_frame_store(
+                video_downloaded, frame_extraction_fps, frames_path, crop_box
+            )
+            emitted = len(frame_store)
+        else:
+            stream, output_args = sampled_input(
+                video_downloaded.filepath, frame_extraction_fps, crop_box
+            )
+            stream.output(
+                filename=pathlib.Path(frames_path, "frame%d.jpg"),
+                start_number=1,
+                **output_args,
+            ).overwrite_output().run()
+            emitted = len(DiskFrameStore(frames_path).frame_names())
+
+        if FrameSplitConfig.SAMPLING == "scene":
+            _, _, duration = probe_video(video_downloaded.filepath)
+            self.report_sampling(emitted, duration, frame_extraction_fps)
+
+        utils.remove_thing_based_on_type(video_downloaded)
+        return True, frame_split_type.FrameSplitReturnType(
+            video_downloaded,
+            frames_path,
+            frame_store,
+            crop_box=crop_box,
+            cache_key=frames_cache_key,
+        )
+
+    @staticmethod
+    def frames_cache_key(
+        video: download_type.DownloaderReturnType, frame_extraction_fps: float
+    ) -> Optional[str]:
+        """Key of the filtered, cropped frames in the artifact cache, None if they can't be cached."""
+        if getattr(video, "video_id", None) is None or get_artifact_cache() is None:
+            return None
+        return cache_key(
+            "frames",
+            video.video_id,
+            frame_extraction_fps,
+            config_fingerprint(DownloadPolicy, FrameSplitConfig, CodeDetectionConfig),
+        )
+
+    @staticmethod
+    def load_cached_frames(
+        video: download_type.DownloaderReturnType,
+        frames_path: pathlib.Path,
+        frames_cache_key: Optional[str],
+    ) -> Optional[frame_split_type.FrameSplitReturnType]:
+        """
+        The frames an earlier run kept for the same video and settings.
+
+        They are already filtered and cropped, so the filter and bounding box stages
+        pass them through.
+        """
+        cache = get_artifact_cache()
+        if cache is None or frames_cache_key is None:
+            return None
+        entry = cache.get_directory("frames", frames_cache_key)
+        if entry is None:
+            return None
+
+        with open(pathlib.Path(entry, "frames.json"), "r") as f:
+            frames_info = json.load(f)
+        names = frames_info["frames"]
+
+        frame_store: Optional[FrameStore] = None
+        if FrameSplitConfig.FRAME_STORE == "memory":
+            frame_store = MemoryMappedFrameStore(
+                pathlib.Path(frames_path, "frames.ring"),
+                FrameSplitConfig.FRAME_STORE_CAPACITY or len(names) + 2,
+            )
+            for name in names:
+                frame_store.write(name, cv.imread(str(pathlib.Path(entry, name))))
+        else:
+            # copied rather than linked, later stages may rewrite frames in place
+            for name in names:
+                shutil.copyfile(pathlib.Path(entry, name), pathlib.Path(frames_path, name))
+
+        print(f"Using {len(names)} cached frames of {video.video_id}")
+        return frame_split_type.FrameSplitReturnType(
+            video,
+            frames_path,
+            frame_store,
+            crop_box=tuple(frames_info["crop_box"]),
+            cache_key=frames_cache_key,
+            filtered=True,
+        )
+
+    @staticmethod
+    def split_into_frame_stream(
+        video: download_type.DownloaderReturnType,
+        frame_extraction_fps: float,
+        frames_path: pathlib.Path,
+        crop_box: Optional[CropBox] = None,
+    ) -> frame_split_type.FrameSplitReturnType:
+        """
+        Start decoding on a background thread and return right away.
+
+        The frames are handed to the next stage through `frame_stream` as they are
+        decoded, and it writes the ones it keeps to `frame_store` (the frames folder
+        when there is none). The downloaded video is removed once decoding ends.
+        """
+        width, height, duration = probe_video(video.filepath)
+        frame_store: Optional[MemoryMappedFrameStore] = None
+        if FrameSplitConfig.FRAME_STORE == "memory":
+            frame_store = SplitVideoIntoFrames.create_memory_store(
+                frames_path, duration, frame_extraction_fps
+            )
+
+        frame_stream = FrameStream(
+            iter_raw_frames(
+                video.filepath, frame_extraction_fps, width, height, crop_box=crop_box
+            ),
+            FrameSplitConfig.STREAM_QUEUE_DEPTH,
+            on_finished=partial(
+                SplitVideoIntoFrames.finish_frame_stream,
+                video,
+                duration,
+                frame_extraction_fps,
+            ),
+        )
+        return frame_split_type.FrameSplitReturnType(
+            video, frames_path, frame_store, frame_stream, crop_box
+        )
+
+    @staticmethod
+    def finish_frame_stream(
+        video: download_type.DownloaderReturnType,
+        duration: float,
+        frame_extraction_fps: float,
+        decoded: int,
+    ) -> None:
+        if FrameSplitConfig.SAMPLING == "scene":
+            SplitVideoIntoFrames.report_sampling(decoded, duration, frame_extraction_fps)
+        utils.remove_thing_based_on_type(video)
+
+    @staticmethod
+    def report_sampling(
+        emitted: int, duration: float, frame_extraction_fps: float
+    ) -> None:
+        """Print how many frames scene sampling kept against sampling every frame at the fixed fps."""
+        fixed_fps_frames = max(1, int(duration * frame_extraction_fps))
+        print(
+            f"Scene sampling emitted {emitted} frames, {fixed_fps_frames} at a fixed "
+            f"{frame_extraction_fps} fps ({emitted / fixed_fps_frames:.0%})"
+        )
+
+    @staticmethod
+    def create_memory_store(
+        frames_path: pathlib.Path, duration: float, frame_extraction_fps: float
+    ) -> MemoryMappedFrameStore:
+        capacity = FrameSplitConfig.FRAME_STORE_CAPACITY or int(
+            duration * frame_extraction_fps
+        ) + 2
+        return MemoryMappedFrameStore(pathlib.Path(frames_path, "frames.ring"), capacity)
+
+    @staticmethod
+    def split_into_frame_store(
+        video: download_type.DownloaderReturnType,
+        frame_extraction_fps: float,
+        frames_path: pathlib.Path,
+        crop_box: Optional[CropBox] = None,
+    ) -> MemoryMappedFrameStore:
+        """Decode frames straight into a memory-mapped store, skipping the JPEG files."""
+        width, height, duration = probe_video(video.filepath)
+        frame_store = SplitVideoIntoFrames.create_memory_store(
+            frames_path, duration, frame_extraction_fps
+        )
+
+        # same numbering as the frame%d.jpg files written in disk mode
+        frames = iter_raw_frames(
+            video.filepath, frame_extraction_fps, width, height, crop_box=crop_box
+        )
+        for index, frame in enumerate(frames, 1):
+            frame_store.write(frame_name(index), frame)
+
+        return frame_store
+
+    @staticmethod
+    def create_folder_with_video_name(
+        video: download_type.DownloaderReturnType,
+    ) -> pathlib.Path:
+        """
+        Create this run's frames folder. The name is the title plus a unique suffix,
+        so concurrent runs of the same video never share, or delete, each other's frames.
+        """
+        file_path = Path(constants.VIDEOS_PATH, utils.unique_run_name(video.title))
+        if file_path.exists():
+            utils.remove_after_failure(file_path)
+        os.makedirs(file_path)
+        return file_path
+
+    @staticmethod
+    def create_folder_with_video_name_and_level(
+        level: int,
+        video: download_type.DownloaderReturnType,
+    ) -> None:
+        os.mkdir(
+            pathlib.Path(
+                constants.TESTING_VIDEOS_PATH, f"Level{str(level)}", video.title
+            )
+        )
@@ -1,5 +1,21 @@
-from .google_vision_extraction import GoogleVisionExtractCodeFromFrames
+from .backends import OCR_BACKENDS, OCRBackend, get_ocr_backend
+from .extract_code import ExtractCodeFromFrames
+from .google_vision_extraction import (GoogleVisionExtractCodeFromFrames,
+                                       GoogleVisionOCRBackend)
+from .incremental_extraction import IncrementalExtractCodeFromFrames
+from .montage_extraction import (GoogleVisionExtractCodeFromMontages,
+                                 GoogleVisionMontageOCRBackend)
+from .tesseract_extraction import TesseractOCRBackend
 
 __all__ = [
+    "ExtractCodeFromFrames",
     "GoogleVisionExtractCodeFromFrames",
+    "GoogleVisionExtractCodeFromMontages",
+    "IncrementalExtractCodeFromFrames",
+    "OCRBackend",
+    "OCR_BACKENDS",
+    "get_ocr_backend",
+    "GoogleVisionOCRBackend",
+    "GoogleVisionMontageOCRBackend",
+    "TesseractOCRBackend",
 ]
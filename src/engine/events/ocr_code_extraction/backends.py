@@ -0,0 +1,103 @@
+"""
+OCR backends for the code extraction stage.
+
+A backend reads the text in frames. `GoogleVisionOCRBackend` sends them to the
+Vision API, `GoogleVisionMontageOCRBackend` tiles cropped frames into montages
+first, and `TesseractOCRBackend` runs Tesseract locally so the pipeline works
+offline. Backends register themselves by name, so a pipeline run picks one with
+a plain string, like the duplicate removal feature backends.
+
+Every backend shares the artifact cache handling here: frames whose text is
+already cached under the backend's `cache_name` are never sent to it.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+from ...artifact_cache import cache_key, get_artifact_cache, hash_bytes
+from ...frame_store import FrameStore
+
+T = TypeVar("T", bound=type)
+
+
+class OCRBackend(ABC):
+    """Reads the text of frames from a frame store."""
+
+    name = ""
+
+    @property
+    def cache_name(self) -> str:
+        """Keys this backend's texts in the artifact cache, it must change whenever the text would."""
+        return self.name
+
+    def extract_frames(
+        self, frame_store: FrameStore, frame_names: Iterable[str]
+    ) -> Dict[str, str]:
+        """Text of every frame, keyed by frame name in frame order."""
+        frame_names = list(frame_names)
+        texts: Dict[str, str] = {}
+        texts.update(
+            self.recognize(
+                frame_store, self.uncached_frames(frame_store, frame_names, texts)
+            )
+        )
+        # frames the store couldn't read were never recognized and have no text
+        return {frame_name: texts.get(frame_name, "") for frame_name in frame_names}
+
+    @abstractmethod
+    def recognize(
+        self, frame_store: FrameStore, frames: Iterator[Tuple[str, bytes]]
+    ) -> Dict[str, str]:
+        """
+        Text of (frame name, encoded frame) pairs that were not in the cache,
+        keyed by frame name. Implementations call `remember` for each text.
+        """
+
+    def uncached_frames(
+        self, frame_store: FrameStore, frame_names: List[str], texts: Dict[str, str]
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        (frame name, encoded frame) of the frames that still need OCR. Frames whose
+        text is in the artifact cache go straight into `texts` instead.
+        """
+        cache = get_artifact_cache()
+        for frame_name in frame_names:
+            content = frame_store.encode(frame_name)
+            # identical frames give identical text, whichever video or run they come from
+            if cache is not None:
+                cached_text = cache.get_json("ocr", self.ocr_cache_key(content))
+                if cached_text is not None:
+                    texts[frame_name] = cached_text
+                    continue
+            yield frame_name, content
+
+    def ocr_cache_key(self, content: bytes) -> str:
+        return cache_key(self.cache_name, hash_bytes(content))
+
+    def remember(self, content: bytes, text: str) -> None:
+        cache = get_artifact_cache()
+        if cache is not None:
+            cache.put_json("ocr", self.ocr_cache_key(content), text)
+
+
+OCR_BACKENDS: Dict[str, type] = {}
+
+# backends hold clients and rate limiters, each process builds its own once
+_instances: Dict[str, OCRBackend] = {}
+
+
+def register_ocr_backend(backend: T) -> T:
+    """Class decorator making a backend available to `get_ocr_backend` under its name."""
+    OCR_BACKENDS[backend.name] = backend  # type:ignore
+    return backend
+
+
+def get_ocr_backend(name: str) -> OCRBackend:
+    """Return this process's instance of the backend registered under `name`."""
+    if name not in OCR_BACKENDS:
+        raise ValueError(
+            f"Unknown OCR backend '{name}', expected one of {sorted(OCR_BACKENDS)}"
+        )
+    if name not in _instances:
+        _instances[name] = OCR_BACKENDS[name]()
+    return _instances[name]
@@ -0,0 +1,28 @@
+"""
+Packing frames into Vision batch requests.
+
+`batch_annotate_images` takes at most 16 images and 10MB per request. The packer
+fills batches greedily in frame order, starting a new batch whenever the next
+image would break either limit, so a batch's responses map straight back to a
+run of consecutive frames. An image too large to share a batch is sent alone.
+"""
+
+from typing import Callable, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+
+def pack_batches(
+    items: Iterable[T], size: Callable[[T], int], max_items: int, max_bytes: int
+) -> Iterator[List[T]]:
+    batch: List[T] = []
+    batch_bytes = 0
+    for item in items:
+        item_bytes = size(item)
+        if batch and (len(batch) >= max_items or batch_bytes + item_bytes > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(item)
+        batch_bytes += item_bytes
+    if batch:
+        yield batch
@@ -0,0 +1,44 @@
+class OCRConfig:
+    """Configuration class for OCR requests."""
+
+    # Concurrency
+    MAX_CONCURRENT_REQUESTS = 8  # OCR requests in flight per pipeline run
+    MAX_QPS = 10.0  # requests per second across every run in the process, None is unlimited
+    BURST = 10  # requests allowed back to back before MAX_QPS applies
+
+    # Retries on quota and transient errors, with full-jitter exponential backoff
+    MAX_RETRIES = 5
+    RETRY_BASE_DELAY = 0.5  # seconds, doubled on every attempt
+    RETRY_MAX_DELAY = 30.0
+
+    # Batching, frames are sent up to MAX_IMAGES_PER_BATCH per batch_annotate_images call
+    MAX_IMAGES_PER_BATCH = 16  # the API's own limit, 1 sends one text_detection call per frame
+    # the API rejects requests over 10MB and base64 grows images by a third,
+    # so a batch's raw image bytes stay below this
+    MAX_BATCH_BYTES = 7 * 1024**2
+
+    # Montage tiling, used by GoogleVisionExtractCodeFromMontages
+    MONTAGE_MAX_TILES = 8  # cropped frames stacked on one canvas
+    MONTAGE_MAX_HEIGHT = 4096  # pixels, a single taller frame still gets a canvas of its own
+    MONTAGE_SEPARATOR_HEIGHT = 48  # blank rows between frames, so no line spans two of them
+    MONTAGE_SEPARATOR_VALUE = 255  # white, unlike the dark editor backgrounds most videos use
+    MONTAGE_SPACE_GAP = 0.4  # a gap between words wider than this share of a character is a space
+
+    # Tesseract, the offline backend
+    TESSERACT_LANGUAGE = "eng"
+    TESSERACT_PAGE_SEGMENTATION = 6  # one uniform block of text, which is what an editor pane is
+    TESSERACT_ENGINE_MODE = 1  # the LSTM recognizer only
+    TESSERACT_SCALE = 2.0  # frames are upscaled first, Tesseract misreads glyphs under ~20px tall
+    TESSERACT_WORKERS = None  # None uses the scheduler's whole process pool, 1 runs Tesseract in-process
+    TESSERACT_PREFETCH_PER_WORKER = 2  # frames queued in the pool ahead of the results, per worker
+
+    # Incremental OCR, used by IncrementalExtractCodeFromFrames
+    INCREMENTAL_INK_THRESHOLD = 48  # gray levels from the background that count as text
+    INCREMENTAL_MIN_LINE_HEIGHT = 4  # pixels, shorter runs of ink rows are noise
+    INCREMENTAL_MAX_LINE_GAP = 2  # background rows a line may contain, between "=" strokes say
+    INCREMENTAL_PIXEL_THRESHOLD = 32  # gray levels a pixel has to move to count as changed
+    INCREMENTAL_MIN_CHANGED_PIXELS = 3  # per row, so compression noise doesn't mark it changed
+    INCREMENTAL_BAND_MARGIN = 16  # background border around each band, OCR misses text at the edge
+    INCREMENTAL_MERGE_CHANGED_BANDS = True  # consecutive changed lines are read as one crop
+    INCREMENTAL_FRAMES_PER_CHUNK = 32  # frames whose changed lines are OCR'd together, bounds memory
+    INCREMENTAL_EMIT_DELTAS = True  # False returns each frame's full spliced text instead
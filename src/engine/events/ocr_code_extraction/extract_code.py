@@ -0,0 +1,51 @@
+import json
+import pathlib
+from typing import Dict, Tuple
+
+from event_pipeline.base import EventBase
+
+from ... import utils
+from ...models import frame_split_type
+from ...scheduler import IOStageExecutor
+from ..download_video.policy import requires_resolution
+from .backends import OCRBackend, get_ocr_backend
+
+
+# OCR of small code fonts gets unreliable below 720p, whichever backend reads them
+@requires_resolution(720)
+class ExtractCodeFromFrames(EventBase):
+    """
+    Reads the text of every remaining frame with the OCR backend chosen for the
+    run (the pipeline's `ocr_backend` field), then releases the frames.
+    """
+
+    executor = IOStageExecutor
+
+    def process(self, ocr_backend: str = "google_vision") -> Tuple[bool, Dict[str, str]]:
+        return self.extract(get_ocr_backend(ocr_backend))
+
+    def extract(self, backend: OCRBackend) -> Tuple[bool, Dict[str, str]]:
+        video: frame_split_type.FrameSplitReturnType = (
+            self.previous_result.first().content  # type:ignore
+        )
+        texts = backend.extract_frames(
+            utils.get_frame_store(video), utils.load_frame_names(video)
+        )
+        frame_num_and_content: Dict[str, str] = {
+            frame_name[len("frame") : -len(".png")]: text
+            for frame_name, text in texts.items()
+        }
+        print(json.dumps(frame_num_and_content))
+        utils.remove_thing_based_on_type(video)
+        return True, frame_num_and_content
+
+    @staticmethod
+    def create_file_with_video_name(
+        level: int,
+        filename: str,
+        content: Dict[str, str],
+    ) -> None:
+        with open(
+            pathlib.Path("expected_data", f"Level{str(level)}", f"{filename}.json"), "w"
+        ) as f:
+            f.write(json.dumps(content, indent=2))
@@ -1,74 +1,163 @@
-import json
-import os
-import pathlib
-from typing import Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-from dotenv import load_dotenv
-from event_pipeline.base import EventBase
+from google.api_core import exceptions as google_exceptions
 from google.cloud import vision
-from google.oauth2 import service_account
-from PIL import Image
 
-from ... import utils
-from ...models import frame_split_type
-
-load_dotenv()
-
-
-class GoogleVisionExtractCodeFromFrames(EventBase):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+from ...clients import get_vision_client
+from ...frame_store import FrameStore
+from .backends import OCRBackend, get_ocr_backend, register_ocr_backend
+from .batching import pack_batches
+from .config import OCRConfig
+from .extract_code import ExtractCodeFromFrames
+from .rate_limit import call_with_retry, get_rate_limiter
+
+# google.rpc codes that mean "slow down" or "try again": DEADLINE_EXCEEDED,
+# RESOURCE_EXHAUSTED (quota) and UNAVAILABLE
+RETRYABLE_STATUS_CODES = {4, 8, 14}
+
+
+class VisionRequestError(Exception):
+    """An error the Vision API reported inside an otherwise successful response."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def is_retryable_vision_error(error: Exception) -> bool:
+    if isinstance(error, VisionRequestError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(
+        error,
+        (
+            google_exceptions.ResourceExhausted,
+            google_exceptions.TooManyRequests,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+        ),
+    )
+
+
+@register_ocr_backend
+class GoogleVisionOCRBackend(OCRBackend):
+    """Text detection with the Google Vision API, many frames per batch request."""
+
+    name = "google_vision"
+    # swapped for a fake ImageAnnotatorClient in tests and benchmarks
+    client_factory = staticmethod(get_vision_client)
+    config = OCRConfig
+
+    def __init__(self):
+        self.client = self.client_factory()
+        self.rate_limiter = get_rate_limiter(
+            "google_vision", self.config.MAX_QPS, self.config.BURST
+        )
 
-        credentials_info = {
-            "type": "service_account",
-            "project_id": os.getenv("GOOGLE_CLOUD_PROJECT_ID"),
-            "private_key_id": os.getenv("GOOGLE_CLOUD_PRIVATE_KEY_ID"),
-            "private_key": os.getenv("GOOGLE_CLOUD_PRIVATE_KEY").replace("\\n", "\n"),  # type: ignore
-            "client_email": os.getenv("GOOGLE_CLOUD_CLIENT_EMAIL"),
-            "client_id": os.getenv("GOOGLE_CLOUD_CLIENT_ID"),
-            "auth_uri": os.getenv("GOOGLE_CLOUD_AUTH_URI"),
-            "token_uri": os.getenv("GOOGLE_CLOUD_TOKEN_URI"),
-        }
+    def recognize(
+        self, frame_store: FrameStore, frames: Iterator[Tuple[str, bytes]]
+    ) -> Dict[str, str]:
+        texts: Dict[str, str] = {}
+        # batch requests are sent concurrently, each one covers a run of consecutive frames
+        with ThreadPoolExecutor(
+            max_workers=self.config.MAX_CONCURRENT_REQUESTS,
+            thread_name_prefix="vision-ocr",
+        ) as executor:
+            requests = [
+                executor.submit(self.extract_batch, batch)
+                for batch in self.batches(frame_store, frames)
+            ]
+            for request in requests:
+                texts.update(request.result())
+        return texts
+
+    def batches(
+        self, frame_store, frames: Iterable[Tuple[str, bytes]]
+    ) -> Iterator[List[Tuple[str, bytes]]]:
+        """Group frames into the payloads of single OCR requests."""
+        return pack_batches(
+            frames,
+            lambda frame: len(frame[1]),
+            self.config.MAX_IMAGES_PER_BATCH,
+            self.config.MAX_BATCH_BYTES,
+        )
 
-        credentials = service_account.Credentials.from_service_account_info(
-            credentials_info
+    def extract_batch(self, batch: List[Tuple[str, bytes]]) -> Dict[str, str]:
+        texts = [
+            self.text_from_response(response)
+            for response in self.annotate_batch([content for _, content in batch])
+        ]
+        for (_, content), text in zip(batch, texts):
+            self.remember(content, text)
+        return {frame_name: text for (frame_name, _), text in zip(batch, texts)}
+
+    def detect_text(self, content: bytes) -> str:
+        return self.text_from_response(self.annotate(content))
+
+    def annotate(self, content: bytes):
+        """The text_detection response for one image, retried on quota and transient errors."""
+        return call_with_retry(
+            lambda: self.request_text_detection(content),
+            is_retryable_vision_error,
+            self.config.MAX_RETRIES,
+            self.config.RETRY_BASE_DELAY,
+            self.config.RETRY_MAX_DELAY,
+            self.rate_limiter,
         )
-        self.client = vision.ImageAnnotatorClient(credentials=credentials)
 
-    def process(self) -> Tuple[bool, Dict[str, str]]:
-        video: frame_split_type.FrameSplitReturnType = (
-            self.previous_result.first().content  # type:ignore
+    def request_text_detection(self, content: bytes):
+        image = vision.Image(content=content)
+        response = self.client.text_detection(image=image)
+        self.check_response(response)
+        return response
+
+    def annotate_batch(self, contents: List[bytes]) -> List:
+        """Responses for many images, in order, from a single batch_annotate_images call."""
+        if len(contents) == 1:
+            return [self.annotate(contents[0])]
+
+        response = call_with_retry(
+            lambda: self.client.batch_annotate_images(
+                requests=[
+                    vision.AnnotateImageRequest(
+                        image=vision.Image(content=content),
+                        features=[vision.Feature(type_=vision.Feature.Type.TEXT_DETECTION)],
+                    )
+                    for content in contents
+                ]
+            ),
+            is_retryable_vision_error,
+            self.config.MAX_RETRIES,
+            self.config.RETRY_BASE_DELAY,
+            self.config.RETRY_MAX_DELAY,
+            self.rate_limiter,
         )
-        frame_names = utils.load_frame_names(video)
-        frame_num_and_content: Dict[str, str] = {}
 
-        for frame_name in frame_names:
-            frame_num_and_content[frame_name[len("frame") : -len(".png")]] = (
-                self.extract_content(video, frame_name)
+        if len(response.responses) != len(contents):
+            raise VisionRequestError(
+                0, f"Expected {len(contents)} responses, got {len(response.responses)}"
             )
-        print(json.dumps(frame_num_and_content))
-        utils.remove_thing_based_on_type(video)
-        return True, frame_num_and_content
+
+        responses = []
+        # responses come back in request order
+        for content, image_response in zip(contents, response.responses):
+            try:
+                self.check_response(image_response)
+            except VisionRequestError as e:
+                if not is_retryable_vision_error(e):
+                    raise
+                # one throttled image doesn't mean resending the whole batch
+                image_response = self.annotate(content)
+            responses.append(image_response)
+        return responses
 
     @staticmethod
-    def create_file_with_video_name(
-        level: int,
-        filename: str,
-        content: Dict[str, str],
-    ) -> None:
-        with open(
-            pathlib.Path("expected_data", f"Level{str(level)}", f"{filename}.json"), "w"
-        ) as f:
-            f.write(json.dumps(content, indent=2))
-
-    def extract_content(self, video, frame_name):
-        image_path = pathlib.Path(video.frames_path, frame_name)
-
-        with open(image_path, "rb") as image_file:
-            content = image_file.read()
+    def check_response(response) -> None:
+        if not response.text_annotations and response.error.message:
+            raise VisionRequestError(response.error.code, f"{response.error.message}")
 
-        image = vision.Image(content=content)
-        response = self.client.text_detection(image=image)
+    @staticmethod
+    def text_from_response(response) -> str:
         texts = response.text_annotations
 
         if texts:
@@ -77,7 +166,9 @@ class GoogleVisionExtractCodeFromFrames(EventBase):
             # to find which of the descriptions actually contains code. and then remove the ones that don't. that could be a step after this point
             return texts[0].description
 
-        if response.error.message:
-            raise Exception(f"{response.error.message}")
-
         return ""
+
+
+class GoogleVisionExtractCodeFromFrames(ExtractCodeFromFrames):
+    def process(self) -> Tuple[bool, Dict[str, str]]:
+        return self.extract(get_ocr_backend(GoogleVisionOCRBackend.name))
@@ -0,0 +1,224 @@
+"""
+Incremental OCR: read only the lines that changed since the previous kept frame.
+
+Consecutive code frames of a tutorial usually differ by a few typed lines.
+Every frame is cut into line bands, and each band is compared pixel by pixel
+with the band at the same position in the previous frame. Unchanged bands keep
+the text read for them before. Changed bands are cropped and sent to the OCR
+backend, and their text is spliced into the previous frame's lines by position.
+
+Consecutive changed bands are read as one crop, and its lines are handed out
+to the bands in order. When the line count doesn't match the band count, the
+bands of that crop are read again one image each. Every crop is still a request
+of its own with google_vision, so google_vision_montage, which puts the crops
+of many frames on one canvas, or the local tesseract suit this stage best.
+"""
+
+import json
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import cv2 as cv
+import numpy as np
+
+from ... import utils
+from ...frame_store import FrameStore, InMemoryFrameStore
+from ...models import frame_split_type
+from ...text_delta import line_deltas, render_deltas
+from .backends import OCRBackend
+from .config import OCRConfig
+from .extract_code import ExtractCodeFromFrames
+from .line_bands import (LineBand, band_rows, changed_rows, crop_band,
+                         find_line_bands, frame_lines, text_lines)
+
+
+class FramePlan(NamedTuple):
+    frame_name: str
+    bands: List[LineBand]
+    # per band, the previous frame's band whose text it keeps, or the name of its crop to OCR
+    sources: List[Tuple[Optional[int], Optional[str]]]
+    # per crop, the rows of each of its bands, relative to the crop's top
+    crop_rows: Dict[str, List[Tuple[int, int]]]
+
+
+class IncrementalExtractCodeFromFrames(ExtractCodeFromFrames):
+    """
+    OCR of the changed line bands only, with the pipeline's `ocr_backend`.
+
+    Returns frame number -> text like the other OCR stages. With
+    INCREMENTAL_EMIT_DELTAS the first frame's text is complete and every later
+    frame has the line deltas against the frame before it (see `text_delta`),
+    or its full text when that is shorter. Frames that changed nothing are left
+    out.
+    """
+
+    config = OCRConfig
+
+    def extract(self, backend: OCRBackend) -> Tuple[bool, Dict[str, str]]:
+        video: frame_split_type.FrameSplitReturnType = (
+            self.previous_result.first().content  # type:ignore
+        )
+        frame_store = utils.get_frame_store(video)
+
+        frame_num_and_content: Dict[str, str] = {}
+        previous_lines: Optional[List[str]] = None
+        read = total = 0
+        for frame_name, lines, bands_read, bands in self.read_frames(
+            backend, frame_store, list(utils.load_frame_names(video))
+        ):
+            read += bands_read
+            total += bands
+            frame_number = frame_name[len("frame") : -len(".png")]
+            text = "\n".join(lines)
+            if not self.config.INCREMENTAL_EMIT_DELTAS or previous_lines is None:
+                frame_num_and_content[frame_number] = text
+            else:
+                deltas = line_deltas(previous_lines, lines)
+                if deltas:
+                    delta_text = render_deltas(deltas)
+                    frame_num_and_content[frame_number] = min(delta_text, text, key=len)
+            previous_lines = lines
+
+        print(f"Incremental OCR read {read} of {total} lines")
+        print(json.dumps(frame_num_and_content))
+        utils.remove_thing_based_on_type(video)
+        return True, frame_num_and_content
+
+    def read_frames(
+        self, backend: OCRBackend, frame_store: FrameStore, frame_names: List[str]
+    ) -> Iterator[Tuple[str, List[str], int, int]]:
+        """
+        (frame name, lines, bands OCR'd, bands) of every readable frame, in frame
+        order. Frames are planned and OCR'd a chunk at a time, so only one chunk's
+        band crops are held in memory.
+        """
+        previous: Optional[Tuple[np.ndarray, Dict[LineBand, int]]] = None
+        previous_texts: List[str] = []
+        chunk_size = self.config.INCREMENTAL_FRAMES_PER_CHUNK
+        for start in range(0, len(frame_names), chunk_size):
+            crops = InMemoryFrameStore()
+            plans: List[FramePlan] = []
+            for frame_name in frame_names[start : start + chunk_size]:
+                frame = frame_store.read(frame_name)
+                if frame is None:
+                    continue
+                plan, previous = self.plan_frame(frame_name, frame, previous, crops)
+                plans.append(plan)
+
+            texts = self.split_crops(backend, crops, plans)
+            for plan in plans:
+                crop_texts = {crop_name: iter(texts[crop_name]) for crop_name in plan.crop_rows}
+                band_texts = [
+                    previous_texts[kept] if kept is not None
+                    else next(crop_texts[crop_name])  # type:ignore
+                    for kept, crop_name in plan.sources
+                ]
+                bands_read = sum(kept is None for kept, _ in plan.sources)
+                yield (
+                    plan.frame_name,
+                    frame_lines(plan.bands, band_texts),
+                    bands_read,
+                    len(plan.bands),
+                )
+                previous_texts = band_texts
+            crops.destroy()
+
+    def split_crops(
+        self, backend: OCRBackend, crops: FrameStore, plans: List[FramePlan]
+    ) -> Dict[str, List[str]]:
+        """
+        OCR every crop of `plans` and split its text into the text of each of
+        its bands. A crop of several bands whose text doesn't have one line per
+        band is read again band by band, cut out of the crop.
+        """
+        margin = self.config.INCREMENTAL_BAND_MARGIN
+        texts = backend.extract_frames(crops, list(crops.frame_names()))
+
+        band_texts: Dict[str, List[str]] = {}
+        bands = InMemoryFrameStore()
+        for plan in plans:
+            for crop_name, rows in plan.crop_rows.items():
+                lines = text_lines(texts[crop_name])
+                if len(rows) == 1:
+                    band_texts[crop_name] = [texts[crop_name]]
+                elif len(lines) == len(rows):
+                    band_texts[crop_name] = lines
+                else:
+                    crop = crops.read(crop_name)
+                    inner = crop[:, margin : crop.shape[1] - margin]  # type:ignore
+                    for i, (top, bottom) in enumerate(rows):
+                        bands.write(
+                            f"{crop_name}:{i}",
+                            crop_band(inner, margin + top, margin + bottom, margin),
+                        )
+
+        band_names = list(bands.frame_names())
+        if band_names:
+            read_again = backend.extract_frames(bands, band_names)
+            for plan in plans:
+                for crop_name, rows in plan.crop_rows.items():
+                    if crop_name not in band_texts:
+                        band_texts[crop_name] = [
+                            read_again[f"{crop_name}:{i}"] for i in range(len(rows))
+                        ]
+        bands.destroy()
+        return band_texts
+
+    def plan_frame(
+        self,
+        frame_name: str,
+        frame: np.ndarray,
+        previous: Optional[Tuple[np.ndarray, Dict[LineBand, int]]],
+        crops: FrameStore,
+    ) -> Tuple[FramePlan, Tuple[np.ndarray, Dict[LineBand, int]]]:
+        """
+        Which bands of `frame` keep the previous frame's text and which are
+        cropped into `crops` to be read, given the previous frame's grayscale
+        pixels and band positions.
+        """
+        config = self.config
+        gray = frame if frame.ndim == 2 else cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        bands = find_line_bands(
+            gray,
+            config.INCREMENTAL_INK_THRESHOLD,
+            config.INCREMENTAL_MIN_LINE_HEIGHT,
+            config.INCREMENTAL_MAX_LINE_GAP,
+        )
+        changed = (
+            changed_rows(
+                previous[0],
+                gray,
+                config.INCREMENTAL_PIXEL_THRESHOLD,
+                config.INCREMENTAL_MIN_CHANGED_PIXELS,
+            )
+            if previous is not None
+            else None
+        )
+
+        sources: List[Tuple[Optional[int], Optional[str]]] = []
+        crop_rows: Dict[str, List[Tuple[int, int]]] = {}
+        crop_name: Optional[str] = None
+        for i, band in enumerate(bands):
+            # unchanged pixels at the same position read the same, whatever OCR would say
+            if (
+                changed is not None
+                and band in previous[1]  # type:ignore
+                and not changed[band.top : band.bottom].any()
+            ):
+                sources.append((previous[1][band], None))  # type:ignore
+                crop_name = None
+                continue
+            if crop_name is None or not config.INCREMENTAL_MERGE_CHANGED_BANDS:
+                crop_name = f"{frame_name}:{i}"
+                crop_rows[crop_name] = []
+            crop_rows[crop_name].append(band_rows(bands, i, gray.shape[0]))
+            sources.append((None, crop_name))
+
+        for crop_name, rows in crop_rows.items():
+            top, bottom = rows[0][0], rows[-1][1]
+            crops.write(crop_name, crop_band(frame, top, bottom, config.INCREMENTAL_BAND_MARGIN))
+            crop_rows[crop_name] = [(band_top - top, band_bottom - top) for band_top, band_bottom in rows]
+
+        return FramePlan(frame_name, bands, sources, crop_rows), (
+            gray,
+            {band: i for i, band in enumerate(bands)},
+        )
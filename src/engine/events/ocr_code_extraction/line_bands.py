@@ -0,0 +1,92 @@
+"""
+Line bands of code frames, and which of them changed between two frames.
+
+A line band is a run of pixel rows holding one line of text: editor text sits on
+a flat background, so the rows with ink in them come in runs separated by
+background rows. Comparing a frame with the previous kept one row by row shows
+which bands changed, and only those need to be read again.
+"""
+
+from typing import List, NamedTuple, Optional, Tuple
+
+import cv2 as cv
+import numpy as np
+
+
+class LineBand(NamedTuple):
+    top: int  # first row of the line
+    bottom: int  # one past its last row
+
+
+def background_value(gray: np.ndarray) -> int:
+    return int(np.median(gray))
+
+
+def find_line_bands(
+    gray: np.ndarray, ink_threshold: int, min_height: int, max_gap: int
+) -> List[LineBand]:
+    """Line bands of a grayscale frame, top to bottom."""
+    ink = np.abs(gray.astype(np.int16) - background_value(gray)) > ink_threshold
+    rows = np.flatnonzero(ink.any(axis=1))
+
+    bands: List[LineBand] = []
+    if len(rows) == 0:
+        return bands
+    # a new band starts wherever more than max_gap background rows separate two ink rows
+    breaks = np.flatnonzero(np.diff(rows) > max_gap + 1)
+    for start, end in zip(np.r_[0, breaks + 1], np.r_[breaks, len(rows) - 1]):
+        top, bottom = int(rows[start]), int(rows[end]) + 1
+        if bottom - top >= min_height:
+            bands.append(LineBand(top, bottom))
+    return bands
+
+
+def changed_rows(
+    previous: np.ndarray, gray: np.ndarray, pixel_threshold: int, min_changed_pixels: int
+) -> Optional[np.ndarray]:
+    """Boolean per row of `gray`, None when the frames can't be compared row by row."""
+    if previous.shape != gray.shape:
+        return None
+    difference = cv.absdiff(previous, gray) > pixel_threshold
+    return difference.sum(axis=1) >= min_changed_pixels
+
+
+def band_rows(bands: List[LineBand], index: int, height: int) -> Tuple[int, int]:
+    """
+    Rows to crop for a band, halfway into the background gap on either side, so
+    glyph edges that spill past the band are read with it.
+    """
+    band = bands[index]
+    top = (bands[index - 1].bottom + band.top) // 2 if index > 0 else 0
+    bottom = (band.bottom + bands[index + 1].top + 1) // 2 if index + 1 < len(bands) else height
+    return top, bottom
+
+
+def crop_band(frame: np.ndarray, top: int, bottom: int, margin: int) -> np.ndarray:
+    """Rows top:bottom of the frame, framed by a border of its background color."""
+    crop = frame[top:bottom]
+    if frame.ndim == 3:
+        border = [int(value) for value in np.median(frame.reshape(-1, 3), axis=0)]
+    else:
+        border = [background_value(frame)]
+    return cv.copyMakeBorder(
+        crop, margin, margin, margin, margin, cv.BORDER_CONSTANT, value=border
+    )
+
+
+def text_lines(text: str) -> List[str]:
+    """OCR text as lines, without the blank ones that have no band."""
+    return [line.rstrip() for line in text.splitlines() if line.strip()]
+
+
+def frame_lines(bands: List[LineBand], band_texts: List[str]) -> List[str]:
+    """A frame's lines from the text of each of its bands, with its blank lines put back."""
+    tops = [band.top for band in bands]
+    # most bands are one line apart, so a low percentile of their distances is the line pitch
+    pitch = float(np.percentile(np.diff(tops), 25)) if len(tops) > 1 else 0.0
+    lines: List[str] = []
+    for i, text in enumerate(band_texts):
+        if i and pitch > 0:
+            lines.extend([""] * (round((tops[i] - tops[i - 1]) / pitch) - 1))
+        lines.extend(text_lines(text))
+    return lines
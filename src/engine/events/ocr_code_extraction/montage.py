@@ -0,0 +1,162 @@
+"""
+Montage tiling for OCR.
+
+After cropping, each frame is a small code region, and OCR'ing them one image at
+a time pays the per-image cost of the OCR service for little text. A montage
+stacks several cropped frames vertically on one canvas, separated by blank
+bands, so a single image carries the text of several frames.
+
+Vision returns one annotation per word with its bounding polygon on the canvas.
+`split_montage_text` hands every word back to the frame its centre falls in and
+rebuilds each frame's text from its words: words are grouped into lines by their
+vertical position, ordered left to right, and joined with a space only where the
+gap between them is wide enough to be one.
+"""
+
+import bisect
+import statistics
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import cv2 as cv
+import numpy as np
+
+
+class MontageTile(NamedTuple):
+    frame_name: str
+    top: int  # first canvas row of the frame
+    height: int
+    width: int
+    cache_key: Optional[str] = None
+
+
+class Word(NamedTuple):
+    text: str
+    left: float
+    top: float
+    right: float
+    bottom: float
+
+    @property
+    def center_y(self) -> float:
+        return (self.top + self.bottom) / 2
+
+    @property
+    def height(self) -> float:
+        return self.bottom - self.top
+
+    @property
+    def char_width(self) -> float:
+        return (self.right - self.left) / max(1, len(self.text))
+
+
+def build_montages(
+    frames: Iterable[Tuple[str, np.ndarray, Optional[str]]],
+    max_tiles: int,
+    max_height: int,
+    separator_height: int,
+    separator_value: int = 255,
+) -> Iterator[Tuple[np.ndarray, List[MontageTile]]]:
+    """
+    Stack (frame name, BGR or grayscale frame, cache key) triples into canvases, in
+    frame order, each at most `max_tiles` frames and `max_height` rows tall.
+    """
+    pending: List[Tuple[str, np.ndarray, Optional[str]]] = []
+    height = 0
+    for frame_name, frame, key in frames:
+        if frame.ndim == 2:
+            frame = cv.cvtColor(frame, cv.COLOR_GRAY2BGR)
+        if pending and (
+            len(pending) >= max_tiles
+            or height + separator_height + frame.shape[0] > max_height
+        ):
+            yield _compose(pending, separator_height, separator_value)
+            pending, height = [], 0
+        height += frame.shape[0] + (separator_height if pending else 0)
+        pending.append((frame_name, frame, key))
+    if pending:
+        yield _compose(pending, separator_height, separator_value)
+
+
+def _compose(
+    frames: List[Tuple[str, np.ndarray, Optional[str]]],
+    separator_height: int,
+    separator_value: int,
+) -> Tuple[np.ndarray, List[MontageTile]]:
+    width = max(frame.shape[1] for _, frame, _ in frames)
+    height = sum(frame.shape[0] for _, frame, _ in frames) + separator_height * (
+        len(frames) - 1
+    )
+    canvas = np.full((height, width, 3), separator_value, dtype=np.uint8)
+    tiles = []
+    top = 0
+    for frame_name, frame, key in frames:
+        frame_height, frame_width = frame.shape[:2]
+        canvas[top : top + frame_height, :frame_width] = frame
+        tiles.append(MontageTile(frame_name, top, frame_height, frame_width, key))
+        top += frame_height + separator_height
+    return canvas, tiles
+
+
+def annotation_word(annotation) -> Word:
+    """A Word from a Vision EntityAnnotation, vertices without an x or y are at 0."""
+    vertices = annotation.bounding_poly.vertices
+    xs = [getattr(vertex, "x", 0) or 0 for vertex in vertices]
+    ys = [getattr(vertex, "y", 0) or 0 for vertex in vertices]
+    return Word(annotation.description, min(xs), min(ys), max(xs), max(ys))
+
+
+def tile_for(tiles: Sequence[MontageTile], tops: List[int], y: float) -> MontageTile:
+    """The tile containing row `y`, or the nearest one when `y` is in a separator."""
+    index = max(0, bisect.bisect_right(tops, y) - 1)
+    tile = tiles[index]
+    if y >= tile.top + tile.height and index + 1 < len(tiles):
+        following = tiles[index + 1]
+        if following.top - y < y - (tile.top + tile.height):
+            return following
+    return tile
+
+
+def split_montage_text(
+    annotations: Iterable, tiles: Sequence[MontageTile], space_gap: float
+) -> Dict[str, str]:
+    """Text of every tile, from the word annotations (text_annotations[1:]) of its canvas."""
+    tops = [tile.top for tile in tiles]
+    words: Dict[str, List[Word]] = {tile.frame_name: [] for tile in tiles}
+    for annotation in annotations:
+        word = annotation_word(annotation)
+        tile = tile_for(tiles, tops, word.center_y)
+        # kept in canvas coordinates, only relative positions matter from here on
+        words[tile.frame_name].append(word)
+    return {
+        frame_name: words_to_text(frame_words, space_gap)
+        for frame_name, frame_words in words.items()
+    }
+
+
+def words_to_text(words: List[Word], space_gap: float) -> str:
+    lines: List[List[Word]] = []
+    for word in sorted(words, key=lambda word: word.center_y):
+        if lines:
+            line = lines[-1]
+            line_center = statistics.fmean(other.center_y for other in line)
+            line_height = statistics.median(other.height for other in line)
+            if abs(word.center_y - line_center) <= line_height / 2:
+                line.append(word)
+                continue
+        lines.append([word])
+
+    text_lines = []
+    for line in lines:
+        line.sort(key=lambda word: word.left)
+        text = line[0].text
+        for previous, word in zip(line, line[1:]):
+            if word.left - previous.right > space_gap * previous.char_width:
+                text += " "
+            text += word.text
+        text_lines.append(text)
+    return "\n".join(text_lines)
+
+
+def encode_montage(canvas: np.ndarray, jpeg_quality: int = 95) -> bytes:
+    _, encoded = cv.imencode(".jpg", canvas, [cv.IMWRITE_JPEG_QUALITY, jpeg_quality])
+    return encoded.tobytes()
@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from ...artifact_cache import get_artifact_cache
+from ...frame_store import FrameStore
+from .backends import get_ocr_backend, register_ocr_backend
+from .batching import pack_batches
+from .extract_code import ExtractCodeFromFrames
+from .google_vision_extraction import GoogleVisionOCRBackend
+from .montage import (MontageTile, build_montages, encode_montage,
+                      split_montage_text)
+
+Montage = Tuple[List[MontageTile], bytes]
+
+
+@register_ocr_backend
+class GoogleVisionMontageOCRBackend(GoogleVisionOCRBackend):
+    """
+    Vision OCR of cropped frames tiled into montages, several frames per image.
+
+    It returns the same text per frame as GoogleVisionOCRBackend, with each
+    frame's text rebuilt from the word boxes Vision found inside that frame's
+    tile. See `benchmarks/montage_accuracy_benchmark.py` for how close that gets
+    to OCR'ing frames one by one.
+    """
+
+    name = "google_vision_montage"
+
+    def batches(
+        self, frame_store: FrameStore, frames: Iterable[Tuple[str, bytes]]
+    ) -> Iterator[List[Montage]]:
+        return pack_batches(
+            self.montages(frame_store, frames),
+            lambda montage: len(montage[1]),
+            self.config.MAX_IMAGES_PER_BATCH,
+            self.config.MAX_BATCH_BYTES,
+        )
+
+    def montages(
+        self, frame_store: FrameStore, frames: Iterable[Tuple[str, bytes]]
+    ) -> Iterator[Montage]:
+        readable = (
+            (frame_name, frame, self.ocr_cache_key(content))
+            for frame_name, content in frames
+            for frame in [frame_store.read(frame_name)]
+            if frame is not None
+        )
+        for canvas, tiles in build_montages(
+            readable,
+            self.config.MONTAGE_MAX_TILES,
+            self.config.MONTAGE_MAX_HEIGHT,
+            self.config.MONTAGE_SEPARATOR_HEIGHT,
+            self.config.MONTAGE_SEPARATOR_VALUE,
+        ):
+            yield tiles, encode_montage(canvas)
+
+    def extract_batch(self, batch: List[Montage]) -> Dict[str, str]:
+        texts: Dict[str, str] = {}
+        responses = self.annotate_batch([canvas for _, canvas in batch])
+        for (tiles, _), response in zip(batch, responses):
+            # the first annotation is the whole canvas' text, the rest are single words
+            texts.update(
+                split_montage_text(
+                    list(response.text_annotations)[1:],
+                    tiles,
+                    self.config.MONTAGE_SPACE_GAP,
+                )
+            )
+
+        cache = get_artifact_cache()
+        if cache is not None:
+            for tiles, _ in batch:
+                for tile in tiles:
+                    cache.put_json("ocr", tile.cache_key, texts[tile.frame_name])
+        return texts
+
+
+class GoogleVisionExtractCodeFromMontages(ExtractCodeFromFrames):
+    """A drop-in replacement for GoogleVisionExtractCodeFromFrames after CropFrames."""
+
+    def process(self) -> Tuple[bool, Dict[str, str]]:
+        return self.extract(get_ocr_backend(GoogleVisionMontageOCRBackend.name))
@@ -0,0 +1,90 @@
+"""
+Request pacing for OCR services.
+
+`TokenBucket` caps the request rate shared by every pipeline run in the process,
+since the Vision quota is per project rather than per run. `call_with_retry`
+retries a request that hit a quota or transient error after a jittered
+exponential backoff, so concurrent workers that were throttled together don't
+all retry at the same moment.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` calls per second with bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting until one is available. Returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+_buckets: Dict[Tuple[str, float, int], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    name: str, rate: Optional[float], burst: int
+) -> Optional[TokenBucket]:
+    """The process-wide bucket for `name`, None when `rate` is None (unlimited)."""
+    if rate is None:
+        return None
+    with _buckets_lock:
+        key = (name, rate, burst)
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(rate, burst)
+        return _buckets[key]
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full jitter: uniform between 0 and the capped exponential delay of `attempt`."""
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+def call_with_retry(
+    request: Callable[[], T],
+    is_retryable: Callable[[Exception], bool],
+    max_retries: int,
+    base_delay: float,
+    max_delay: float,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> T:
+    """Call `request`, retrying up to `max_retries` times on errors `is_retryable` accepts."""
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            return request()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            print(f"OCR request failed ({e}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
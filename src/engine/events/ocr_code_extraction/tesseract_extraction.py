@@ -0,0 +1,166 @@
+"""
+Offline OCR with Tesseract.
+
+Tesseract reads a frame as a page of prose, which loses what matters most in
+code: indentation and the spacing between tokens. This backend reads word boxes
+with `image_to_data` instead of plain text and lays the words out on a
+monospace grid, one column per median character width, so a line indented by
+eight characters comes back indented by eight spaces.
+
+Tesseract is CPU bound, so frames are recognized in a process pool.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from typing import Deque, Dict, Iterator, List, Tuple
+
+import cv2 as cv
+import numpy as np
+import pytesseract
+
+from ...frame_store import FrameStore
+from ...scheduler import worker_process_pool
+from .backends import OCRBackend, register_ocr_backend
+from .config import OCRConfig
+
+# (left, top, width, height, text) of one recognized word
+WordBox = Tuple[int, int, int, int, str]
+
+
+def tesseract_options(config: type[OCRConfig]) -> str:
+    return (
+        f"--psm {config.TESSERACT_PAGE_SEGMENTATION} "
+        f"--oem {config.TESSERACT_ENGINE_MODE} "
+        "-c preserve_interword_spaces=1"
+    )
+
+
+def prepare_for_tesseract(frame: np.ndarray, scale: float) -> np.ndarray:
+    """Dark text on a light background, upscaled, which is what Tesseract is trained on."""
+    gray = frame if frame.ndim == 2 else cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+    # most editor themes are dark
+    if gray.mean() < 128:
+        gray = cv.bitwise_not(gray)
+    if scale != 1:
+        gray = cv.resize(gray, None, fx=scale, fy=scale, interpolation=cv.INTER_CUBIC)
+    return gray
+
+
+def word_lines(data: Dict[str, List]) -> List[List[WordBox]]:
+    """Words of an `image_to_data` result grouped into lines, top to bottom and left to right."""
+    lines: Dict[Tuple[int, int, int], List[WordBox]] = {}
+    for i, text in enumerate(data["text"]):
+        if data["level"][i] != 5 or not text.strip():
+            continue
+        line = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(line, []).append(
+            (data["left"][i], data["top"][i], data["width"][i], data["height"][i], text)
+        )
+    return sorted(
+        (sorted(words) for words in lines.values()),
+        key=lambda words: min(word[1] for word in words),
+    )
+
+
+def layout_words(lines: List[List[WordBox]]) -> str:
+    """Text of word lines with indentation, spacing and blank lines rebuilt on a monospace grid."""
+    words = [word for line in lines for word in line]
+    if not words:
+        return ""
+    char_width = float(np.median([width / len(text) for _, _, width, _, text in words]))
+    margin = min(left for left, _, _, _, _ in words)
+    tops = [min(word[1] for word in line) for line in lines]
+    # most consecutive lines are one line apart, a low percentile of their distances is the
+    # line pitch even when a short snippet has as many blank lines as written ones
+    pitch = float(np.percentile(np.diff(tops), 25)) if len(tops) > 1 else 0.0
+
+    text_lines: List[str] = []
+    for i, line in enumerate(lines):
+        if i and pitch > 0:
+            text_lines.extend([""] * (round((tops[i] - tops[i - 1]) / pitch) - 1))
+
+        column = 0
+        text = ""
+        for left, _, _, _, word in line:
+            target = round((left - margin) / char_width)
+            # two words always have at least a space between them, even if the boxes touch
+            spaces = max(target - column, 1 if text else 0)
+            text += " " * spaces + word
+            column += spaces + len(word)
+        text_lines.append(text)
+    return "\n".join(text_lines)
+
+
+def tesseract_text(content: bytes, language: str, options: str, scale: float) -> str:
+    """
+    Code in an encoded frame. Runs in the worker processes, so it takes plain
+    settings rather than a config class, which may not be importable there.
+    """
+    frame = cv.imdecode(np.frombuffer(content, np.uint8), cv.IMREAD_GRAYSCALE)
+    if frame is None:
+        return ""
+    data = pytesseract.image_to_data(
+        prepare_for_tesseract(frame, scale),
+        lang=language,
+        config=options,
+        output_type=pytesseract.Output.DICT,
+    )
+    return layout_words(word_lines(data))
+
+
+@register_ocr_backend
+class TesseractOCRBackend(OCRBackend):
+    """Local OCR, no network calls, quota or credentials."""
+
+    name = "tesseract"
+    config = OCRConfig
+
+    @property
+    def cache_name(self) -> str:
+        # a different language, mode or scale reads different text from the same frame
+        return (
+            f"{self.name}:{self.config.TESSERACT_LANGUAGE}:"
+            f"{tesseract_options(self.config)}:{self.config.TESSERACT_SCALE}"
+        )
+
+    def recognize(
+        self, frame_store: FrameStore, frames: Iterator[Tuple[str, bytes]]
+    ) -> Dict[str, str]:
+        texts: Dict[str, str] = {}
+        for frame_name, content, text in self.recognize_stream(frames):
+            self.remember(content, text)
+            texts[frame_name] = text
+        return texts
+
+    def recognize_stream(
+        self, frames: Iterator[Tuple[str, bytes]]
+    ) -> Iterator[Tuple[str, bytes, str]]:
+        """
+        (frame name, encoded frame, text) in frame order. With more than one worker,
+        up to `workers * TESSERACT_PREFETCH_PER_WORKER` frames are in the pool at once.
+        """
+        read = partial(
+            tesseract_text,
+            language=self.config.TESSERACT_LANGUAGE,
+            options=tesseract_options(self.config),
+            scale=self.config.TESSERACT_SCALE,
+        )
+        workers = self.config.TESSERACT_WORKERS or os.cpu_count() or 1
+        if workers <= 1:
+            for frame_name, content in frames:
+                yield frame_name, content, read(content)
+            return
+
+        pending: Deque[Tuple[str, bytes, Future]] = deque()
+        with worker_process_pool(workers) as executor:
+            prefetch = executor.max_workers * self.config.TESSERACT_PREFETCH_PER_WORKER
+            for frame_name, content in frames:
+                pending.append((frame_name, content, executor.submit(read, content)))
+                if len(pending) >= prefetch:
+                    frame_name, content, future = pending.popleft()
+                    yield frame_name, content, future.result()
+            while pending:
+                frame_name, content, future = pending.popleft()
+                yield frame_name, content, future.result()
@@ -1,32 +1,29 @@
-import os
 import re
 from pathlib import Path
 from typing import Tuple, Union
 
-from dotenv import load_dotenv
 from event_pipeline.base import EventBase
-from openai import OpenAI
 
+from ...artifact_cache import cache_key, get_artifact_cache
+from ...clients import get_llm_client
 from ...models.prompt_data import (FileCreationPromptData,
                                    FrameExtractionPromptData)
 from ...models.test_data import YoutubeObject
+from ...scheduler import IOStageExecutor
 from ...utils import (load_prompt_data_for_file_creation,
                       load_prompt_for_frame_parsing)
 
-load_dotenv()
-
 
 class CreateProject(EventBase):
+    executor = IOStageExecutor
+
     def process(
         self, youtube_object: list[YoutubeObject]
     ) -> Tuple[bool, Union[str, None]]:
 
         file_creation_prompt_data = load_prompt_data_for_file_creation()
         
-        client = OpenAI(
-            api_key=f"{os.getenv("DEEPSEEK_API_KEY")}",
-            base_url="https://api.deepseek.com",
-        )
+        client = get_llm_client()
         # level_info = self.get_level_data()
         input_data = self.previous_result.first().content  # type:ignore
 
@@ -39,6 +36,20 @@ class CreateProject(EventBase):
         Please include this information as a comment header in the generated Python file to attribute the source.
         """
 
+        cache = get_artifact_cache()
+        llm_cache_key = cache_key(
+            "CreateProject",
+            "deepseek-chat",
+            file_creation_prompt_data.model_dump(),
+            youtube_info,
+            input_data,
+        )
+        if cache is not None:
+            cached = cache.get_json("llm", llm_cache_key)
+            if cached is not None:
+                print("Using cached project reconstruction")
+                return True, cached["content"]
+
         response = client.chat.completions.create(
             model="deepseek-chat",
             messages=[
@@ -60,6 +71,8 @@ class CreateProject(EventBase):
 
         generated_code = response.choices[0].message.content
         print(generated_code)
+        if cache is not None and generated_code is not None:
+            cache.put_json("llm", llm_cache_key, {"content": generated_code})
 
         # file_path = self._save_generated_file(youtube_object, generated_code)
 
@@ -1,34 +1,41 @@
 import json
-import os
 from typing import Dict, Tuple, Union
 
-from dotenv import load_dotenv
 from event_pipeline.base import EventBase
-from openai import OpenAI
 
+from ...artifact_cache import cache_key, get_artifact_cache
+from ...clients import get_llm_client
 from ...constants import DEFAULT_LEVEL
 from ...models.prompt_data import FrameExtractionPromptData
+from ...scheduler import IOStageExecutor
 from ...utils import load_prompt_for_frame_parsing
 
-load_dotenv()
-
 
 # TODO: think about giving the AI some examples that it could use to give me a good response
 # TODO: add information about the video in question
 # TODO: add like a maximum token limit and in that case do a followup call to the LLM for results
 class LLMParse(EventBase):
+    executor = IOStageExecutor
+
     def process(self, level: int) -> Tuple[bool, Union[str, None]]:
 
-        client = OpenAI(
-            api_key=f"{os.getenv("DEEPSEEK_API_KEY")}",
-            base_url="https://api.deepseek.com",
-        )
+        client = get_llm_client()
         # FIXME: it's possible that the user might not know about the levels and won't enter any value. in that case don't pass the data for the level. this is only added for configurability
         level_info = self.get_level_data(level)
         input_data = self.previous_result.first().content  # type:ignore
 
         prompt_data = load_prompt_for_frame_parsing()
 
+        cache = get_artifact_cache()
+        llm_cache_key = cache_key(
+            "LLMParse", "deepseek-chat", level_info, prompt_data.model_dump(), input_data
+        )
+        if cache is not None:
+            cached = cache.get_json("llm", llm_cache_key)
+            if cached is not None:
+                print("Using cached LLM parse")
+                return True, cached["content"]
+
         response = client.chat.completions.create(
             model="deepseek-chat",
             messages=[
@@ -55,6 +62,10 @@ class LLMParse(EventBase):
         # with open("response.txt", "a") as f:
         #     f.write(str(response.choices[0].message.content))
         #
+        if cache is not None and response.choices[0].message.content is not None:
+            cache.put_json(
+                "llm", llm_cache_key, {"content": response.choices[0].message.content}
+            )
         return True, response.choices[0].message.content
 
     def get_level_data(self, level) -> str:
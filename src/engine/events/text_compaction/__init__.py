@@ -0,0 +1,16 @@
+"""
+Text compaction of OCR output.
+
+Sits between the OCR stage and LLMParse: frames whose text says the same thing
+are dropped and the rest are reduced to what changed since the frame before,
+so the prompt carries each line of code about once.
+"""
+
+from .compact_text import CompactOCRText, estimate_tokens
+from .config import TextCompactionConfig
+
+__all__ = [
+    "CompactOCRText",
+    "TextCompactionConfig",
+    "estimate_tokens",
+]
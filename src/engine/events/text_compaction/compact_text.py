@@ -0,0 +1,134 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from event_pipeline.base import EventBase
+
+from ...progress import report_progress
+from ...scheduler import CPUStageExecutor
+from ...text_delta import apply_deltas, line_deltas, parse_deltas, render_deltas
+from .config import TextCompactionConfig
+
+# roughly how a BPE tokenizer splits code before merging: words and 1-3 digit numbers
+# with their leading space, runs of punctuation, and runs of whitespace
+TOKEN_PATTERN = re.compile(r" ?[A-Za-z_]+| ?\d{1,3}| ?[^\sA-Za-z_\d]+|\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    An estimate of the tokens `text` costs in a prompt. The LLM's own tokenizer
+    isn't available offline, and the estimate only needs to compare prompt sizes.
+    """
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def input_tokens(frames: Dict[str, str]) -> int:
+    # LLMParse puts the dict into the prompt as is
+    return estimate_tokens(str(frames))
+
+
+class CompactOCRText(EventBase):
+    """
+    Shrinks the OCR output before LLMParse puts it into the prompt.
+
+    Visual deduplication keeps frames that differ only by a blinking cursor, a
+    scrolled line or OCR noise. Here every frame's text is normalized (cursor
+    characters, runs of whitespace and blank lines dropped) and hashed:
+
+    - a frame whose normalized text matches a recently kept frame is dropped
+    - every other frame is sent as its line deltas against the previous kept
+      frame, in the notation of `text_delta`, or whole when that is shorter
+
+    Input from IncrementalExtractCodeFromFrames may already hold deltas, they
+    are expanded first. The estimated prompt tokens before and after are
+    printed and reported as progress.
+    """
+
+    executor = CPUStageExecutor
+    config = TextCompactionConfig
+
+    def process(self) -> Tuple[bool, Dict[str, str]]:
+        frames: Dict[str, str] = self.previous_result.first().content  # type:ignore
+        compacted = self.compact(self.full_texts(frames))
+
+        tokens_before = input_tokens(frames)
+        tokens_after = input_tokens(compacted)
+        print(
+            f"Compacted OCR text from {len(frames)} to {len(compacted)} frames, "
+            f"~{tokens_before} to ~{tokens_after} tokens"
+        )
+        report_progress(
+            type(self).__name__,
+            "compacted",
+            frames_before=len(frames),
+            frames_after=len(compacted),
+            tokens_before=tokens_before,
+            tokens_after=tokens_after,
+        )
+        return True, compacted
+
+    def normalize_line(self, line: str) -> str:
+        return " ".join(line.rstrip().rstrip(self.config.CURSOR_CHARACTERS).split())
+
+    def normalize(self, lines: List[str]) -> str:
+        """Text that is the same for two frames showing the same code."""
+        normalized = (self.normalize_line(line) for line in lines)
+        return "\n".join(line for line in normalized if line)
+
+    @staticmethod
+    def full_texts(frames: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Every frame's full lines, with frames given as deltas applied to the one
+        before. Trailing blank lines are dropped, or an insertion after the last
+        line would be numbered past lines that normalization ignores.
+        """
+        texts: Dict[str, List[str]] = {}
+        previous: List[str] = []
+        for frame_number, text in frames.items():
+            deltas = parse_deltas(text)
+            lines = apply_deltas(previous, deltas) if deltas is not None else text.splitlines()
+            end = len(lines)
+            while end and not lines[end - 1].strip():
+                end -= 1
+            texts[frame_number] = lines[:end]
+            # incoming deltas are numbered against the untrimmed text
+            previous = lines
+        return texts
+
+    def compact(self, texts: Dict[str, List[str]]) -> Dict[str, str]:
+        compacted: Dict[str, str] = {}
+        kept_hashes: List[int] = []
+        previous: Optional[List[str]] = None
+        for frame_number, lines in texts.items():
+            normalized_hash = hash(self.normalize(lines))
+            window = (
+                kept_hashes[-self.config.DEDUP_WINDOW :]
+                if self.config.DEDUP_WINDOW
+                else kept_hashes
+            )
+            if normalized_hash in window:
+                continue
+            kept_hashes.append(normalized_hash)
+
+            text = "\n".join(lines)
+            if previous is None or not self.config.EMIT_DELTAS:
+                compacted[frame_number] = text
+            else:
+                deltas = [
+                    delta
+                    for delta in line_deltas(previous, lines, self.normalize_line)
+                    # a blank line appearing or going away changes nothing
+                    if any(line.strip() for line in delta.lines)
+                    or any(line.strip() for line in previous[delta.start : delta.end])
+                ]
+                if not deltas:
+                    continue
+                delta_text = render_deltas(deltas)
+                if len(delta_text) < len(text):
+                    compacted[frame_number] = delta_text
+                    # later deltas are numbered against the text the LLM rebuilds, which
+                    # keeps the previous version of lines that only changed in normalization
+                    previous = apply_deltas(previous, deltas)
+                    continue
+                compacted[frame_number] = text
+            previous = lines
+        return compacted
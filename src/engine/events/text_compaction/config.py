@@ -0,0 +1,13 @@
+class TextCompactionConfig:
+    """Configuration class for compacting OCR text before it is sent to the LLM."""
+
+    # Normalization, used to decide whether two frames or two lines say the same thing
+    CURSOR_CHARACTERS = "|▏▎▍▌█"  # read at the end of a line, they are the editor's cursor
+
+    # Deduplication
+    # earlier kept frames a frame is checked against, None checks them all. Only the last one
+    # by default: a frame showing older code again may be an edit being undone, which matters
+    DEDUP_WINDOW = 1
+
+    # Deltas
+    EMIT_DELTAS = True  # False keeps the full text of every frame that isn't a duplicate
@@ -0,0 +1,37 @@
+"""
+Downscaled working copies of frames for analysis.
+
+Frame analysis (code frame detection, duplicate matching) doesn't need the full
+resolution of a 1080p or 4K download, and its cost grows with the pixel count.
+Each stage can ask for a working copy no taller than its own `ANALYSIS_HEIGHT`.
+The frames in the frame store are never modified, so OCR still gets the originals.
+"""
+
+from typing import Optional
+
+import cv2 as cv
+import numpy as np
+
+
+def downscale(frame: np.ndarray, analysis_height: Optional[int]) -> np.ndarray:
+    """`frame` shrunk to `analysis_height` rows, keeping its aspect ratio. Never upscales."""
+    height, width = frame.shape[:2]
+    if not analysis_height or height <= analysis_height:
+        return frame
+    scaled_width = max(1, round(width * analysis_height / height))
+    return cv.resize(frame, (scaled_width, analysis_height), interpolation=cv.INTER_AREA)
+
+
+def normalize_frame(
+    frame: np.ndarray, analysis_height: Optional[int] = None, grayscale: bool = True
+) -> np.ndarray:
+    """
+    Working copy of a BGR (or already gray) frame for analysis.
+
+    Downscaling happens before the color conversion so the conversion runs on the
+    smaller image.
+    """
+    working = downscale(frame, analysis_height)
+    if grayscale and working.ndim == 3:
+        working = cv.cvtColor(working, cv.COLOR_BGR2GRAY)
+    return working
@@ -0,0 +1,266 @@
+"""
+Frame stores hold the frames of a split video between pipeline stages.
+
+Every stage after `SplitVideoIntoFrames` reads frames by name (`frame<N>.jpg`)
+through a `FrameStore` instead of going to the frames folder directly:
+
+- `DiskFrameStore` keeps one JPEG per frame in the frames folder. It is the
+  default and makes every intermediate frame easy to inspect while debugging.
+- `MemoryMappedFrameStore` keeps decoded frames in a memory-mapped ndarray ring,
+  so stages share decoded pixels instead of encoding and decoding a JPEG at every
+  hop. It can be pickled, and worker processes reopen the same mapping.
+- `InMemoryFrameStore` keeps decoded images in a dict, for short-lived images a
+  stage builds itself, like the line bands incremental OCR sends.
+"""
+
+import os
+import pathlib
+import re
+import shutil
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+import cv2 as cv
+import numpy as np
+from llist import sllist as linkedlist
+from natsort import natsorted
+
+FRAME_NAME_PATTERN = re.compile(r"frame(\d+)")
+
+
+def frame_name(index: int) -> str:
+    return f"frame{index}.jpg"
+
+
+def frame_index(name: str) -> int:
+    match = FRAME_NAME_PATTERN.search(name)
+    if match is None:
+        raise ValueError(f"Not a frame name: {name}")
+    return int(match.group(1))
+
+
+class FrameStore(ABC):
+    """Frames of one video, keyed by frame name."""
+
+    @abstractmethod
+    def frame_names(self) -> linkedlist:
+        """Names of the frames currently in the store, in frame order."""
+
+    @abstractmethod
+    def read(self, name: str, grayscale: bool = False) -> Optional[np.ndarray]:
+        """The decoded frame in BGR order (or grayscale), None if it is missing."""
+
+    @abstractmethod
+    def write(self, name: str, frame: np.ndarray) -> None:
+        ...
+
+    @abstractmethod
+    def remove(self, name: str) -> None:
+        ...
+
+    @abstractmethod
+    def encode(self, name: str) -> bytes:
+        """The frame as an encoded image, ready to be sent to an OCR service."""
+
+    def export(
+        self, directory: Union[str, pathlib.Path], names: Optional[List[str]] = None
+    ) -> pathlib.Path:
+        """Write frames as JPEG files into `directory`, for tools that need files."""
+        directory = pathlib.Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in names if names is not None else self.frame_names():
+            frame = self.read(name)
+            if frame is not None:
+                cv.imwrite(str(pathlib.Path(directory, name)), frame)
+        return directory
+
+    @abstractmethod
+    def destroy(self) -> None:
+        """Release the store and delete everything it holds."""
+
+
+class DiskFrameStore(FrameStore):
+    """One JPEG file per frame in `frames_path`."""
+
+    def __init__(self, frames_path: Union[str, pathlib.Path]):
+        self.frames_path = pathlib.Path(frames_path)
+
+    def path(self, name: str) -> pathlib.Path:
+        return pathlib.Path(self.frames_path, name)
+
+    def frame_names(self) -> linkedlist:
+        frame_names = []
+        for _, _, filenames in os.walk(self.frames_path):
+            frame_names.extend(filenames)
+            break
+        return linkedlist(natsorted(frame_names))
+
+    def read(self, name: str, grayscale: bool = False) -> Optional[np.ndarray]:
+        frame = cv.imread(str(self.path(name)))
+        if grayscale and frame is not None:
+            # converted after decoding to match the memory-mapped store exactly
+            return cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        return frame
+
+    def write(self, name: str, frame: np.ndarray) -> None:
+        cv.imwrite(str(self.path(name)), frame)
+
+    def remove(self, name: str) -> None:
+        try:
+            os.remove(self.path(name))
+        except OSError as e:
+            print("Error Removing file: %s - %s." % (e.filename, e.strerror))
+
+    def encode(self, name: str) -> bytes:
+        with open(self.path(name), "rb") as image_file:
+            return image_file.read()
+
+    def destroy(self) -> None:
+        if self.frames_path.exists():
+            shutil.rmtree(self.frames_path)
+
+
+class MemoryMappedFrameStore(FrameStore):
+    """
+    Decoded frames in a memory-mapped ring of `capacity` slots.
+
+    The mapping is allocated on the first write, sized from that frame, so all
+    later frames must fit inside it; smaller frames such as crops are stored in
+    the top-left corner of their slot. When every slot is taken, the oldest frame
+    is evicted to make room, so `capacity` should cover the frames that are still
+    needed downstream.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, pathlib.Path],
+        capacity: int,
+        jpeg_quality: int = 95,
+    ):
+        self.path = pathlib.Path(path)
+        self.capacity = capacity
+        self.jpeg_quality = jpeg_quality
+        self.slot_shape: Optional[Tuple[int, int, int]] = None
+        # name -> (slot, height, width), oldest first
+        self._slots: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+        self._ring: Optional[np.memmap] = None
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state["_ring"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+
+    @property
+    def ring(self) -> np.memmap:
+        if self._ring is None:
+            assert self.slot_shape is not None, "Frame store is empty"
+            self._ring = np.memmap(
+                self.path, dtype=np.uint8, mode="r+", shape=(self.capacity, *self.slot_shape)
+            )
+        return self._ring
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._slots
+
+    def frame_names(self) -> linkedlist:
+        return linkedlist(sorted(self._slots, key=frame_index))
+
+    def read(self, name: str, grayscale: bool = False) -> Optional[np.ndarray]:
+        if name not in self._slots:
+            return None
+        slot, height, width = self._slots[name]
+        frame = self.ring[slot, :height, :width]
+        if grayscale:
+            return cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        return np.array(frame)
+
+    def write(self, name: str, frame: np.ndarray) -> None:
+        if frame.ndim == 2:
+            frame = cv.cvtColor(frame, cv.COLOR_GRAY2BGR)
+
+        if self._ring is None and self.slot_shape is None:
+            self.slot_shape = frame.shape
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._ring = np.memmap(
+                self.path, dtype=np.uint8, mode="w+", shape=(self.capacity, *self.slot_shape)
+            )
+
+        height, width = frame.shape[:2]
+        if height > self.slot_shape[0] or width > self.slot_shape[1]:
+            raise ValueError(
+                f"Frame {name} is {width}x{height}, larger than the store's "
+                f"{self.slot_shape[1]}x{self.slot_shape[0]} slots"
+            )
+
+        if name in self._slots:
+            slot = self._slots.pop(name)[0]
+        elif self._free:
+            slot = self._free.pop()
+        else:
+            evicted, (slot, _, _) = self._slots.popitem(last=False)
+            print(f"Frame store is full, evicting {evicted}")
+
+        self.ring[slot, :height, :width] = frame
+        self._slots[name] = (slot, height, width)
+
+    def remove(self, name: str) -> None:
+        entry = self._slots.pop(name, None)
+        if entry is not None:
+            self._free.append(entry[0])
+
+    def encode(self, name: str) -> bytes:
+        frame = self.read(name)
+        if frame is None:
+            raise FileNotFoundError(f"Cannot load frame: {name}")
+        _, encoded = cv.imencode(
+            ".jpg", frame, [cv.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        )
+        return encoded.tobytes()
+
+    def destroy(self) -> None:
+        self._ring = None
+        self._slots.clear()
+        self._free = list(range(self.capacity - 1, -1, -1))
+        if self.path.exists():
+            os.remove(self.path)
+
+
+class InMemoryFrameStore(FrameStore):
+    """Decoded images in a dict, in the order they were written, encoded as PNG."""
+
+    def __init__(self):
+        self._frames: Dict[str, np.ndarray] = {}
+
+    def frame_names(self) -> linkedlist:
+        return linkedlist(list(self._frames))
+
+    def read(self, name: str, grayscale: bool = False) -> Optional[np.ndarray]:
+        frame = self._frames.get(name)
+        if grayscale and frame is not None and frame.ndim == 3:
+            return cv.cvtColor(frame, cv.COLOR_BGR2GRAY)
+        return frame
+
+    def write(self, name: str, frame: np.ndarray) -> None:
+        self._frames[name] = frame
+
+    def remove(self, name: str) -> None:
+        self._frames.pop(name, None)
+
+    def encode(self, name: str) -> bytes:
+        frame = self.read(name)
+        if frame is None:
+            raise FileNotFoundError(f"Cannot load frame: {name}")
+        # lossless, the images are small and JPEG artifacts blur thin glyphs
+        _, encoded = cv.imencode(".png", frame)
+        return encoded.tobytes()
+
+    def destroy(self) -> None:
+        self._frames.clear()
@@ -7,10 +7,12 @@ class DownloaderReturnType:
     def __getstate__(self):
         return self.__dict__
 
-    def __init__(self, title, filepath, transcript):
+    # video_id is the YouTube video ID, used to key cached artifacts
+    def __init__(self, title, filepath, transcript, video_id=None):
         self.title = title
         self.filepath = filepath
         self.transcript = transcript
+        self.video_id = video_id
 
     def __str__(self):
         return f"Title: {self.title
@@ -8,9 +8,27 @@ class FrameSplitReturnType:
         return self.__dict__
 
     # TODO: returnType is the downloaderReturnType I think. it was erroring out so I remove it I will fix soon
-    def __init__(self, returnType, frames_path):
+    # frame_store is None when the frames are plain JPEG files in frames_path
+    # frame_stream holds frames that are still being decoded, the first stage to consume it stores them
+    # crop_box (x1, y1, x2, y2) is set when the frames were already cropped to the code region while decoding
+    # cache_key names the frames in the artifact cache, filtered is True when they were restored from it
+    def __init__(
+        self,
+        returnType,
+        frames_path,
+        frame_store=None,
+        frame_stream=None,
+        crop_box=None,
+        cache_key=None,
+        filtered=False,
+    ):
         self.returnType = returnType
         self.frames_path = frames_path
+        self.frame_store = frame_store
+        self.frame_stream = frame_stream
+        self.crop_box = crop_box
+        self.cache_key = cache_key
+        self.filtered = filtered
 
     def __str__(self):
         return f"Title: {self.returnType.title 
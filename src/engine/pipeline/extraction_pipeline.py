@@ -1,9 +1,12 @@
 from event_pipeline.fields import InputDataField
 from event_pipeline.pipeline import BatchPipeline, Pipeline
 
-from ..events import (CreateProject, CropFrames, DetectBoundingBox,
-                      DownloadVideo, GoogleVisionExtractCodeFromFrames,
-                      LLMParse, RemoveDuplicates, RemoveNonCodeFramesRuleBased,
+from ..events import (CompactOCRText, CreateProject, CropFrames,
+                      DetectBoundingBox, DownloadVideo, ExtractCodeFromFrames,
+                      GoogleVisionExtractCodeFromFrames,
+                      GoogleVisionExtractCodeFromMontages,
+                      IncrementalExtractCodeFromFrames, LLMParse,
+                      RemoveDuplicates, RemoveNonCodeFramesRuleBased,
                       RemoveNonCodeFramesWithModel, SplitVideoIntoFrames)
 from ..models.test_data import YoutubeObject
 
@@ -13,6 +16,8 @@ class CodeExtractionPipeline(Pipeline):
     frame_extraction_fps = InputDataField(data_type=int, required=True)
     duplicate_removal_threshold = InputDataField(data_type=float, required=True)
     level = InputDataField(data_type=int, required=True)
+    feature_backend = InputDataField(data_type=str, default="sift")
+    ocr_backend = InputDataField(data_type=str, default="google_vision")
 
 
 class TestBatchExtractionPipeline(BatchPipeline):
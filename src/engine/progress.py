@@ -0,0 +1,126 @@
+"""
+Progress reporting for pipeline runs.
+
+Whoever starts a run (the server's job runner, for example) sets a
+`ProgressReporter` in `current_reporter`. The context is carried into the run
+and its stage executors, so every stage reports to it when it starts and when it
+finishes, with a short summary of what it produced:
+
+    {"stage": "SplitVideoIntoFrames", "state": "finished", "result": {"frames": 43}}
+
+A run shared by several identical requests reports to a `ProgressBroadcast`,
+which replays what was already reported to reporters that join late.
+"""
+
+import contextvars
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional
+
+ProgressUpdate = Dict[str, Any]
+
+# text results are cut to this many characters in progress updates
+RESULT_PREVIEW_CHARS = 2000
+
+
+class ProgressReporter(ABC):
+    @abstractmethod
+    def report(self, update: ProgressUpdate) -> None:
+        """Called from the thread running the stage, so it must be thread safe."""
+
+
+class CallbackReporter(ProgressReporter):
+    def __init__(self, callback: Callable[[ProgressUpdate], None]):
+        self.callback = callback
+
+    def report(self, update: ProgressUpdate) -> None:
+        self.callback(update)
+
+
+class ProgressBroadcast(ProgressReporter):
+    """Forwards updates to every subscribed reporter, late subscribers get the history first."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._history: List[ProgressUpdate] = []
+        self._subscribers: List[ProgressReporter] = []
+
+    def subscribe(self, reporter: ProgressReporter) -> None:
+        with self._lock:
+            history = list(self._history)
+            self._subscribers.append(reporter)
+        for update in history:
+            reporter.report(update)
+
+    def report(self, update: ProgressUpdate) -> None:
+        with self._lock:
+            self._history.append(update)
+            subscribers = list(self._subscribers)
+        for reporter in subscribers:
+            reporter.report(update)
+
+
+current_reporter: contextvars.ContextVar[Optional[ProgressReporter]] = (
+    contextvars.ContextVar("current_reporter", default=None)
+)
+
+
+def report_progress(stage: str, state: str, **details: Any) -> None:
+    reporter = current_reporter.get()
+    if reporter is None:
+        return
+    update = {"stage": stage, "state": state, "time": time.time(), **details}
+    try:
+        reporter.report(update)
+    except Exception as e:
+        # progress is best effort and must never fail the stage
+        print("Error reporting progress:", e)
+
+
+def summarize_result(content: Any) -> Any:
+    """A small JSON-serializable view of a stage result, for progress updates."""
+    if content is None or isinstance(content, (bool, int, float)):
+        return content
+    if isinstance(content, str):
+        return content[:RESULT_PREVIEW_CHARS]
+    if isinstance(content, (list, tuple)):
+        return {"items": len(content)}
+    if isinstance(content, dict):
+        return {key: summarize_result(value) for key, value in content.items()}
+
+    summary: Dict[str, Any] = {}
+    title = getattr(content, "title", None) or getattr(
+        getattr(content, "returnType", None), "title", None
+    )
+    if title:
+        summary["title"] = title
+    frame_store = getattr(content, "frame_store", None)
+    if frame_store is not None:
+        summary["frames"] = len(frame_store.frame_names())
+    elif getattr(content, "frames_path", None):
+        summary["frames_path"] = str(content.frames_path)
+    if getattr(content, "crop_box", None) is not None:
+        summary["crop_box"] = list(content.crop_box)
+    return summary or type(content).__name__
+
+
+def track_stage(event: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run an event_pipeline event, reporting when it starts and what it returned."""
+    stage = type(event).__name__
+    report_progress(stage, "started")
+    started = time.perf_counter()
+    try:
+        result = event(*args, **kwargs)
+    except Exception as e:
+        report_progress(stage, "failed", error=str(e))
+        raise
+
+    details: Dict[str, Any] = {"seconds": round(time.perf_counter() - started, 3)}
+    if getattr(result, "error", False):
+        details["error"] = str(result.content)
+        report_progress(stage, "failed", **details)
+    else:
+        details["result"] = summarize_result(getattr(result, "content", None))
+        report_progress(stage, "finished", **details)
+    return result
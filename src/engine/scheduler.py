@@ -0,0 +1,236 @@
+"""
+Process-wide scheduling of pipeline runs.
+
+Every extraction downloads a video, runs ffmpeg and OpenCV over it and makes
+network OCR and LLM calls, so running an unbounded number of them at once just
+makes all of them slow. `PipelineScheduler` admits at most
+`MAX_CONCURRENT_RUNS` runs at a time, queues the next `MAX_QUEUED_RUNS` by
+priority (FIFO within a priority) and rejects anything beyond that with
+`SchedulerBusyError`.
+
+Inside a run, stages are dispatched to one of two shared pools through their
+event_pipeline `executor`: `IOStageExecutor` for stages that mostly wait on the
+network (download, OCR, LLM) and `CPUStageExecutor` for stages that keep a core
+busy (split, filter, dedup, crop), so I/O waits don't hold CPU slots. Stages
+submitted this way report their progress to the run's `ProgressReporter`.
+
+Stages that fan work out to other processes (the rule-based filter, duplicate
+removal, Tesseract) borrow one process pool of `CPU_WORKERS` workers through
+`worker_process_pool`, so concurrent runs share the cores instead of each
+starting a pool per stage.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import (Executor, Future, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from concurrent.futures import wait as wait_for_futures
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .progress import track_stage
+
+T = TypeVar("T")
+
+
+class SchedulerConfig:
+    """Configuration class for the pipeline scheduler."""
+
+    MAX_CONCURRENT_RUNS = 2
+    MAX_QUEUED_RUNS = 16  # runs waiting for a slot, None queues without limit
+    IO_WORKERS = 16  # stages waiting on the network, across all runs
+    CPU_WORKERS = None  # stage threads and worker processes across all runs, None uses every core
+    # how stages start their own worker processes. Stages run on pool threads next to the
+    # event loop, decoders and gRPC clients, and forking a process with other threads
+    # running can deadlock the child on a lock one of them held
+    WORKER_START_METHOD = "forkserver"
+
+
+class SchedulerBusyError(Exception):
+    """Raised when a run is submitted while every slot and queue position is taken."""
+
+
+class PipelineScheduler:
+    def __init__(
+        self,
+        max_concurrent_runs: int,
+        max_queued_runs: Optional[int],
+        io_workers: int,
+        cpu_workers: Optional[int],
+    ):
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_queued_runs = max_queued_runs
+        self.running = 0
+        self._waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._run_pool = ThreadPoolExecutor(
+            max_workers=max_concurrent_runs, thread_name_prefix="pipeline-run"
+        )
+        self.cpu_workers = cpu_workers or os.cpu_count() or 1
+        self._pools: Dict[str, ThreadPoolExecutor] = {
+            "io": ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="io-stage"),
+            "cpu": ThreadPoolExecutor(
+                max_workers=self.cpu_workers, thread_name_prefix="cpu-stage"
+            ),
+        }
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._process_pool_lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, waiter in self._waiting if not waiter.done())
+
+    def pool(self, name: str) -> ThreadPoolExecutor:
+        return self._pools[name]
+
+    def process_pool(self) -> ProcessPoolExecutor:
+        """The worker processes every stage shares, started on first use."""
+        with self._process_pool_lock:
+            # a worker that died takes the whole pool down, start a fresh one for later stages
+            if self._process_pool is None or self._process_pool._broken:  # type:ignore
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.cpu_workers,
+                    mp_context=multiprocessing.get_context(SchedulerConfig.WORKER_START_METHOD),
+                )
+            return self._process_pool
+
+    async def _acquire(self, priority: int) -> None:
+        if self.running < self.max_concurrent_runs and not self.queued:
+            self.running += 1
+            return
+        if self.max_queued_runs is not None and self.queued >= self.max_queued_runs:
+            raise SchedulerBusyError(
+                f"{self.running} runs in progress and {self.queued} queued, try again later"
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._order), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # the slot was handed over just as the caller went away, pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiting:
+            _, _, waiter = heapq.heappop(self._waiting)
+            if not waiter.done():
+                # the slot moves straight to the next run, `running` is unchanged
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    @property
+    def full(self) -> bool:
+        """True when a new run would be rejected with SchedulerBusyError."""
+        return (
+            self.running >= self.max_concurrent_runs
+            and self.max_queued_runs is not None
+            and self.queued >= self.max_queued_runs
+        )
+
+    async def run(self, fn: Callable[[], T], priority: int = 0) -> T:
+        """
+        Run `fn` (a whole pipeline run) on the run pool once a slot is free.
+        Lower `priority` values are admitted first.
+        """
+        await self._acquire(priority)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._run_pool, contextvars.copy_context().run, fn
+            )
+        finally:
+            self._release()
+
+
+class StageExecutor(Executor):
+    """
+    event_pipeline executor that runs an event on one of the scheduler's shared
+    pools instead of a pool of its own. The context of the submitting thread is
+    carried over, so context variables set for the run are visible to the stage,
+    and the stage's progress is reported to the run's reporter.
+    """
+
+    pool_name = "cpu"
+
+    def __init__(self):
+        self._futures: List[Future] = []
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        context = contextvars.copy_context()
+        future = get_scheduler().pool(self.pool_name).submit(
+            context.run, track_stage, fn, *args, **kwargs
+        )
+        self._futures.append(future)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        # the pools are shared, only wait for the work submitted through this executor
+        if cancel_futures:
+            for future in self._futures:
+                future.cancel()
+        if wait:
+            wait_for_futures(self._futures)
+
+
+class IOStageExecutor(StageExecutor):
+    pool_name = "io"
+
+
+class CPUStageExecutor(StageExecutor):
+    pool_name = "cpu"
+
+
+class WorkerProcessPool(StageExecutor):
+    """
+    A stage's view of the scheduler's shared process pool. Leaving it waits for
+    the work submitted through it and leaves the pool running for other stages.
+    """
+
+    def __init__(self, max_workers: int):
+        super().__init__()
+        self.max_workers = min(max_workers, get_scheduler().cpu_workers)
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = get_scheduler().process_pool().submit(fn, *args, **kwargs)
+        # stages submit one task per frame, don't hold on to the results they already took
+        self._futures = [pending for pending in self._futures if not pending.done()]
+        self._futures.append(future)
+        return future
+
+    def map(self, fn, *iterables, timeout=None, chunksize=1):
+        return get_scheduler().process_pool().map(
+            fn, *iterables, timeout=timeout, chunksize=chunksize
+        )
+
+
+_scheduler: Optional[PipelineScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> PipelineScheduler:
+    """The process-wide scheduler, created from SchedulerConfig on first use."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PipelineScheduler(
+                SchedulerConfig.MAX_CONCURRENT_RUNS,
+                SchedulerConfig.MAX_QUEUED_RUNS,
+                SchedulerConfig.IO_WORKERS,
+                SchedulerConfig.CPU_WORKERS,
+            )
+        return _scheduler
+
+
+def worker_process_pool(max_workers: int) -> WorkerProcessPool:
+    """
+    Worker processes for a stage, borrowed from the scheduler's shared pool.
+    `max_workers` is capped at CPU_WORKERS, the size of that pool.
+    """
+    return WorkerProcessPool(max_workers)
@@ -0,0 +1,104 @@
+"""
+Line deltas between the texts of consecutive frames.
+
+Consecutive code frames usually differ by a few lines, so a frame's text can be
+sent as the lines that changed since the frame before it. A `TextDelta`
+replaces a range of the previous text's lines with new ones, and
+`render_deltas` writes a frame's deltas in the notation the parse prompt
+describes:
+
+    @@ replace lines 4-5 @@
+        total += x
+        return total
+    @@ insert at line 9 @@
+    print(add(1, 2))
+    @@ delete lines 12-12 @@
+
+Line numbers are 1-based and always refer to the previous frame's text.
+"""
+
+import difflib
+import re
+from typing import Callable, List, NamedTuple, Optional
+
+
+class TextDelta(NamedTuple):
+    start: int  # first replaced line of the previous text, 0-based
+    end: int  # one past the last replaced line, equal to start for an insertion
+    lines: List[str]  # the lines that take their place, empty for a deletion
+
+
+HEADER_PATTERN = re.compile(
+    r"^@@ (?:replace lines (\d+)-(\d+)|insert at line (\d+)|delete lines (\d+)-(\d+)) @@$"
+)
+
+
+def line_deltas(
+    previous: List[str],
+    lines: List[str],
+    normalize: Optional[Callable[[str], str]] = None,
+) -> List[TextDelta]:
+    """
+    Deltas turning `previous` into `lines`, in line order. With `normalize`,
+    lines are matched on their normalized form, so lines that differ only in
+    ways it erases count as unchanged.
+    """
+    if normalize is not None:
+        matcher = difflib.SequenceMatcher(
+            None,
+            [normalize(line) for line in previous],
+            [normalize(line) for line in lines],
+            autojunk=False,
+        )
+    else:
+        matcher = difflib.SequenceMatcher(None, previous, lines, autojunk=False)
+    return [
+        TextDelta(i1, i2, lines[j1:j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_deltas(previous: List[str], deltas: List[TextDelta]) -> List[str]:
+    """The lines `deltas` describe, given the previous text they were taken against."""
+    lines: List[str] = []
+    position = 0
+    for delta in deltas:
+        lines.extend(previous[position : delta.start])
+        lines.extend(delta.lines)
+        position = delta.end
+    lines.extend(previous[position:])
+    return lines
+
+
+def render_deltas(deltas: List[TextDelta]) -> str:
+    rendered: List[str] = []
+    for delta in deltas:
+        if delta.start == delta.end:
+            rendered.append(f"@@ insert at line {delta.start + 1} @@")
+        elif not delta.lines:
+            rendered.append(f"@@ delete lines {delta.start + 1}-{delta.end} @@")
+        else:
+            rendered.append(f"@@ replace lines {delta.start + 1}-{delta.end} @@")
+        rendered.extend(delta.lines)
+    return "\n".join(rendered)
+
+
+def parse_deltas(text: str) -> Optional[List[TextDelta]]:
+    """The deltas `render_deltas` wrote into `text`, None when it is a full text instead."""
+    deltas: List[TextDelta] = []
+    for line in text.split("\n"):
+        header = HEADER_PATTERN.match(line)
+        if header is None:
+            if not deltas:
+                return None
+            deltas[-1].lines.append(line)
+            continue
+        replace_start, replace_end, insert_at, delete_start, delete_end = header.groups()
+        if replace_start is not None:
+            deltas.append(TextDelta(int(replace_start) - 1, int(replace_end), []))
+        elif insert_at is not None:
+            deltas.append(TextDelta(int(insert_at) - 1, int(insert_at) - 1, []))
+        else:
+            deltas.append(TextDelta(int(delete_start) - 1, int(delete_end), []))
+    return deltas or None
@@ -2,13 +2,14 @@ import json
 import os
 import pathlib
 import shutil
-from os import walk
+import uuid
 from typing import Union
 
 from llist import sllist as linkedlist
-from natsort import natsorted
 
+from .artifact_cache import get_artifact_cache
 from .constants import DEFAULT_CREATE_FILE_PROMPTS, DEFAULT_PROMPT_FILE
+from .frame_store import DiskFrameStore, FrameStore
 from .models import download_type, frame_split_type
 from .models.prompt_data import (FileCreationPromptData,
                                  FrameExtractionPromptData)
@@ -26,6 +27,43 @@ def load_prompt_data_for_file_creation() -> FileCreationPromptData:
         return FileCreationPromptData(**data)
 
 
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+def unique_run_name(name: str) -> str:
+    """`name` with a random suffix, for files and folders that belong to a single run."""
+    return f"{name}-{new_run_id()}"
+
+
+def get_frame_store(video_frames: frame_split_type.FrameSplitReturnType) -> FrameStore:
+    """The store holding the video's frames, the frames folder unless one was attached."""
+    frame_store = getattr(video_frames, "frame_store", None)
+    if frame_store is None:
+        return DiskFrameStore(video_frames.frames_path)
+    return frame_store
+
+
+def cache_filtered_frames(
+    video_frames: frame_split_type.FrameSplitReturnType, crop_box
+) -> None:
+    """Store the filtered, cropped frames so a repeat run can skip straight past cropping."""
+    cache = get_artifact_cache()
+    if (
+        cache is None
+        or getattr(video_frames, "cache_key", None) is None
+        or getattr(video_frames, "filtered", False)
+    ):
+        return
+
+    frame_store = get_frame_store(video_frames)
+    names = list(frame_store.frame_names())
+    files = [(name, frame_store.encode(name)) for name in names]
+    frames_info = {"frames": names, "crop_box": [int(value) for value in crop_box]}
+    files.append(("frames.json", json.dumps(frames_info).encode()))
+    cache.put_directory("frames", video_frames.cache_key, files)
+
+
 def load_frame_names(video_frames: frame_split_type.FrameSplitReturnType) -> linkedlist:
     """This function loads the frame names from the video frames.
     Args:
@@ -38,12 +76,7 @@ def load_frame_names(video_frames: frame_split_type.FrameSplitReturnType) -> lin
     Raises:
     """
 
-    frame_names = []
-    for _, _, filenames in walk(video_frames.frames_path):
-        frame_names.extend(filenames)
-        break
-    frame_names = natsorted(frame_names)
-    return linkedlist(frame_names)
+    return get_frame_store(video_frames).frame_names()
 
 
 def remove_all_old_frames(path_to_frames, paths: linkedlist) -> None:
@@ -69,9 +102,10 @@ def remove_thing_based_on_type(
             os.remove(remove_item.filepath)
         elif isinstance(remove_item, str):
             os.remove(remove_item)
-        elif isinstance(
-            remove_item, frame_split_type.FrameSplitReturnType
-        ) and os.path.exists(remove_item.frames_path):
-            shutil.rmtree(remove_item.frames_path)
+        elif isinstance(remove_item, frame_split_type.FrameSplitReturnType):
+            if getattr(remove_item, "frame_store", None) is not None:
+                remove_item.frame_store.destroy()
+            if os.path.exists(remove_item.frames_path):
+                shutil.rmtree(remove_item.frames_path)
     except OSError as e:
         print("Error Removing file: %s - %s." % (e.filename, e.strerror))
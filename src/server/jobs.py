@@ -0,0 +1,284 @@
+"""
+Background extraction jobs.
+
+`POST /jobs` stores a job and runs the extraction in the background, so the
+request returns as soon as the job exists instead of holding the connection open
+for the whole pipeline. Each stage's progress is appended to the job's event log,
+which `GET /jobs/{id}` summarizes and `GET /jobs/{id}/events` streams as
+server-sent events.
+
+Jobs live in memory by default. Set `AGEAN_REDIS_URL` to keep them in Redis, so
+every server process can answer for jobs started by any other.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, List,
+                    Optional, Set)
+
+import redis.asyncio as redis
+
+from engine.progress import CallbackReporter, current_reporter
+
+
+class JobStoreConfig:
+    """Configuration class for the job store."""
+
+    REDIS_URL = os.environ.get("AGEAN_REDIS_URL")  # None keeps jobs in memory
+    KEY_PREFIX = "agean:job:"
+    JOB_TTL_SECONDS = 24 * 3600  # finished jobs are forgotten after this long
+    POLL_INTERVAL = 0.5  # how often the Redis store checks for new events
+    KEEPALIVE_SECONDS = 15  # idle time before the event stream sends a comment
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    FINISHED = (SUCCEEDED, FAILED)
+
+
+# the last event of every job, carrying its final status
+DONE_STAGE = "Job"
+
+
+class JobStore(ABC):
+    @abstractmethod
+    async def create(self, job: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def update(self, job_id: str, **fields: Any) -> None:
+        ...
+
+    @abstractmethod
+    async def append_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def events(
+        self, job_id: str, start: int, timeout: float
+    ) -> List[Dict[str, Any]]:
+        """Events from index `start` on, waiting up to `timeout` seconds for one to arrive."""
+
+
+class InMemoryJobStore(JobStore):
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._changed = asyncio.Condition()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if job["status"] in JobStatus.FINISHED and job["updated_at"] < cutoff:
+                del self._jobs[job_id]
+                del self._events[job_id]
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        self._prune()
+        self._jobs[job["job_id"]] = dict(job)
+        self._events[job["job_id"]] = []
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        self._jobs[job_id].update(fields, updated_at=time.time())
+
+    async def append_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        async with self._changed:
+            self._events[job_id].append(event)
+            self._changed.notify_all()
+
+    async def events(
+        self, job_id: str, start: int, timeout: float
+    ) -> List[Dict[str, Any]]:
+        async with self._changed:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait_for(
+                        lambda: len(self._events.get(job_id, ())) > start
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                pass
+            return self._events.get(job_id, [])[start:]
+
+
+class RedisJobStore(JobStore):
+    """A JSON job record and a list of JSON events per job, both expiring after `ttl`."""
+
+    def __init__(self, url: str, prefix: str, ttl: float, poll_interval: float):
+        self.client = redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.ttl = int(ttl)
+        self.poll_interval = poll_interval
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}"
+
+    def _events_key(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}:events"
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        await self.client.set(self._job_key(job["job_id"]), json.dumps(job), ex=self.ttl)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.client.get(self._job_key(job_id))
+        return json.loads(job) if job is not None else None
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        # only the process running a job updates it, so read-modify-write is safe
+        job = await self.get(job_id)
+        if job is None:
+            return
+        job.update(fields, updated_at=time.time())
+        await self.client.set(self._job_key(job_id), json.dumps(job), ex=self.ttl)
+
+    async def append_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        key = self._events_key(job_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, json.dumps(event))
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def events(
+        self, job_id: str, start: int, timeout: float
+    ) -> List[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while True:
+            events = await self.client.lrange(self._events_key(job_id), start, -1)
+            if events or time.monotonic() >= deadline:
+                return [json.loads(event) for event in events]
+            await asyncio.sleep(self.poll_interval)
+
+
+_store: Optional[JobStore] = None
+# keeps a reference to running jobs, asyncio only holds weak ones
+_running: Set["asyncio.Task[None]"] = set()
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        if JobStoreConfig.REDIS_URL:
+            _store = RedisJobStore(
+                JobStoreConfig.REDIS_URL,
+                JobStoreConfig.KEY_PREFIX,
+                JobStoreConfig.JOB_TTL_SECONDS,
+                JobStoreConfig.POLL_INTERVAL,
+            )
+        else:
+            _store = InMemoryJobStore(JobStoreConfig.JOB_TTL_SECONDS)
+    return _store
+
+
+async def submit_job(
+    request: Dict[str, Any], work: Callable[[], Awaitable[str]]
+) -> Dict[str, Any]:
+    """Store a new job for `request` and start `work` for it in the background."""
+    now = time.time()
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "status": JobStatus.QUEUED,
+        "stage": None,
+        "request": request,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    store = get_job_store()
+    await store.create(job)
+
+    task = asyncio.create_task(run_job(store, job["job_id"], work))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return job
+
+
+async def run_job(
+    store: JobStore, job_id: str, work: Callable[[], Awaitable[str]]
+) -> None:
+    loop = asyncio.get_running_loop()
+    updates: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+    # stages report from worker threads, the queue keeps their updates in order
+    current_reporter.set(
+        CallbackReporter(lambda update: loop.call_soon_threadsafe(updates.put_nowait, update))
+    )
+    writer = asyncio.create_task(_record_progress(store, job_id, updates))
+
+    try:
+        result = await work()
+    except Exception as e:
+        print("Job", job_id, "failed:", e)
+        final = {"status": JobStatus.FAILED, "error": str(e)}
+    else:
+        final = {"status": JobStatus.SUCCEEDED, "result": result}
+
+    updates.put_nowait(None)
+    await writer
+    await store.update(job_id, **final)
+    await store.append_event(
+        job_id, {"stage": DONE_STAGE, "state": final["status"], "time": time.time()}
+    )
+
+
+async def _record_progress(
+    store: JobStore, job_id: str, updates: "asyncio.Queue[Optional[Dict[str, Any]]]"
+) -> None:
+    while True:
+        update = await updates.get()
+        if update is None:
+            return
+        try:
+            await store.append_event(job_id, update)
+            if update["state"] == "started":
+                await store.update(job_id, status=JobStatus.RUNNING, stage=update["stage"])
+        except Exception as e:
+            print("Error recording progress of job", job_id, ":", e)
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_job_events(job_id: str, start: int = 0) -> AsyncIterator[str]:
+    """
+    Server-sent events for a job: every progress update from index `start` on,
+    then one "done" event with the finished job.
+    """
+    store = get_job_store()
+    index = start
+    while True:
+        events = await store.events(job_id, index, JobStoreConfig.KEEPALIVE_SECONDS)
+        if not events:
+            if await store.get(job_id) is None:
+                return
+            yield ": keepalive\n\n"
+            continue
+        for event in events:
+            if event["stage"] == DONE_STAGE:
+                yield format_sse("done", await store.get(job_id) or event, index)
+                return
+            yield format_sse("progress", event, index)
+            index += 1
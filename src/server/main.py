@@ -1,13 +1,19 @@
+import json
 import os
 import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+from typing import List, Optional
+
+from fastapi import FastAPI, Header
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from engine import YoutubeObject, async_api
+from engine.scheduler import SchedulerBusyError, get_scheduler
+from server.jobs import get_job_store, stream_job_events, submit_job
 
 # TODO: engine could work if I just imported it as a package but
 # I'll do that after I make sure that the server connection actually works
@@ -30,6 +36,23 @@ class ExtractCodeRequest(BaseModel):
     frame_extraction_fps: int = 1
     duplicate_removal_threshold: float = 0.8
     level: int = 1
+    priority: int = 0  # lower runs first when the server is busy
+    ocr_backend: str = "google_vision"  # any name in OCR_BACKENDS
+
+
+class BatchVideo(BaseModel):
+    video_url: str
+    title: str = "API Video"
+    duration: str = "Unknown"
+
+
+class BatchExtractCodeRequest(BaseModel):
+    videos: List[BatchVideo] = Field(min_length=1, max_length=50)
+    frame_extraction_fps: int = 1
+    duplicate_removal_threshold: float = 0.8
+    level: int = 1
+    priority: int = 0
+    ocr_backend: str = "google_vision"
 
 
 @app.get("/")
@@ -37,14 +60,18 @@ async def read_root():
     return {"Hello": "World"}
 
 
+def youtube_object_for(request: ExtractCodeRequest) -> YoutubeObject:
+    return YoutubeObject(
+        title=request.title,
+        link=request.video_url,
+        duration=request.duration,
+    )
+
+
 @app.post("/extract_code")
 async def extract_code(request: ExtractCodeRequest):
     try:
-        youtube_obj = YoutubeObject(
-            title=request.title,
-            link=request.video_url,
-            duration=request.duration,
-        )
+        youtube_obj = youtube_object_for(request)
 
         print("youtube object created", youtube_obj)
         print("frame extraction fps", request.frame_extraction_fps)
@@ -57,6 +84,8 @@ async def extract_code(request: ExtractCodeRequest):
             frame_extraction_fps=request.frame_extraction_fps,
             duplicate_removal_threshold=request.duplicate_removal_threshold,
             level=request.level,
+            priority=request.priority,
+            ocr_backend=request.ocr_backend,
         )
 
         return {
@@ -68,5 +97,96 @@ async def extract_code(request: ExtractCodeRequest):
                 "duration": request.duration,
             },
         }
+    except SchedulerBusyError as e:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "busy", "message": str(e), "video_url": request.video_url},
+        )
     except Exception as e:
         return {"status": "error", "message": str(e), "video_url": request.video_url}
+
+
+@app.post("/extract_code/batch")
+async def extract_code_batch(request: BatchExtractCodeRequest):
+    """
+    Extract code from several videos at once. The response is newline-delimited JSON
+    with one line per video, written as soon as that video finishes, in completion order.
+    """
+    youtube_objects = [
+        YoutubeObject(title=video.title, link=video.video_url, duration=video.duration)
+        for video in request.videos
+    ]
+
+    async def results():
+        async for index, success, content in async_api.extract_code_batch_async(
+            youtube_objects=youtube_objects,
+            frame_extraction_fps=request.frame_extraction_fps,
+            duplicate_removal_threshold=request.duplicate_removal_threshold,
+            level=request.level,
+            priority=request.priority,
+            ocr_backend=request.ocr_backend,
+        ):
+            video = request.videos[index]
+            line = {
+                "index": index,
+                "status": "success" if success else "error",
+                "video_info": {
+                    "url": video.video_url,
+                    "title": video.title,
+                    "duration": video.duration,
+                },
+            }
+            line["result" if success else "message"] = content
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def submit_extraction_job(request: ExtractCodeRequest):
+    """Start an extraction in the background and return its job ID right away."""
+    if get_scheduler().full:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "busy", "message": "Too many extractions queued, try again later"},
+        )
+
+    async def work() -> str:
+        return await async_api.extract_code_async(
+            youtube_object=[youtube_object_for(request)],
+            frame_extraction_fps=request.frame_extraction_fps,
+            duplicate_removal_threshold=request.duplicate_removal_threshold,
+            level=request.level,
+            priority=request.priority,
+            ocr_backend=request.ocr_backend,
+        )
+
+    job = await submit_job(request.model_dump(), work)
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['job_id']}",
+        "events_url": f"/jobs/{job['job_id']}/events",
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await get_job_store().get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Unknown job"})
+    return job
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, last_event_id: Optional[str] = Header(default=None)):
+    """Server-sent events with the job's stage progress, ending with a "done" event."""
+    if await get_job_store().get(job_id) is None:
+        return JSONResponse(status_code=404, content={"status": "error", "message": "Unknown job"})
+    # a reconnecting EventSource sends the ID of the last event it received
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        stream_job_events(job_id, start),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )